@@ -0,0 +1,168 @@
+import hashlib
+import json
+import logging
+import pickle
+import re
+import time
+import weakref
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Warstwa cache read-through nad zapytaniami SQL: lokalny LRU/TTL w procesie -> Redis -> baza.
+# Klucz = backend + znormalizowany SQL + parametry. Każdy wpis jest oznaczony tabelami z FROM/JOIN,
+# a zapis do tabeli (notify_write z query_update.py / query_delete.py) usuwa wszystkie wpisy z tym tagiem.
+# Hooki działają w obrębie procesu; lokalne tiery w innych procesach wygasają tylko przez TTL.
+
+LOCAL_SIZE = 1024
+LOCAL_TTL = 30.0
+REMOTE_TTL = 300
+KEY_PREFIX = "cache:sql"
+
+TABLE_RE = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)", re.IGNORECASE)
+
+# Żywe instancje ReadThroughCache — odbiorcy notify_write
+_caches = weakref.WeakSet()
+
+
+def normalize_sql(sql):
+    return " ".join(sql.split()).rstrip(";").strip()
+
+
+def cache_key(backend, sql, params=None):
+    raw = json.dumps([backend, normalize_sql(sql), params], default=str)
+    return f"{KEY_PREFIX}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def sql_tables(sql):
+    return {t.lower() for t in TABLE_RE.findall(sql)}
+
+
+def tag_key(backend, table):
+    return f"{KEY_PREFIX}:tag:{backend}:{table.lower()}"
+
+
+def notify_write(backend, *tables):
+    # Hook wołany przez ścieżki zapisu; bez aktywnych cache nic nie robi
+    for cache in list(_caches):
+        if cache.backend == backend:
+            cache.invalidate(*tables)
+
+
+class LocalCache:
+    # LRU z TTL; wartości to (czas wygaśnięcia, wiersze, tabele) — tabele potrzebne, żeby przy
+    # usunięciu wpisu (LRU, TTL, unieważnienie) zdjąć klucz także z pozostałych zbiorów tagów
+    def __init__(self, maxsize=LOCAL_SIZE, ttl=LOCAL_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.tags = {}
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, value, _ = entry
+        if time.monotonic() > expires:
+            self.evict(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, tables):
+        self.evict(key)
+        self.entries[key] = (time.monotonic() + self.ttl, value, tuple(tables))
+        for table in tables:
+            self.tags.setdefault(table, set()).add(key)
+        while len(self.entries) > self.maxsize:
+            self.evict(next(iter(self.entries)))
+
+    def evict(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[2]:
+            keys = self.tags.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[table]
+
+    def invalidate(self, table):
+        for key in list(self.tags.get(table, ())):
+            self.evict(key)
+        self.tags.pop(table, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.tags.clear()
+
+
+class ReadThroughCache:
+    """Cache zapytań adaptera SQL; redis_adapter (decode_responses=False) to tier zdalny, local_size=0 wyłącza tier lokalny."""
+
+    def __init__(self, adapter, redis_adapter=None, local_size=LOCAL_SIZE, local_ttl=LOCAL_TTL,
+                 remote_ttl=REMOTE_TTL, hooks=True):
+        self.adapter = adapter
+        self.backend = adapter.name
+        self.redis = redis_adapter
+        self.local = LocalCache(local_size, local_ttl) if local_size else None
+        self.remote_ttl = remote_ttl
+        self.stats = {"local": 0, "remote": 0, "miss": 0, "invalidations": 0}
+        if hooks:
+            _caches.add(self)
+
+    def get(self, sql, params=None):
+        """Zwraca (wiersze, tier, czas zapisania wpisu); tier: "local", "remote" albo "miss"."""
+        key = cache_key(self.backend, sql, params)
+        if self.local is not None:
+            hit = self.local.get(key)
+            if hit is not None:
+                self.stats["local"] += 1
+                return hit[1], "local", hit[0]
+
+        tables = sql_tables(sql)
+        if self.redis is not None:
+            raw = self.redis.r.get(key)
+            if raw is not None:
+                cached_at, rows = pickle.loads(raw)
+                if self.local is not None:
+                    self.local.set(key, (cached_at, rows), tables)
+                self.stats["remote"] += 1
+                return rows, "remote", cached_at
+
+        rows = self.adapter.query(sql, params)
+        cached_at = time.time()
+        if self.redis is not None:
+            pipe = self.redis.r.pipeline(transaction=False)
+            pipe.set(key, pickle.dumps((cached_at, rows)), ex=self.remote_ttl)
+            for table in tables:
+                pipe.sadd(tag_key(self.backend, table), key)
+                pipe.expire(tag_key(self.backend, table), self.remote_ttl)
+            pipe.execute()
+        if self.local is not None:
+            self.local.set(key, (cached_at, rows), tables)
+        self.stats["miss"] += 1
+        return rows, "miss", cached_at
+
+    def invalidate(self, *tables):
+        self.stats["invalidations"] += 1
+        for table in (t.lower() for t in tables):
+            if self.local is not None:
+                self.local.invalidate(table)
+            if self.redis is not None:
+                tag = tag_key(self.backend, table)
+                keys = self.redis.r.smembers(tag)
+                self.redis.r.delete(tag, *keys)
+
+    def clear(self):
+        if self.local is not None:
+            self.local.clear()
+        if self.redis is not None:
+            keys = list(self.redis.r.scan_iter(match=f"{KEY_PREFIX}:*", count=1000))
+            if keys:
+                self.redis.r.delete(*keys)
+
+    def hit_ratio(self):
+        total = sum(self.stats[t] for t in ("local", "remote", "miss"))
+        return (self.stats["local"] + self.stats["remote"]) / total if total else 0.0
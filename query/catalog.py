@@ -0,0 +1,114 @@
+import json
+import os
+import random
+import re
+
+# Deklaratywny katalog zapytań (catalog.json): dla każdej etykiety szablony "sql" / "mongo" / "redis"
+# z parametrami {nazwa}, typ parametru, wartość domyślna (dawny literał z query_select.py) i generator:
+#   {"choice": [...]}, {"int_range": [lo, hi]} (włącznie), {"uniform": [lo, hi], "round": n}.
+# SQL renderowany jest w stylach:
+#   "text"    — wartości wklejone w tekst zapytania (każde wykonanie to inny tekst),
+#   "format"  — %s + krotka parametrów (wiązanie po stronie klienta: psycopg2, pymysql, mysql-connector),
+#   "numeric" — $1, $2, ... (PREPARE w PostgreSQL),
+#   "qmark"   — ? (PREPARE w MySQL / kursor prepared=True w mysql-connector).
+# Szablon Mongo to filtr, w którym napis "{nazwa}" zastępowany jest wartością z właściwym typem;
+# napis bez parametrów (np. "agg_avg_price") to nazwa potoku z query_select.MONGO_PIPELINES.
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+
+PARAM = re.compile(r"\{(\w+)\}")
+TYPES = {"str": str, "int": int, "float": float}
+
+
+def load_catalog(path=None, tag=None):
+    with open(path or CATALOG_PATH, encoding="utf-8") as file:
+        catalog = json.load(file)
+    if tag is not None:
+        catalog = {label: entry for label, entry in catalog.items() if tag in entry.get("tags", [])}
+    return catalog
+
+
+# === Wartości parametrów ===
+
+def generate(param, rng):
+    generator = param["generator"]
+    if "choice" in generator:
+        value = rng.choice(generator["choice"])
+    elif "int_range" in generator:
+        value = rng.randint(*generator["int_range"])
+    elif "uniform" in generator:
+        value = round(rng.uniform(*generator["uniform"]), generator.get("round", 6))
+    else:
+        raise ValueError(f"Nieznany generator: {generator}")
+    return TYPES[param["type"]](value)
+
+
+def default_values(entry):
+    return {name: TYPES[param["type"]](param["default"]) for name, param in entry["params"].items()}
+
+
+def random_values(entry, rng=None):
+    rng = rng or random
+    return {name: generate(param, rng) for name, param in entry["params"].items()}
+
+
+# === Renderowanie ===
+
+def sql_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def render_sql(template, values, style="text"):
+    """Zwraca (sql, parametry); dla stylu "text" parametry to None."""
+    if style == "text":
+        return PARAM.sub(lambda m: sql_literal(values[m.group(1)]), template), None
+    names = PARAM.findall(template)
+    if style == "format":
+        sql = PARAM.sub("%s", template)
+    elif style == "qmark":
+        sql = PARAM.sub("?", template)
+    elif style == "numeric":
+        # Ten sam parametr użyty kilka razy dostaje kolejne numery
+        counter = iter(range(1, len(names) + 1))
+        sql = PARAM.sub(lambda m: f"${next(counter)}", template)
+    else:
+        raise ValueError(f"Nieznany styl: {style}")
+    return sql, tuple(values[name] for name in names)
+
+
+def render_mongo(spec, values):
+    if isinstance(spec, dict):
+        return {key: render_mongo(value, values) for key, value in spec.items()}
+    if isinstance(spec, list):
+        return [render_mongo(value, values) for value in spec]
+    if isinstance(spec, str):
+        match = PARAM.fullmatch(spec)
+        if match:
+            return values[match.group(1)]
+    return spec
+
+
+def render_redis(template, values):
+    return PARAM.sub(lambda m: str(values[m.group(1)]), template)
+
+
+def render_query(entry, values):
+    """Zapytanie w formacie katalogu query_select.queries: {"sql": ..., "mongo": ..., "redis": ...}."""
+    query = {}
+    if "sql" in entry:
+        query["sql"] = render_sql(entry["sql"], values)[0]
+    if "mongo" in entry:
+        query["mongo"] = render_mongo(entry["mongo"], values)
+    if "redis" in entry:
+        query["redis"] = render_redis(entry["redis"], values)
+    return query
+
+
+def render_queries(catalog, rng=None):
+    # Domyślnie wartości domyślne (stałe zapytania); z rng — losowe wartości z generatorów
+    return {
+        label: render_query(entry, random_values(entry, rng) if rng else default_values(entry))
+        for label, entry in catalog.items()
+    }
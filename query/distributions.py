@@ -0,0 +1,71 @@
+import bisect
+import itertools
+import random
+import threading
+
+# Rozkłady wyboru kluczy dla workloadów mieszanych (indeksy 0..n-1).
+# Atrybut n można zwiększać w trakcie przebiegu (nowe klucze po insertach).
+
+
+class ZipfRanking:
+    # Przypisanie rang Zipfa do indeksów kluczy (permutacja + skumulowane wagi), współdzielone przez wątki:
+    # wszystkie generatory korzystające z jednego rankingu mają ten sam zbiór gorących kluczy.
+    # add() dopisuje nowy klucz (po insercie) w losowym miejscu rankingu, jak scrambled zipfian w YCSB.
+    def __init__(self, n, s=0.99, seed=0, shuffle=True):
+        self.s = s
+        self.rng = random.Random(seed)
+        self.cum_weights = list(itertools.accumulate(1 / (k ** s) for k in range(1, n + 1)))
+        self.ranked = list(range(n))
+        if shuffle:
+            self.rng.shuffle(self.ranked)
+        self.lock = threading.Lock()
+
+    def add(self, index):
+        with self.lock:
+            total = self.cum_weights[-1] if self.cum_weights else 0.0
+            self.ranked.insert(self.rng.randrange(len(self.ranked) + 1), index)
+            self.cum_weights.append(total + 1 / (len(self.cum_weights) + 1) ** self.s)
+
+
+class ZipfGenerator:
+    # Rozkład Zipfa: P(rank k) ~ 1 / k^s; rangi przypisane kluczom losowo (stałe ziarno),
+    # żeby popularne klucze nie były po prostu najniższymi id.
+    # Wspólny ranking (ranking=) dla wielu generatorów — wtedy seed steruje tylko losowaniem próbek
+    def __init__(self, n, s=0.99, seed=0, shuffle=True, ranking=None):
+        self.n = n
+        self.rng = random.Random(seed)
+        self.ranking = ranking or ZipfRanking(n, s, seed, shuffle)
+
+    def rank(self):
+        cum_weights = self.ranking.cum_weights
+        return bisect.bisect_left(cum_weights, self.rng.random() * cum_weights[-1])
+
+    def next(self):
+        ranked = self.ranking.ranked
+        return ranked[min(self.rank(), len(ranked) - 1)]
+
+
+class UniformGenerator:
+    def __init__(self, n, s=None, seed=0):
+        self.n = n
+        self.rng = random.Random(seed)
+
+    def next(self):
+        return self.rng.randrange(self.n)
+
+
+class LatestGenerator:
+    # YCSB "latest": Zipf po wieku klucza — najczęściej najnowsze (ostatnio wstawione) klucze
+    def __init__(self, n, s=0.99, seed=0):
+        self.n = n
+        self.zipf = ZipfGenerator(n, s, seed, shuffle=False)
+
+    def next(self):
+        return max(self.n - 1 - self.zipf.rank(), 0)
+
+
+DISTRIBUTIONS = {
+    "uniform": UniformGenerator,
+    "zipfian": ZipfGenerator,
+    "latest": LatestGenerator,
+}
@@ -0,0 +1,156 @@
+import logging
+from contextlib import contextmanager
+
+from pymongo.write_concern import WriteConcern
+
+from harness import default_adapters
+
+logger = logging.getLogger(__name__)
+
+# Profile trwałości zapisu dla benchmarków zapisu (query_update.py, query_delete.py).
+# Ustawienia są globalne po stronie serwera (wszystkie połączenia, także z pul), a po pomiarze
+# przywracane są wartości sprzed zmiany. Wymagają uprawnień administracyjnych:
+# ALTER SYSTEM (PostgreSQL), SET GLOBAL (MySQL), CONFIG SET (Redis).
+# MongoDB: domyślny write concern serwera (setDefaultRWConcern) działa tylko w replica secie / klastrze,
+# a docker-compose uruchamia samodzielny mongod — w/j podawane są więc per operacja
+# (collection.with_options(write_concern=...), patrz mongo_collection) i nie ma stanu serwera do przywracania.
+#   strict  — fsync przy każdym commicie,
+#   relaxed — okno utraty ~1 s (commit bez czekania na fsync / fsync co sekundę),
+#   none    — bez logu na dysku tam, gdzie się da (PostgreSQL i MongoDB nie mają słabszego
+#             potwierdzanego trybu bez restartu serwera, więc zostają jak w relaxed),
+#   default — ustawienia kontenerów bez zmian.
+
+PROFILES = {
+    "default": {},
+    "strict": {
+        "PostgreSQL": {"synchronous_commit": "on"},
+        "MySQL": {"innodb_flush_log_at_trx_commit": 1, "sync_binlog": 1},
+        "MongoDB": {"w": 1, "j": True},
+        "Redis": {"appendonly": "yes", "appendfsync": "always"},
+    },
+    "relaxed": {
+        "PostgreSQL": {"synchronous_commit": "off"},
+        "MySQL": {"innodb_flush_log_at_trx_commit": 2, "sync_binlog": 0},
+        "MongoDB": {"w": 1, "j": False},
+        "Redis": {"appendonly": "yes", "appendfsync": "everysec"},
+    },
+    "none": {
+        "PostgreSQL": {"synchronous_commit": "off"},
+        "MySQL": {"innodb_flush_log_at_trx_commit": 0, "sync_binlog": 0},
+        "MongoDB": {"w": 1, "j": False},
+        "Redis": {"appendonly": "no"},
+    },
+}
+
+
+# === Odczyt / zapis ustawień ===
+
+def get_postgres(adapter, names):
+    # Wartość z postgresql.auto.conf (None, jeśli ALTER SYSTEM jej nie ustawiał) — przywracamy stan pliku,
+    # a nie bieżącą wartość z postgresql.conf
+    previous = {}
+    for name in names:
+        rows = adapter.query(
+            "SELECT setting FROM pg_file_settings WHERE name = %s AND sourcefile LIKE '%%postgresql.auto.conf' "
+            "ORDER BY seqno DESC LIMIT 1",
+            (name,),
+        )
+        previous[name] = rows[0][0] if rows else None
+    return previous
+
+
+def set_postgres(adapter, settings):
+    # ALTER SYSTEM nie może działać w transakcji
+    adapter.conn.rollback()
+    adapter.conn.autocommit = True
+    try:
+        for name, value in settings.items():
+            if value is None:
+                adapter.cursor.execute(f"ALTER SYSTEM RESET {name}")
+            else:
+                adapter.cursor.execute(f"ALTER SYSTEM SET {name} = %s", (str(value),))
+        adapter.cursor.execute("SELECT pg_reload_conf()")
+    finally:
+        adapter.conn.autocommit = False
+
+
+def get_mysql(adapter, names):
+    return {name: adapter.query(f"SELECT @@GLOBAL.{name}")[0][0] for name in names}
+
+
+def set_mysql(adapter, settings):
+    for name, value in settings.items():
+        adapter.execute(f"SET GLOBAL {name} = %s", (value,))
+
+
+def get_redis(adapter, names):
+    return {name: adapter.r.config_get(name)[name] for name in names}
+
+
+def set_redis(adapter, settings):
+    for name, value in settings.items():
+        adapter.r.config_set(name, value)
+
+
+SETTINGS = {
+    "PostgreSQL": (get_postgres, set_postgres),
+    "MySQL": (get_mysql, set_mysql),
+    "Redis": (get_redis, set_redis),
+}
+
+
+def apply_settings(adapter, settings):
+    """Ustawia profil na serwerze adaptera i zwraca poprzednie wartości (do przywrócenia)."""
+    get, set_ = SETTINGS[adapter.name]
+    previous = get(adapter, list(settings))
+    set_(adapter, settings)
+    return previous
+
+
+@contextmanager
+def durability_profile(name, adapters=None):
+    """Na czas bloku ustawia profil trwałości; zwraca {backend: czy zastosowano}."""
+    profile = PROFILES[name]
+    adapters = adapters or default_adapters()
+    previous = {}
+    applied = {}
+    for adapter in adapters:
+        settings = profile.get(adapter.name)
+        if not settings:
+            applied[adapter.name] = name == "default"
+            continue
+        if adapter.name not in SETTINGS:
+            # Ustawienia per operacja (MongoDB) — stosuje je sam workload
+            applied[adapter.name] = True
+            logger.info(f"{adapter.name}: profil {name}: {settings} (per operacja)")
+            continue
+        try:
+            with adapter:
+                previous[adapter.name] = apply_settings(adapter, settings)
+            applied[adapter.name] = True
+            logger.info(f"{adapter.name}: profil {name}: {settings}")
+        except Exception as e:
+            logger.error(f"{adapter.name}: nie udało się ustawić profilu {name}: {e}")
+            applied[adapter.name] = False
+    try:
+        yield applied
+    finally:
+        for adapter in adapters:
+            if adapter.name not in previous:
+                continue
+            try:
+                with adapter:
+                    SETTINGS[adapter.name][1](adapter, previous[adapter.name])
+            except Exception as e:
+                logger.error(f"{adapter.name}: nie udało się przywrócić ustawień {previous[adapter.name]}: {e}")
+
+
+# === MongoDB: write concern per operacja ===
+
+def write_concern(name):
+    settings = PROFILES[name].get("MongoDB")
+    return WriteConcern(**settings) if settings else None
+
+
+def mongo_collection(adapter, concern):
+    return adapter.collection if concern is None else adapter.collection.with_options(write_concern=concern)
@@ -0,0 +1,332 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Generator syntetycznych danych przejazdów zgodny ze schematem initialize_postgreSQL.sql /
+# initialize_mySQL.sql (Ride -> Price/Time/Weather -> Temperature/ApparentTemperature/Wind/Conditions).
+# Rozkłady wzorowane na zbiorze Uber/Lyft Boston (listopad-grudzień 2018), z którego pochodzą zrzuty.
+# Dane są generowane i zapisywane strumieniowo, przejazd po przejeździe — pamięć jest stała
+# niezależnie od liczby przejazdów (także dla 100M).
+#
+# Wyjście (katalog --out):
+#   <tabela>.tsv          — format tekstowy COPY / LOAD DATA (tabulatory, NULL = \N)
+#   load_postgres.sql     — \copy dla psql + ustawienie sekwencji SERIAL
+#   load_mysql.sql        — LOAD DATA LOCAL INFILE
+#   rides.ndjson          — zagnieżdżone dokumenty dla mongoimport
+#   redis_commands.txt    — protokół RESP dla redis-cli --pipe (JSON.SET ride:<id> $ ...)
+
+BASE_RIDES = 693071  # liczba przejazdów w obecnych zrzutach
+START_DATE = datetime(2018, 11, 26)
+DAYS = 23
+TIMEZONE = "America/New_York"
+
+LOCATIONS = [
+    ("Haymarket Square", 42.3628, -71.0583), ("Back Bay", 42.3503, -71.0810),
+    ("North End", 42.3647, -71.0542), ("North Station", 42.3661, -71.0631),
+    ("Beacon Hill", 42.3588, -71.0707), ("Boston University", 42.3505, -71.1054),
+    ("Fenway", 42.3429, -71.1003), ("South Station", 42.3519, -71.0552),
+    ("Theatre District", 42.3519, -71.0643), ("West End", 42.3644, -71.0661),
+    ("Financial District", 42.3559, -71.0550), ("Northeastern University", 42.3398, -71.0892),
+]
+
+# (nazwa, product_id, opłata bazowa, stawka za milę)
+PRODUCTS = {
+    "Uber": [
+        ("UberPool", "997acbb5-e102-41e1-b155-9df7de0a73f2", 4.5, 1.6),
+        ("UberX", "55c66225-fbe7-4fd5-9072-eab1ece5e23e", 6.0, 2.2),
+        ("WAV", "8cf7e821-f0d3-49c6-8eba-e679c0ebcf6a", 6.0, 2.2),
+        ("UberXL", "6d318bcc-22a3-4af6-bddd-b409bfce1546", 9.5, 3.4),
+        ("Black", "6c84fd89-3f11-4782-9b50-97c468b19529", 14.0, 3.9),
+        ("Black SUV", "6f72dfc5-27f1-42e8-84db-ccc7a75f6969", 24.0, 4.8),
+        ("Taxi", "8cf7e821-f0d3-49c6-8eba-e679c0ebcf6b", None, None),
+    ],
+    "Lyft": [
+        ("Shared", "lyft_line", 3.5, 1.5),
+        ("Lyft", "lyft", 6.0, 2.3),
+        ("Lyft XL", "lyft_plus", 9.5, 3.5),
+        ("Lux", "lyft_premier", 14.0, 4.0),
+        ("Lux Black", "lyft_lux", 18.0, 4.6),
+        ("Lux Black XL", "lyft_luxsuv", 26.0, 5.2),
+    ],
+}
+CAB_WEIGHTS = {"Uber": 0.52, "Lyft": 0.48}
+SURGES = [(1.0, 0.93), (1.25, 0.03), (1.5, 0.02), (1.75, 0.01), (2.0, 0.008), (2.5, 0.0015), (3.0, 0.0005)]
+
+WEATHER_KINDS = [
+    # (ikona, krótki opis, długi opis, szansa opadu, waga)
+    ("partly-cloudy-night", " Partly Cloudy ", " Mostly cloudy throughout the day. ", 0.05, 0.23),
+    ("cloudy", " Overcast ", " Overcast throughout the day. ", 0.1, 0.22),
+    ("partly-cloudy-day", " Mostly Cloudy ", " Partly cloudy throughout the day. ", 0.05, 0.2),
+    ("rain", " Light Rain ", " Light rain in the morning and overnight. ", 0.9, 0.13),
+    ("clear-night", " Clear ", " Partly cloudy until evening. ", 0.0, 0.1),
+    ("fog", " Foggy ", " Foggy in the morning. ", 0.2, 0.06),
+    ("clear-day", " Clear ", " Clear throughout the day. ", 0.0, 0.06),
+]
+
+TABLE_COLUMNS = {
+    "Time": ["id", "timestamp", "hour", "day", "month", "datetime", "timezone"],
+    "Price": ["id", "price", "distance", "surge_multiplier", "latitude", "longitude"],
+    "Wind": ["id", "windSpeed", "windGust", "windGustTime", "windBearing"],
+    "Temperature": ["id", "temperatureHigh", "temperatureHighTime", "temperatureLow", "temperatureLowTime",
+                    "temperatureMin", "temperatureMinTime", "temperatureMax", "temperatureMaxTime"],
+    "ApparentTemperature": ["id", "apparentTemperatureHigh", "apparentTemperatureHighTime",
+                            "apparentTemperatureLow", "apparentTemperatureLowTime",
+                            "apparentTemperatureMin", "apparentTemperatureMinTime",
+                            "apparentTemperatureMax", "apparentTemperatureMaxTime"],
+    "Conditions": ["id", "icon", "dewPoint", "pressure", "windBearing", "cloudCover", "uvIndex",
+                   "visibility", "ozone", "sunriseTime", "sunsetTime", "moonPhase"],
+    "Weather": ["id", "short_summary", "long_summary", "precipIntensity", "precipProbability", "humidity",
+                "visibility", "temperature_id", "apparent_temperature_id", "wind_id", "conditions_id"],
+    "Ride": ["id", "source", "destination", "cab_type", "product_id", "name", "price_id", "time_id", "weather_id"],
+}
+# Kolejność ładowania wynikająca z kluczy obcych
+TABLE_ORDER = ["Time", "Price", "Wind", "Temperature", "ApparentTemperature", "Conditions", "Weather", "Ride"]
+
+REDIS_INDEX = [
+    "FT.CREATE", "rides_index", "ON", "JSON", "PREFIX", "1", "ride:", "SCHEMA",
+    "$.cab_type", "AS", "cab_type", "TEXT", "SORTABLE",
+    "$.source", "AS", "source", "TEXT",
+    "$.price.price", "AS", "price_price", "NUMERIC", "SORTABLE",
+    "$.price.distance", "AS", "price_distance", "NUMERIC",
+    "$.time.month", "AS", "month", "NUMERIC",
+    "$.time.hour", "AS", "time.hour", "NUMERIC", "SORTABLE",
+    "$.weather.temperature.temperatureHigh", "AS", "temp_high", "NUMERIC",
+    "$.weather.wind.windSpeed", "AS", "wind_speed", "NUMERIC",
+    "$.weather.humidity", "AS", "weather_humidity", "NUMERIC",
+]
+
+
+# === Generowanie przejazdów ===
+
+def weighted(rng, items, weights):
+    return rng.choices(items, weights=weights)[0]
+
+
+def fmt_ts(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def gen_ride(rng):
+    """Jeden przejazd jako zagnieżdżony dokument (forma Mongo/RedisJSON)."""
+    source, lat, lon = rng.choice(LOCATIONS)
+    destination = rng.choice([loc for loc in LOCATIONS if loc[0] != source])[0]
+    cab_type = weighted(rng, list(CAB_WEIGHTS), list(CAB_WEIGHTS.values()))
+    name, product_id, base, per_mile = rng.choice(PRODUCTS[cab_type])
+
+    distance = round(min(max(rng.lognormvariate(0.7, 0.45), 0.02), 7.86), 2)
+    surge = weighted(rng, [s for s, _ in SURGES], [w for _, w in SURGES]) if cab_type == "Lyft" else 1.0
+    # Taxi w oryginalnych danych nie ma ceny
+    price = None if base is None else round((base + per_mile * distance) * surge * rng.uniform(0.9, 1.15), 2)
+
+    day_offset = rng.randrange(DAYS)
+    hour = rng.choices(range(24), weights=[3, 2, 1, 1, 1, 2, 3, 5, 6, 5, 4, 4, 5, 5, 5, 5, 6, 7, 6, 5, 5, 4, 4, 3])[0]
+    moment = START_DATE + timedelta(days=day_offset, hours=hour, minutes=rng.randrange(60), seconds=rng.randrange(60))
+    day_start = moment.replace(hour=0, minute=0, second=0)
+
+    icon, short_summary, long_summary, precip_chance, _ = weighted(rng, WEATHER_KINDS, [k[-1] for k in WEATHER_KINDS])
+    temp_high = round(rng.gauss(44, 7), 2)
+    temp_low = round(temp_high - abs(rng.gauss(9, 3)), 2)
+    wind_speed = round(abs(rng.gauss(6, 3.2)), 2)
+    raining = rng.random() < precip_chance
+
+    return {
+        "source": source,
+        "destination": destination,
+        "cab_type": cab_type,
+        "product_id": product_id,
+        "name": name,
+        "price": {
+            "price": price,
+            "distance": distance,
+            "surge_multiplier": surge,
+            "latitude": round(lat + rng.gauss(0, 0.002), 6),
+            "longitude": round(lon + rng.gauss(0, 0.002), 6),
+        },
+        "time": {
+            "timestamp": fmt_ts(moment),
+            "hour": moment.hour,
+            "day": moment.day,
+            "month": moment.month,
+            "datetime": fmt_ts(moment),
+            "timezone": TIMEZONE,
+        },
+        "weather": {
+            "short_summary": short_summary,
+            "long_summary": long_summary,
+            "precipIntensity": round(rng.uniform(0.01, 0.15), 2) if raining else 0.0,
+            "precipProbability": round(rng.uniform(0.5, 1.0), 2) if raining else 0.0,
+            "humidity": round(min(max(rng.gauss(0.74, 0.13), 0.38), 0.96), 2),
+            "visibility": round(min(abs(rng.gauss(8.5, 2.5)), 10.0), 2),
+            "temperature": {
+                "temperatureHigh": temp_high,
+                "temperatureHighTime": fmt_ts(day_start + timedelta(hours=14)),
+                "temperatureLow": temp_low,
+                "temperatureLowTime": fmt_ts(day_start + timedelta(hours=30)),
+                "temperatureMin": round(temp_low - abs(rng.gauss(2, 1)), 2),
+                "temperatureMinTime": fmt_ts(day_start + timedelta(hours=6)),
+                "temperatureMax": round(temp_high + abs(rng.gauss(1, 0.5)), 2),
+                "temperatureMaxTime": fmt_ts(day_start + timedelta(hours=15)),
+            },
+            "apparentTemperature": {
+                "apparentTemperatureHigh": round(temp_high - wind_speed * 0.6, 2),
+                "apparentTemperatureHighTime": fmt_ts(day_start + timedelta(hours=14)),
+                "apparentTemperatureLow": round(temp_low - wind_speed * 0.8, 2),
+                "apparentTemperatureLowTime": fmt_ts(day_start + timedelta(hours=30)),
+                "apparentTemperatureMin": round(temp_low - wind_speed, 2),
+                "apparentTemperatureMinTime": fmt_ts(day_start + timedelta(hours=6)),
+                "apparentTemperatureMax": round(temp_high - wind_speed * 0.4, 2),
+                "apparentTemperatureMaxTime": fmt_ts(day_start + timedelta(hours=15)),
+            },
+            "wind": {
+                "windSpeed": wind_speed,
+                "windGust": round(wind_speed + abs(rng.gauss(3, 2)), 2),
+                "windGustTime": fmt_ts(day_start + timedelta(hours=rng.randrange(24))),
+                "windBearing": rng.randrange(360),
+            },
+            "conditions": {
+                "icon": icon,
+                "dewPoint": round(temp_low - abs(rng.gauss(5, 3)), 2),
+                "pressure": round(rng.gauss(1010, 9), 2),
+                "windBearing": rng.randrange(360),
+                "cloudCover": round(rng.random(), 2),
+                "uvIndex": float(rng.choice([0, 0, 0, 1, 1, 2])),
+                "visibility": round(min(abs(rng.gauss(8.5, 2.5)), 10.0), 2),
+                "ozone": round(rng.gauss(313, 20), 2),
+                "sunriseTime": fmt_ts(day_start + timedelta(hours=6, minutes=50)),
+                "sunsetTime": fmt_ts(day_start + timedelta(hours=16, minutes=13)),
+                "moonPhase": round((day_offset % 30) / 30, 2),
+            },
+        },
+    }
+
+
+def generate_rides(n, seed=0, start_id=1):
+    # Generator (id, dokument) — deterministyczny dla danego ziarna i początku zakresu id,
+    # więc zakresy mogą być generowane niezależnie (np. równolegle)
+    rng = random.Random(f"{seed}:{start_id}")
+    for ride_id in range(start_id, start_id + n):
+        yield ride_id, gen_ride(rng)
+
+
+def sql_rows(ride_id, doc):
+    """Dokument -> wiersze tabel znormalizowanych; wszystkie encje dzielą id przejazdu (relacje 1:1)."""
+    w = doc["weather"]
+    cols = TABLE_COLUMNS
+    return {
+        "Time": [ride_id] + [doc["time"][c] for c in cols["Time"][1:]],
+        "Price": [ride_id] + [doc["price"][c] for c in cols["Price"][1:]],
+        "Wind": [ride_id] + [w["wind"][c] for c in cols["Wind"][1:]],
+        "Temperature": [ride_id] + [w["temperature"][c] for c in cols["Temperature"][1:]],
+        "ApparentTemperature": [ride_id] + [w["apparentTemperature"][c] for c in cols["ApparentTemperature"][1:]],
+        "Conditions": [ride_id] + [w["conditions"][c] for c in cols["Conditions"][1:]],
+        "Weather": [ride_id] + [w[c] for c in cols["Weather"][1:7]] + [ride_id] * 4,
+        "Ride": [ride_id] + [doc[c] for c in cols["Ride"][1:6]] + [ride_id] * 3,
+    }
+
+
+# === Formaty wyjściowe ===
+
+def tsv_line(values):
+    # Format tekstowy COPY / LOAD DATA: NULL jako \N, tabulatory i nowe linie usunięte z wartości
+    out = []
+    for v in values:
+        if v is None:
+            out.append("\\N")
+        else:
+            out.append(str(v).replace("\t", " ").replace("\n", " "))
+    return "\t".join(out) + "\n"
+
+
+def resp_command(*args):
+    parts = [f"*{len(args)}\r\n"]
+    for arg in args:
+        data = str(arg)
+        parts.append(f"${len(data.encode('utf-8'))}\r\n{data}\r\n")
+    return "".join(parts)
+
+
+def redis_key(ride_id):
+    return f"ride:{ride_id}"
+
+
+def write_loaders(out_dir):
+    with open(os.path.join(out_dir, "load_postgres.sql"), "w", encoding="utf-8") as f:
+        f.write("-- psql -f load_postgres.sql (uruchamiać w katalogu z plikami .tsv)\n")
+        for table in TABLE_ORDER:
+            f.write(f"\\copy {table} ({', '.join(TABLE_COLUMNS[table])}) FROM '{table.lower()}.tsv'\n")
+        for table in TABLE_ORDER:
+            f.write(f"SELECT setval(pg_get_serial_sequence('{table.lower()}', 'id'), max(id)) FROM {table};\n")
+
+    with open(os.path.join(out_dir, "load_mysql.sql"), "w", encoding="utf-8") as f:
+        f.write("-- mysql --local-infile=1 < load_mysql.sql (uruchamiać w katalogu z plikami .tsv)\n")
+        f.write("SET FOREIGN_KEY_CHECKS = 0;\n")
+        for table in TABLE_ORDER:
+            f.write(
+                f"LOAD DATA LOCAL INFILE '{table.lower()}.tsv' INTO TABLE {table} "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(TABLE_COLUMNS[table])});\n"
+            )
+        f.write("SET FOREIGN_KEY_CHECKS = 1;\n")
+
+
+def generate(out_dir, n, seed=0, formats=("sql", "mongo", "redis"), redis_index=True):
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    try:
+        if "sql" in formats:
+            for table in TABLE_ORDER:
+                files[table] = open(os.path.join(out_dir, f"{table.lower()}.tsv"), "w", encoding="utf-8")
+            write_loaders(out_dir)
+        if "mongo" in formats:
+            files["mongo"] = open(os.path.join(out_dir, "rides.ndjson"), "w", encoding="utf-8")
+        if "redis" in formats:
+            files["redis"] = open(os.path.join(out_dir, "redis_commands.txt"), "w", encoding="utf-8", newline="")
+            if redis_index:
+                files["redis"].write(resp_command(*REDIS_INDEX))
+
+        start = time.perf_counter()
+        report_every = max(n // 20, 1)
+        for ride_id, doc in generate_rides(n, seed):
+            if "sql" in formats:
+                for table, values in sql_rows(ride_id, doc).items():
+                    files[table].write(tsv_line(values))
+            if "mongo" in formats or "redis" in formats:
+                payload = json.dumps(doc, separators=(",", ":"))
+                if "mongo" in formats:
+                    files["mongo"].write(payload + "\n")
+                if "redis" in formats:
+                    files["redis"].write(resp_command("JSON.SET", redis_key(ride_id), "$", payload))
+            if ride_id % report_every == 0:
+                elapsed = time.perf_counter() - start
+                logger.info(f"{ride_id}/{n} przejazdów ({ride_id / elapsed:.0f}/s)")
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator syntetycznych danych przejazdów")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--rides", type=int, help="liczba przejazdów")
+    group.add_argument("--scale", type=float, default=1.0, help=f"mnożnik względem {BASE_RIDES} przejazdów (np. 10, 100)")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generated"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", default="sql,mongo,redis")
+    parser.add_argument("--no-redis-index", action="store_true", help="bez FT.CREATE rides_index w pliku Redis")
+    args = parser.parse_args()
+
+    n = args.rides if args.rides else math.ceil(BASE_RIDES * args.scale)
+    logger.info(f"Generowanie {n} przejazdów do {args.out}")
+    generate(args.out, n, args.seed, args.formats.split(","), not args.no_redis_index)
+    logger.info("Gotowe")
+
+
+if __name__ == "__main__":
+    main()
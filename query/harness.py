@@ -0,0 +1,382 @@
+import os
+import json
+import time
+import uuid
+import logging
+
+import pymysql.cursors
+import redis
+
+from connections import (
+    get_mysql_conn,
+    get_pg_conn,
+    get_mongo_client,
+    get_redis_conn,
+    get_mysql_pool,
+    get_pg_pool,
+    get_shared_mongo_client,
+    get_redis_pool,
+    MONGO_DB,
+)
+from stats import write_summary_csv, write_timings_csv
+
+logger = logging.getLogger(__name__)
+
+# Katalog na wyniki (CSV, wykresy) — results/ w katalogu głównym repozytorium
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results")
+
+
+def results_path(filename):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    return os.path.join(RESULTS_DIR, filename)
+
+
+# === Adaptery backendów ===
+# Każdy adapter ma ten sam cykl życia: connect -> warm_up -> run_op -> teardown.
+# Operacja (op) to funkcja przyjmująca adapter, np. lambda a: a.query("SELECT 1").
+# Domyślnie (pooled=True) adaptery biorą połączenia ze wspólnych pul z connections.py;
+# pooled=False albo własne kwargs połączenia = nowe połączenie tylko dla tego adaptera.
+
+class BackendAdapter:
+    name = None
+
+    def connect(self):
+        raise NotImplementedError
+
+    def warm_up(self, op, iterations=1, setup=None):
+        for _ in range(iterations):
+            args = (setup(self),) if setup else ()
+            self.run_op(op, *args)
+
+    def run_op(self, op, *args):
+        return op(self, *args)
+
+    def ping(self):
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *exc):
+        self.teardown()
+
+
+class SQLAdapter(BackendAdapter):
+    def __init__(self, pooled=True, **conn_kwargs):
+        self.pooled = pooled and not conn_kwargs
+        self.conn_kwargs = conn_kwargs
+        self.conn = None
+        self.cursor = None
+
+    def open_connection(self):
+        raise NotImplementedError
+
+    def get_pool(self):
+        raise NotImplementedError
+
+    def connect(self):
+        self.conn = self.get_pool().getconn() if self.pooled else self.open_connection()
+        self.cursor = self.conn.cursor()
+        return self
+
+    def ping(self):
+        return self.query("SELECT 1")
+
+    def query(self, sql, params=None):
+        self.cursor.execute(sql, params)
+        return self.cursor.fetchall()
+
+    def execute(self, sql, params=None, commit=True):
+        self.cursor.execute(sql, params)
+        if commit:
+            self.conn.commit()
+        return self.cursor
+
+    def stream(self, sql, params=None, itersize=2000):
+        # Generator wierszy z kursora po stronie serwera (zapytanie wysyłane przy pierwszym next())
+        raise NotImplementedError
+
+    def teardown(self):
+        if self.cursor is not None:
+            self.cursor.close()
+            self.cursor = None
+        if self.conn is not None:
+            if self.pooled:
+                self.get_pool().putconn(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
+
+
+class MySQLAdapter(SQLAdapter):
+    name = "MySQL"
+
+    def open_connection(self):
+        return get_mysql_conn(**self.conn_kwargs)
+
+    def get_pool(self):
+        return get_mysql_pool()
+
+    def stream(self, sql, params=None, itersize=2000):
+        cur = self.conn.cursor(pymysql.cursors.SSCursor)
+        try:
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(itersize)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
+
+class PostgresAdapter(SQLAdapter):
+    name = "PostgreSQL"
+
+    def open_connection(self):
+        return get_pg_conn(**self.conn_kwargs)
+
+    def get_pool(self):
+        return get_pg_pool()
+
+    def stream(self, sql, params=None, itersize=2000):
+        # Nazwany kursor = DECLARE CURSOR po stronie serwera, pobierany paczkami po itersize
+        cur = self.conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cur.itersize = itersize
+        try:
+            cur.execute(sql, params)
+            yield from cur
+        finally:
+            cur.close()
+            self.conn.rollback()
+
+
+class MongoAdapter(BackendAdapter):
+    name = "MongoDB"
+
+    def __init__(self, collection="rides", pooled=True, **client_kwargs):
+        self.collection_name = collection
+        self.pooled = pooled and not client_kwargs
+        self.client_kwargs = client_kwargs
+        self.client = None
+        self.db = None
+        self.collection = None
+
+    def connect(self):
+        self.client = get_shared_mongo_client() if self.pooled else get_mongo_client(**self.client_kwargs)
+        self.db = self.client[MONGO_DB]
+        self.collection = self.db[self.collection_name]
+        return self
+
+    def ping(self):
+        return self.client.admin.command("ping")
+
+    def stream(self, filter=None, batch_size=2000, limit=0):
+        yield from self.collection.find(filter or {}).limit(limit).batch_size(batch_size)
+
+    def teardown(self):
+        if self.client is not None:
+            if not self.pooled:
+                self.client.close()
+            self.client = None
+
+
+class RedisAdapter(BackendAdapter):
+    name = "Redis"
+
+    def __init__(self, decode_responses=True, pooled=True, **conn_kwargs):
+        self.decode_responses = decode_responses
+        self.pooled = pooled and not conn_kwargs
+        self.conn_kwargs = conn_kwargs
+        self.r = None
+
+    def connect(self):
+        if self.pooled:
+            self.r = redis.Redis(connection_pool=get_redis_pool(self.decode_responses))
+        else:
+            self.r = get_redis_conn(decode_responses=self.decode_responses, **self.conn_kwargs)
+        return self
+
+    def ping(self):
+        return self.r.ping()
+
+    def scan_keys(self, match="ride:*", count=1000, limit=None):
+        # Inkrementalny SCAN z podpowiedzią COUNT — w przeciwieństwie do KEYS nie blokuje serwera
+        for i, key in enumerate(self.r.scan_iter(match=match, count=count)):
+            if limit is not None and i >= limit:
+                return
+            yield key
+
+    def search_keys(self, query="*", limit=None, page=1000, index="rides_index"):
+        # FT.SEARCH ... NOCONTENT LIMIT offset num, stronami po page kluczy
+        # (głębokie offsety ogranicza MAXSEARCHRESULTS w konfiguracji RediSearch)
+        offset = 0
+        while limit is None or offset < limit:
+            num = page if limit is None else min(page, limit - offset)
+            keys = self.r.execute_command("FT.SEARCH", index, query, "NOCONTENT", "LIMIT", offset, num)[1:]
+            yield from keys
+            if len(keys) < num:
+                return
+            offset += num
+
+    def enumerate_keys(self, method="scan", limit=None, count=1000):
+        if method == "scan":
+            return self.scan_keys(count=count, limit=limit)
+        if method == "ftsearch":
+            return self.search_keys(limit=limit, page=count)
+        raise ValueError(f"Nieznana metoda enumeracji kluczy: {method}")
+
+    def json_get_chunks(self, keys, chunk_size=1000):
+        # JSON.GET w pipeline'ach po chunk_size kluczy — surowe odpowiedzi, bez dekodowania
+        chunk = []
+        for key in keys:
+            chunk.append(key)
+            if len(chunk) >= chunk_size:
+                yield from self._json_get(chunk)
+                chunk = []
+        if chunk:
+            yield from self._json_get(chunk)
+
+    def _json_get(self, keys):
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.execute_command("JSON.GET", key)
+        return pipe.execute()
+
+    def stream(self, method="scan", limit=None, chunk_size=1000):
+        for data in self.json_get_chunks(self.enumerate_keys(method, limit, chunk_size), chunk_size):
+            if data:
+                yield json.loads(data)
+
+    def teardown(self):
+        if self.r is not None:
+            self.r.close()
+            self.r = None
+
+
+ADAPTERS = {
+    "MySQL": MySQLAdapter,
+    "PostgreSQL": PostgresAdapter,
+    "MongoDB": MongoAdapter,
+    "Redis": RedisAdapter,
+}
+
+
+def default_adapters(**overrides):
+    # overrides: {nazwa_backendu: {kwargs konstruktora}}
+    return [cls(**overrides.get(name, {})) for name, cls in ADAPTERS.items()]
+
+
+# === Silnik benchmarku ===
+# Wszystkie pomiary używają time.perf_counter(), więc wyniki z różnych skryptów są porównywalne.
+
+def split_spec(spec):
+    # Pozycja workloadu to op albo para (op, setup)
+    return spec if isinstance(spec, tuple) else (spec, None)
+
+
+def measure(adapter, op, setup=None):
+    # setup (opcjonalny) wykonuje się poza mierzonym oknem, a jego wynik trafia do op
+    args = (setup(adapter),) if setup else ()
+    start = time.perf_counter()
+    adapter.run_op(op, *args)
+    return time.perf_counter() - start
+
+
+def run_benchmark(adapter, op, repeats=1, warmup=0, setup=None):
+    if warmup:
+        adapter.warm_up(op, warmup, setup)
+    return [measure(adapter, op, setup) for _ in range(repeats)]
+
+
+# BENCH_METRICS=1: metryki serwera (metrics.py) zbierane w każdym run_workload i zapisywane przez save_stats
+COLLECTED_METRICS = {}
+COLLECTED_SAMPLERS = []
+
+
+def start_sampler(adapter):
+    from metrics import MetricsSampler
+    try:
+        return MetricsSampler(type(adapter)).start()
+    except Exception as e:
+        logger.warning(f"{adapter.name}: metryki serwera niedostępne: {e}")
+        return None
+
+
+def sampler_call(sampler, method, label):
+    try:
+        return getattr(sampler, method)(label)
+    except Exception as e:
+        logger.warning(f"{sampler.backend} {label}: błąd migawki metryk: {e}")
+        return None
+
+
+def run_workload(adapters, workload, repeats=1, warmup=0, metrics=None):
+    """Uruchamia workload na wszystkich adapterach.
+
+    workload: {etykieta: {nazwa_backendu: op albo (op, setup)}}
+    Zwraca {etykieta: {nazwa_backendu: [czasy w sekundach] albo None przy błędzie}}.
+    metrics: słownik do wypełnienia przyrostami metryk serwera {etykieta: {backend: {metryka: wartość}}}.
+    """
+    if metrics is None and os.environ.get("BENCH_METRICS") == "1":
+        metrics = COLLECTED_METRICS
+    results = {label: {} for label in workload}
+    for adapter in adapters:
+        try:
+            adapter.connect()
+        except Exception as e:
+            logger.error(f"{adapter.name}: błąd połączenia: {e}")
+            for label in workload:
+                results[label][adapter.name] = None
+            continue
+
+        sampler = start_sampler(adapter) if metrics is not None else None
+        if sampler is not None and metrics is COLLECTED_METRICS:
+            COLLECTED_SAMPLERS.append(sampler)
+        try:
+            for label, ops in workload.items():
+                spec = ops.get(adapter.name)
+                if spec is None:
+                    continue
+                op, setup = split_spec(spec)
+                logger.info(f"{adapter.name}: {label}")
+                if sampler is not None:
+                    sampler_call(sampler, "begin", label)
+                try:
+                    results[label][adapter.name] = run_benchmark(adapter, op, repeats, warmup, setup)
+                except Exception as e:
+                    logger.error(f"{adapter.name} {label}: {e}")
+                    results[label][adapter.name] = None
+                if sampler is not None:
+                    deltas = sampler_call(sampler, "end", label)
+                    if deltas is not None:
+                        metrics.setdefault(label, {})[adapter.name] = deltas
+        finally:
+            adapter.teardown()
+            if sampler is not None:
+                sampler.stop()
+    return results
+
+
+def save_stats(prefix, results, metrics=None):
+    # Zapisuje podsumowanie (min/median/p90/p95/p99/max/stddev/CI) i surowe czasy iteracji;
+    # CSV są nadpisywane, więc przebieg trafia też do historii (history.py)
+    write_timings_csv(results_path(f"{prefix}_timings.csv"), results)
+    summary = write_summary_csv(results_path(f"{prefix}_stats.csv"), results)
+    if metrics is None:
+        metrics = {label: COLLECTED_METRICS[label] for label in results if label in COLLECTED_METRICS}
+    if metrics:
+        from metrics import write_metrics_csv, write_samples_csv
+        write_metrics_csv(results_path(f"{prefix}_metrics.csv"), metrics)
+        if COLLECTED_SAMPLERS:
+            write_samples_csv(results_path(f"{prefix}_metrics_samples.csv"), COLLECTED_SAMPLERS)
+    try:
+        from history import record_run
+        record_run(prefix, results, metrics)
+    except Exception as e:
+        logger.warning(f"Nie udało się zapisać przebiegu do historii: {e}")
+    return summary
@@ -0,0 +1,375 @@
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import re
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from harness import default_adapters, results_path
+from stats import summarize, SUMMARY_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Historia wyników: każdy save_stats() dopisuje przebieg do results/history.sqlite razem z metadanymi
+# (czas, commit git, skrypt i argumenty, rozmiar danych, wersje serwerów, wybrane ustawienia, obrazy
+# z docker-compose.yml). Jeden przebieg na proces — kolejne save_stats() w tym samym skrypcie trafiają
+# do tego samego run_id z innym prefiksem.
+# Porównanie: python history.py compare [--base RUN | --baseline N] [--new RUN]
+# Spowolnienie = mediana wolniejsza o co najmniej THRESHOLD i test Manna-Whitneya (p < ALPHA) na surowych czasach.
+# BENCH_HISTORY=0 wyłącza zapis. Przyrosty metryk serwera (metrics.py, BENCH_METRICS=1) trafiają do tabeli metrics.
+
+HISTORY_DB = "history.sqlite"
+THRESHOLD = 0.10
+ALPHA = 0.05
+BASELINE_RUNS = 5
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    script TEXT,
+    argv TEXT,
+    git_commit TEXT,
+    git_dirty INTEGER,
+    hostname TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER REFERENCES runs(run_id),
+    prefix TEXT,
+    query TEXT,
+    backend TEXT,
+    {summary_columns}
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER REFERENCES runs(run_id),
+    prefix TEXT,
+    query TEXT,
+    backend TEXT,
+    iteration INTEGER,
+    time_ms REAL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER REFERENCES runs(run_id),
+    prefix TEXT,
+    query TEXT,
+    backend TEXT,
+    metric TEXT,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS timings_lookup ON timings (run_id, prefix, query, backend);
+""".format(summary_columns=",\n    ".join(f"{field} REAL" for field in SUMMARY_FIELDS))
+
+SERVER_SETTINGS = {
+    "PostgreSQL": ["shared_buffers", "work_mem", "effective_cache_size", "synchronous_commit", "jit"],
+    "MySQL": ["innodb_buffer_pool_size", "innodb_flush_log_at_trx_commit", "sync_binlog", "sort_buffer_size"],
+    "Redis": ["maxmemory", "appendonly", "appendfsync", "save"],
+}
+
+_run_id = None
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or results_path(HISTORY_DB))
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# === Metadane przebiegu ===
+
+def git_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compose_images():
+    # Obrazy kontenerów (np. mysql:latest) — przy "latest" liczy się i tak wersja serwera niżej
+    try:
+        with open(os.path.join(REPO_DIR, "docker-compose.yml"), encoding="utf-8") as file:
+            return re.findall(r"^\s*image:\s*(\S+)", file.read(), flags=re.MULTILINE)
+    except OSError:
+        return []
+
+
+def server_info(adapter):
+    if adapter.name == "PostgreSQL":
+        return {
+            "version": adapter.query("SHOW server_version")[0][0],
+            "rides": adapter.query("SELECT COUNT(*) FROM Ride")[0][0],
+            "settings": {name: adapter.query(f"SHOW {name}")[0][0] for name in SERVER_SETTINGS["PostgreSQL"]},
+        }
+    if adapter.name == "MySQL":
+        return {
+            "version": adapter.query("SELECT VERSION()")[0][0],
+            "rides": adapter.query("SELECT COUNT(*) FROM Ride")[0][0],
+            "settings": {name: adapter.query(f"SELECT @@GLOBAL.{name}")[0][0] for name in SERVER_SETTINGS["MySQL"]},
+        }
+    if adapter.name == "MongoDB":
+        status = adapter.client.admin.command("serverStatus")
+        return {
+            "version": status["version"],
+            "rides": adapter.collection.estimated_document_count(),
+            "settings": {"storage_engine": status.get("storageEngine", {}).get("name"),
+                         "wiredtiger_cache_bytes": status.get("wiredTiger", {}).get("cache", {})
+                         .get("maximum bytes configured")},
+        }
+    info = adapter.r.info("server")
+    settings = {}
+    for name in SERVER_SETTINGS["Redis"]:
+        settings.update(adapter.r.config_get(name))
+    try:
+        index = adapter.r.execute_command("FT.INFO", "rides_index")
+        rides = int(dict(zip(index[::2], index[1::2]))["num_docs"])
+    except Exception:
+        rides = adapter.r.dbsize()
+    return {"version": info["redis_version"], "rides": rides, "settings": settings}
+
+
+def collect_metadata(adapters=None):
+    commit, dirty = git_info()
+    servers = {}
+    for adapter in adapters or default_adapters():
+        try:
+            with adapter:
+                servers[adapter.name] = server_info(adapter)
+        except Exception as e:
+            servers[adapter.name] = {"error": str(e)}
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "script": os.path.basename(sys.argv[0]),
+        "argv": " ".join(sys.argv[1:]),
+        "git_commit": commit,
+        "git_dirty": dirty,
+        "hostname": socket.gethostname(),
+        "python": platform.python_version(),
+        "images": compose_images(),
+        "servers": servers,
+    }
+
+
+# === Zapis ===
+
+def current_run():
+    # Przebieg zapisywany we własnej, zatwierdzonej transakcji — wycofanie zapisu wyników
+    # nie może zostawić w pamięci run_id, którego nie ma w tabeli runs
+    global _run_id
+    if _run_id is None:
+        meta = collect_metadata()
+        conn = connect()
+        try:
+            with conn:
+                cur = conn.execute(
+                    "INSERT INTO runs (started_at, script, argv, git_commit, git_dirty, hostname, metadata) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (meta["started_at"], meta["script"], meta["argv"], meta["git_commit"], meta["git_dirty"],
+                     meta["hostname"], json.dumps(meta, default=str)),
+                )
+        finally:
+            conn.close()
+        _run_id = cur.lastrowid
+    return _run_id
+
+
+def query_label(label):
+    # Etykiety workloadów nie zawsze są napisami (np. (100, "key_enum") w query_diff_data.py)
+    if isinstance(label, tuple):
+        return "/".join(str(part) for part in label)
+    return str(label)
+
+
+def record_run(prefix, results, metrics=None):
+    """Dopisuje wynik run_workload (query -> backend -> czasy w s) i metryki serwera do historii; zwraca run_id."""
+    if os.environ.get("BENCH_HISTORY", "1") == "0":
+        return None
+    run_id = current_run()
+    with connect() as conn:
+        for label, per_backend in results.items():
+            label = query_label(label)
+            for backend, timings in per_backend.items():
+                if not timings:
+                    continue
+                summary = summarize(timings)
+                conn.execute(
+                    f"INSERT INTO results (run_id, prefix, query, backend, {', '.join(SUMMARY_FIELDS)}) "
+                    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(SUMMARY_FIELDS))})",
+                    (run_id, prefix, label, backend, *(summary[f] for f in SUMMARY_FIELDS)),
+                )
+                conn.executemany(
+                    "INSERT INTO timings (run_id, prefix, query, backend, iteration, time_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, prefix, label, backend, i, t * 1000) for i, t in enumerate(timings, start=1)],
+                )
+        for label, per_backend in (metrics or {}).items():
+            label = query_label(label)
+            for backend, values in per_backend.items():
+                conn.executemany(
+                    "INSERT INTO metrics (run_id, prefix, query, backend, metric, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(run_id, prefix, label, backend, name, value) for name, value in values.items()],
+                )
+    return run_id
+
+
+# === Porównanie ===
+
+def mann_whitney_p(a, b):
+    """Jednostronne p dla hipotezy, że b jest stochastycznie większe od a (przybliżenie normalne z poprawką na remisy)."""
+    n1, n2 = len(a), len(b)
+    if n1 < 2 or n2 < 2:
+        return math.nan
+    ranked = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        t = j - i + 1
+        ties += t ** 3 - t
+        i = j + 1
+    u = sum(r for r, (_, group) in zip(ranks, ranked) if group == 1) - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def load_timings(conn, run_ids):
+    placeholders = ", ".join("?" * len(run_ids))
+    series = {}
+    for prefix, query, backend, time_ms in conn.execute(
+        f"SELECT prefix, query, backend, time_ms FROM timings WHERE run_id IN ({placeholders})", run_ids
+    ):
+        series.setdefault((prefix, query, backend), []).append(time_ms)
+    return series
+
+
+def baseline_runs(conn, new_run, count):
+    # Poprzednie przebiegi tego samego skryptu
+    row = conn.execute("SELECT script FROM runs WHERE run_id = ?", (new_run,)).fetchone()
+    if row is None:
+        return []
+    rows = conn.execute(
+        "SELECT run_id FROM runs WHERE script = ? AND run_id < ? ORDER BY run_id DESC LIMIT ?",
+        (row[0], new_run, count),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def compare(conn, base_runs, new_run, threshold=THRESHOLD, alpha=ALPHA):
+    base = load_timings(conn, base_runs)
+    new = load_timings(conn, [new_run])
+    rows = []
+    for key in sorted(new.keys() & base.keys()):
+        before, after = base[key], new[key]
+        base_median, new_median = statistics.median(before), statistics.median(after)
+        change = new_median / base_median - 1 if base_median else math.nan
+        p = mann_whitney_p(before, after)
+        rows.append({
+            "prefix": key[0],
+            "query": key[1],
+            "backend": key[2],
+            "base_median_ms": base_median,
+            "new_median_ms": new_median,
+            "change": change,
+            "p_value": p,
+            "regression": change >= threshold and p < alpha,
+        })
+    return rows
+
+
+def metadata_diff(conn, base_run, new_run):
+    # Różnice w wersjach serwerów i ustawieniach — pierwsze podejrzane przy regresji
+    base, new = (json.loads(conn.execute("SELECT metadata FROM runs WHERE run_id = ?", (run,)).fetchone()[0])
+                 for run in (base_run, new_run))
+    diff = []
+    for backend in sorted(base["servers"].keys() | new["servers"].keys()):
+        before, after = base["servers"].get(backend, {}), new["servers"].get(backend, {})
+        for field in ("version", "rides"):
+            if before.get(field) != after.get(field):
+                diff.append(f"{backend} {field}: {before.get(field)} -> {after.get(field)}")
+        for name in sorted(before.get("settings", {}).keys() | after.get("settings", {}).keys()):
+            old, cur = before.get("settings", {}).get(name), after.get("settings", {}).get(name)
+            if old != cur:
+                diff.append(f"{backend} {name}: {old} -> {cur}")
+    if base.get("git_commit") != new.get("git_commit"):
+        diff.append(f"git: {base.get('git_commit')} -> {new.get('git_commit')}")
+    return diff
+
+
+def latest_run(conn):
+    row = conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+    return row[0]
+
+
+def list_runs(conn, limit):
+    for run_id, started_at, script, argv, commit, dirty in conn.execute(
+        "SELECT run_id, started_at, script, argv, git_commit, git_dirty FROM runs ORDER BY run_id DESC LIMIT ?",
+        (limit,),
+    ):
+        print(f"{run_id:5d}  {started_at}  {(commit or '-')[:10]}{'*' if dirty else ' '}  {script} {argv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historia wyników benchmarków i wykrywanie regresji")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list", help="ostatnie przebiegi")
+    list_parser.add_argument("--limit", type=int, default=20)
+    cmp_parser = sub.add_parser("compare", help="porównanie przebiegu z innym przebiegiem albo z bazą ostatnich N")
+    cmp_parser.add_argument("--new", type=int, default=None, help="run_id (domyślnie ostatni)")
+    cmp_parser.add_argument("--base", type=int, default=None, help="run_id bazowy")
+    cmp_parser.add_argument("--baseline", type=int, default=BASELINE_RUNS,
+                            help="bez --base: N poprzednich przebiegów tego samego skryptu")
+    cmp_parser.add_argument("--threshold", type=float, default=THRESHOLD, help="minimalny wzrost mediany (0.10 = 10%%)")
+    cmp_parser.add_argument("--alpha", type=float, default=ALPHA)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with connect() as conn:
+        if args.command == "list":
+            list_runs(conn, args.limit)
+            return
+
+        new_run = args.new or latest_run(conn)
+        if new_run is None:
+            logger.error("Brak przebiegów w historii")
+            sys.exit(2)
+        base_runs = [args.base] if args.base else baseline_runs(conn, new_run, args.baseline)
+        if not base_runs:
+            logger.error("Brak przebiegów do porównania")
+            sys.exit(2)
+
+        rows = compare(conn, base_runs, new_run, args.threshold, args.alpha)
+        print(f"Przebieg {new_run} vs {base_runs}")
+        for line in metadata_diff(conn, base_runs[0], new_run):
+            print(f"  zmiana: {line}")
+        for row in rows:
+            flag = "REGRESJA" if row["regression"] else ""
+            print(f"{row['prefix']:24s} {row['query']:32s} {row['backend']:10s} "
+                  f"{row['base_median_ms']:10.3f} -> {row['new_median_ms']:10.3f} ms "
+                  f"{row['change']:+7.1%}  p={row['p_value']:.4f}  {flag}")
+        regressions = [row for row in rows if row["regression"]]
+        print(f"{len(regressions)} regresji na {len(rows)} porównań")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
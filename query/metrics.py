@@ -0,0 +1,215 @@
+import csv
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Metryki po stronie serwera w trakcie benchmarku (obok czasów klienta):
+#   PostgreSQL — pg_stat_database (bieżąca baza) + sumy z pg_stat_statements (jeśli rozszerzenie jest włączone),
+#   MySQL      — SHOW GLOBAL STATUS (bufor InnoDB, blokady wierszy, tmp/sort) + performance_schema
+#                events_statements_summary_global_by_event_type,
+#   MongoDB    — serverStatus (opcounters, cache WiredTiger, queryExecutor) + liczba aktywnych operacji z $currentOp,
+#   Redis      — INFO (commandstats, pamięć, ops/s, trafienia keyspace).
+# Migawka przed i po każdej etykiecie workloadu daje przyrost liczników przypisany do tej etykiety;
+# wątek w tle co INTERVAL s próbkuje wartości chwilowe (GAUGES) — dla nich zapisywane jest maksimum w oknie.
+# Sampler ma własne połączenie (pooled=False), żeby nie zajmować połączeń z puli benchmarku.
+
+INTERVAL = 1.0
+
+GAUGES = {
+    "numbackends", "active_ops", "queued_ops", "cache_bytes", "used_memory", "instantaneous_ops_per_sec",
+    "connected_clients", "Threads_running", "Innodb_buffer_pool_pages_dirty", "Innodb_row_lock_current_waits",
+}
+
+MYSQL_STATUS = [
+    "Innodb_buffer_pool_read_requests", "Innodb_buffer_pool_reads", "Innodb_buffer_pool_pages_dirty",
+    "Innodb_rows_read", "Innodb_row_lock_waits", "Innodb_row_lock_time", "Innodb_row_lock_current_waits",
+    "Innodb_data_read", "Created_tmp_disk_tables", "Created_tmp_tables", "Sort_merge_passes",
+    "Select_scan", "Handler_read_rnd_next", "Threads_running",
+]
+
+REDIS_INFO = [
+    "used_memory", "instantaneous_ops_per_sec", "total_commands_processed", "keyspace_hits", "keyspace_misses",
+    "connected_clients", "total_net_output_bytes",
+]
+
+
+# === Migawki ===
+
+def snapshot_postgres(adapter):
+    row = adapter.query("""
+        SELECT numbackends, xact_commit, xact_rollback, blks_read, blks_hit, tup_returned, tup_fetched,
+               temp_files, temp_bytes, deadlocks, blk_read_time
+        FROM pg_stat_database WHERE datname = current_database()
+    """)[0]
+    names = ["numbackends", "xact_commit", "xact_rollback", "blks_read", "blks_hit", "tup_returned",
+             "tup_fetched", "temp_files", "temp_bytes", "deadlocks", "blk_read_time"]
+    values = dict(zip(names, row))
+    try:
+        row = adapter.query("""
+            SELECT SUM(calls), SUM(total_exec_time), SUM(rows), SUM(shared_blks_hit), SUM(shared_blks_read),
+                   SUM(temp_blks_written)
+            FROM pg_stat_statements WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+        """)[0]
+        values.update(zip(["stmt_calls", "stmt_exec_ms", "stmt_rows", "stmt_shared_blks_hit",
+                           "stmt_shared_blks_read", "stmt_temp_blks_written"], row))
+    except Exception:
+        # Brak pg_stat_statements w shared_preload_libraries / CREATE EXTENSION
+        adapter.conn.rollback()
+    # Widoki statystyk są buforowane do końca transakcji
+    adapter.conn.rollback()
+    return values
+
+
+def snapshot_mysql(adapter):
+    placeholders = ", ".join(["%s"] * len(MYSQL_STATUS))
+    values = {name: value for name, value in adapter.query(
+        f"SELECT VARIABLE_NAME, VARIABLE_VALUE FROM performance_schema.global_status WHERE VARIABLE_NAME IN ({placeholders})",
+        MYSQL_STATUS,
+    )}
+    row = adapter.query("""
+        SELECT SUM(COUNT_STAR), SUM(SUM_TIMER_WAIT) / 1e9, SUM(SUM_LOCK_TIME) / 1e9, SUM(SUM_ROWS_EXAMINED),
+               SUM(SUM_ROWS_SENT), SUM(SUM_CREATED_TMP_DISK_TABLES), SUM(SUM_NO_INDEX_USED)
+        FROM performance_schema.events_statements_summary_global_by_event_type
+    """)[0]
+    values.update(zip(["stmt_count", "stmt_wait_ms", "stmt_lock_ms", "stmt_rows_examined", "stmt_rows_sent",
+                       "stmt_tmp_disk_tables", "stmt_no_index_used"], row))
+    return values
+
+
+def snapshot_mongo(adapter):
+    status = adapter.client.admin.command("serverStatus")
+    values = {f"op_{name}": count for name, count in status["opcounters"].items()}
+    cache = status.get("wiredTiger", {}).get("cache", {})
+    values["cache_bytes"] = cache.get("bytes currently in the cache")
+    values["cache_pages_read"] = cache.get("pages read into cache")
+    values["cache_bytes_read"] = cache.get("bytes read into cache")
+    executor = status.get("metrics", {}).get("queryExecutor", {})
+    values["keys_examined"] = executor.get("scanned")
+    values["docs_examined"] = executor.get("scannedObjects")
+    values["docs_returned"] = status.get("metrics", {}).get("document", {}).get("returned")
+    values["queued_ops"] = status.get("globalLock", {}).get("currentQueue", {}).get("total")
+    ops = adapter.client.admin.aggregate([{"$currentOp": {"idleConnections": False}}, {"$match": {"active": True}}])
+    values["active_ops"] = sum(1 for _ in ops)
+    return values
+
+
+def snapshot_redis(adapter):
+    info = adapter.r.info("all")
+    values = {name: info.get(name) for name in REDIS_INFO}
+    for name, stats in info.items():
+        # redis-py rozbija commandstats na słowniki cmdstat_<komenda>: {calls, usec, ...}
+        if name.startswith("cmdstat_"):
+            values[f"{name}_calls"] = stats.get("calls")
+            values[f"{name}_usec"] = stats.get("usec")
+    return values
+
+
+SNAPSHOTS = {
+    "PostgreSQL": snapshot_postgres,
+    "MySQL": snapshot_mysql,
+    "MongoDB": snapshot_mongo,
+    "Redis": snapshot_redis,
+}
+
+
+def numeric(values):
+    out = {}
+    for name, value in values.items():
+        try:
+            out[name] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def delta(before, after):
+    return {name: after[name] - before.get(name, 0.0) for name in after if name not in GAUGES}
+
+
+# === Sampler ===
+
+class MetricsSampler:
+    """Próbkuje metryki jednego backendu w tle; begin(label)/end(label) wyznaczają okna etykiet."""
+
+    def __init__(self, adapter_cls, interval=INTERVAL):
+        self.adapter = adapter_cls(pooled=False)
+        self.backend = self.adapter.name
+        self.interval = interval
+        self.samples = []
+        self.deltas = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._label = None
+        self._before = None
+        self._peaks = {}
+        self._started = None
+
+    def snapshot(self):
+        with self._lock:
+            return numeric(SNAPSHOTS[self.backend](self.adapter))
+
+    def start(self):
+        self.adapter.connect()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"metrics-{self.backend}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                values = self.snapshot()
+            except Exception as e:
+                logger.warning(f"{self.backend}: błąd próbkowania metryk: {e}")
+                continue
+            label = self._label
+            self.samples.append((time.perf_counter() - self._started, label, values))
+            if label is not None:
+                for name in GAUGES & values.keys():
+                    self._peaks[name] = max(self._peaks.get(name, values[name]), values[name])
+
+    def begin(self, label):
+        self._before = self.snapshot()
+        self._peaks = {name: self._before[name] for name in GAUGES & self._before.keys()}
+        self._label = label
+
+    def end(self, label):
+        after = self.snapshot()
+        self._label = None
+        for name in GAUGES & after.keys():
+            self._peaks[name] = max(self._peaks.get(name, after[name]), after[name])
+        # Migawki samplera też są zapytaniami — w przyrostach liczników PostgreSQL/MySQL są po 1-2 wywołania więcej
+        self.deltas[label] = {**delta(self._before, after), **{f"{name}_max": v for name, v in self._peaks.items()}}
+        return self.deltas[label]
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.adapter.teardown()
+
+
+# === Zapis ===
+
+def write_metrics_csv(path, metrics):
+    # metrics: {etykieta: {backend: {metryka: wartość}}}, format "długi" jak *_timings.csv
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["query", "backend", "metric", "value"])
+        for label, per_backend in metrics.items():
+            for backend, values in per_backend.items():
+                for name, value in sorted(values.items()):
+                    writer.writerow([label, backend, name, value])
+
+
+def write_samples_csv(path, samplers):
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["backend", "elapsed_s", "query", "metric", "value"])
+        for sampler in samplers:
+            for elapsed, label, values in sampler.samples:
+                for name, value in sorted(values.items()):
+                    writer.writerow([sampler.backend, round(elapsed, 3), label, name, value])
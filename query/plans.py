@@ -0,0 +1,188 @@
+import csv
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Pobieranie planów wykonania zapytań z katalogu (query_select.queries) dla każdego backendu.
+# analyze=True wykonuje zapytanie i zbiera rzeczywiste statystyki:
+# PostgreSQL EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), MySQL EXPLAIN ANALYZE,
+# Mongo explain("executionStats"), RediSearch FT.PROFILE.
+
+PLAN_FIELDS = ["query", "backend", "full_scan", "sort_spill", "index_used", "plan_file"]
+
+
+def sql_text(q):
+    return q["sql"].strip().rstrip(";")
+
+
+def explain_postgres(adapter, q, analyze=False):
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    return adapter.query(f"EXPLAIN ({options}) {sql_text(q)}")[0][0]
+
+
+def mysql_sort_merge_passes(adapter):
+    return int(adapter.query("SHOW SESSION STATUS LIKE 'Sort_merge_passes'")[0][1])
+
+
+def explain_mysql(adapter, q, analyze=False):
+    if not analyze:
+        return json.loads(adapter.query(f"EXPLAIN FORMAT=JSON {sql_text(q)}")[0][0])
+    # EXPLAIN ANALYZE (drzewo tekstowe) nie pokazuje zrzutu sortowania na dysk —
+    # przyrost Sort_merge_passes w sesji oznacza sortowanie z plikami tymczasowymi
+    passes = mysql_sort_merge_passes(adapter)
+    tree = adapter.query(f"EXPLAIN ANALYZE {sql_text(q)}")[0][0]
+    return {"tree": tree, "sort_merge_passes": mysql_sort_merge_passes(adapter) - passes}
+
+
+def explain_mongo(adapter, q, analyze=False):
+    from query_select import MONGO_PIPELINES
+    if isinstance(q["mongo"], dict):
+        cmd = {"find": adapter.collection_name, "filter": q["mongo"]}
+    else:
+        cmd = {"aggregate": adapter.collection_name, "pipeline": MONGO_PIPELINES[q["mongo"]], "cursor": {}}
+    return adapter.db.command("explain", cmd, verbosity="executionStats" if analyze else "queryPlanner")
+
+
+def to_plain(value):
+    # Odpowiedź FT.PROFILE (zagnieżdżone listy, bajty) -> struktura serializowalna do JSON
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, (list, tuple)):
+        return [to_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {to_plain(k): to_plain(v) for k, v in value.items()}
+    return value
+
+
+def explain_redis(adapter, q, analyze=False):
+    # FT.PROFILE zawsze wykonuje zapytanie
+    from query_select import REDIS_AGGREGATES, redis_search_command
+    if "agg" in q["redis"]:
+        _, index, query, *rest = REDIS_AGGREGATES[q["redis"]]
+        cmd = ["FT.PROFILE", index, "AGGREGATE", "QUERY", query, *rest]
+    else:
+        _, index, query, *rest = redis_search_command(q["redis"])
+        cmd = ["FT.PROFILE", index, "SEARCH", "QUERY", query, *rest]
+    return to_plain(adapter.r.execute_command(*cmd))
+
+
+EXPLAIN = {
+    "PostgreSQL": explain_postgres,
+    "MySQL": explain_mysql,
+    "MongoDB": explain_mongo,
+    "Redis": explain_redis,
+}
+
+
+def explain(adapter, q, analyze=False):
+    return EXPLAIN[adapter.name](adapter, q, analyze)
+
+
+def walk(plan):
+    # Wszystkie słowniki w zagnieżdżonym planie (JSON z EXPLAIN / explain())
+    if isinstance(plan, dict):
+        yield plan
+        for value in plan.values():
+            yield from walk(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from walk(item)
+
+
+def flatten(plan):
+    # Wszystkie wartości tekstowe planu (dla FT.PROFILE i drzewa MySQL)
+    if isinstance(plan, dict):
+        for value in plan.values():
+            yield from flatten(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from flatten(item)
+    elif isinstance(plan, str):
+        yield plan
+
+
+def uses_index(backend, plan):
+    if backend == "MySQL" and isinstance(plan, dict) and "tree" in plan:
+        return any(s in plan["tree"] for s in ("Index lookup", "Index range scan", "Covering index", "Index scan"))
+    if backend == "Redis":
+        return not full_scan(backend, plan)
+    for node in walk(plan):
+        if backend == "PostgreSQL" and "Index" in node.get("Node Type", ""):
+            return True
+        if backend == "MySQL" and node.get("access_type") not in (None, "ALL") and "key" in node:
+            return True
+        if backend == "MongoDB" and node.get("stage") in ("IXSCAN", "COUNT_SCAN", "DISTINCT_SCAN"):
+            return True
+    return False
+
+
+def full_scan(backend, plan):
+    if backend == "MySQL" and isinstance(plan, dict) and "tree" in plan:
+        return "Table scan on" in plan["tree"]
+    if backend == "Redis":
+        return any(s == "WILDCARD" for s in flatten(plan))
+    for node in walk(plan):
+        if backend == "PostgreSQL" and node.get("Node Type") == "Seq Scan":
+            return True
+        if backend == "MySQL" and node.get("access_type") == "ALL":
+            return True
+        if backend == "MongoDB" and node.get("stage") == "COLLSCAN":
+            return True
+    return False
+
+
+def sort_spill(backend, plan):
+    if backend == "MySQL":
+        return isinstance(plan, dict) and plan.get("sort_merge_passes", 0) > 0
+    for node in walk(plan):
+        if backend == "PostgreSQL" and (
+            node.get("Sort Space Type") == "Disk" or "external" in node.get("Sort Method", "")
+        ):
+            return True
+        if backend == "MongoDB" and node.get("usedDisk") is True:
+            return True
+    return False
+
+
+def plan_flags(backend, plan):
+    return {
+        "full_scan": full_scan(backend, plan),
+        "sort_spill": sort_spill(backend, plan),
+        "index_used": uses_index(backend, plan),
+    }
+
+
+def capture_plans(adapter, queries, plan_dir, analyze=True):
+    """Zapisuje plan każdego zapytania do plan_dir/<etykieta>/<backend>.json i zwraca wiersze z flagami."""
+    rows = []
+    for label, q in queries.items():
+        try:
+            plan = explain(adapter, q, analyze)
+        except Exception as e:
+            logger.error(f"{adapter.name} {label}: nie udało się pobrać planu: {e}")
+            if hasattr(adapter, "conn"):
+                adapter.conn.rollback()
+            continue
+        path = os.path.join(plan_dir, label, f"{adapter.name}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=2, default=str)
+        flags = plan_flags(adapter.name, plan)
+        if flags["full_scan"] or flags["sort_spill"]:
+            logger.warning(
+                f"{adapter.name} {label}: "
+                + ", ".join(name for name in ("full_scan", "sort_spill") if flags[name])
+            )
+        rows.append({"query": label, "backend": adapter.name, **flags, "plan_file": os.path.relpath(path, plan_dir)})
+    if hasattr(adapter, "conn"):
+        adapter.conn.rollback()
+    return rows
+
+
+def write_plans_csv(path, rows):
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=PLAN_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
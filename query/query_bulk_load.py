@@ -0,0 +1,236 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_data import TABLE_COLUMNS, TABLE_ORDER, generate_rides, sql_rows, tsv_line, redis_key, BASE_RIDES
+from harness import ADAPTERS, results_path
+from query_indexes import drop_indexes, create_indexes
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Równoległy loader danych z generate_data.py z pomiarem przepustowości ładowania.
+# Każdy proces roboczy generuje swoją paczkę przejazdów (poza pomiarem) i zapisuje ją:
+#   PostgreSQL — COPY FROM STDIN dla każdej z 8 tabel, MySQL — wielowierszowe INSERT (executemany),
+#   MongoDB — insert_many(ordered=False), Redis — pipeline JSON.SET.
+# Opcjonalnie klucze obce i indeksy (zestaw z query_indexes.py) są zdejmowane przed ładowaniem
+# i odtwarzane po nim (tylko te, które istniały) — czas odbudowy raportowany osobno.
+# Nowe przejazdy dostają id za istniejącymi danymi (SQL: MAX(id), MongoDB: liczbowe _id, Redis: klucze ride:<id>).
+
+WORKERS = 4
+CHUNK_SIZE = 10000
+BACKENDS = ["PostgreSQL", "MySQL", "MongoDB", "Redis"]
+
+FIELDS = ["backend", "rides", "workers", "chunk_size", "deferred", "wall_s", "write_s",
+          "rows_per_s", "write_rows_per_s", "fk_rebuild_s", "index_rebuild_s", "total_s"]
+
+
+# === Zapis jednej paczki (w procesie roboczym) ===
+
+def write_postgres(adapter, rides):
+    tables = {table: [] for table in TABLE_ORDER}
+    for ride_id, doc in rides:
+        for table, values in sql_rows(ride_id, doc).items():
+            tables[table].append(tsv_line(values))
+    start = time.perf_counter()
+    for table in TABLE_ORDER:
+        buf = io.StringIO("".join(tables[table]))
+        adapter.cursor.copy_expert(f"COPY {table} ({', '.join(TABLE_COLUMNS[table])}) FROM STDIN", buf)
+    adapter.conn.commit()
+    return time.perf_counter() - start
+
+
+def write_mysql(adapter, rides):
+    tables = {table: [] for table in TABLE_ORDER}
+    for ride_id, doc in rides:
+        for table, values in sql_rows(ride_id, doc).items():
+            tables[table].append(values)
+    start = time.perf_counter()
+    for table in TABLE_ORDER:
+        columns = TABLE_COLUMNS[table]
+        adapter.cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+            tables[table],
+        )
+    adapter.conn.commit()
+    return time.perf_counter() - start
+
+
+def write_mongo(adapter, rides):
+    # _id = id przejazdu, jak klucze ride:<id> w Redis — next_id() może wtedy wznowić numerację
+    docs = [{"_id": ride_id, **doc} for ride_id, doc in rides]
+    start = time.perf_counter()
+    adapter.collection.insert_many(docs, ordered=False)
+    return time.perf_counter() - start
+
+
+def write_redis(adapter, rides):
+    payloads = [(redis_key(ride_id), json.dumps(doc, separators=(",", ":"))) for ride_id, doc in rides]
+    start = time.perf_counter()
+    pipe = adapter.r.pipeline(transaction=False)
+    for key, payload in payloads:
+        pipe.execute_command("JSON.SET", key, "$", payload)
+    pipe.execute()
+    return time.perf_counter() - start
+
+
+WRITERS = {
+    "PostgreSQL": write_postgres,
+    "MySQL": write_mysql,
+    "MongoDB": write_mongo,
+    "Redis": write_redis,
+}
+
+
+def load_worker(backend, ranges, seed, defer):
+    # ranges: lista (start_id, liczba) paczek przydzielonych do tego procesu
+    adapter = ADAPTERS[backend](pooled=False)
+    adapter.connect()
+    try:
+        if backend == "MySQL" and defer:
+            # Sesyjne wyłączenie kontroli FK — MySQL nie sprawdza ich ponownie po włączeniu
+            adapter.execute("SET FOREIGN_KEY_CHECKS = 0, UNIQUE_CHECKS = 0")
+        write_s = 0.0
+        for start_id, count in ranges:
+            rides = list(generate_rides(count, seed, start_id))
+            write_s += WRITERS[backend](adapter, rides)
+    finally:
+        adapter.teardown()
+    return write_s
+
+
+# === Klucze obce PostgreSQL ===
+
+def pg_foreign_keys(adapter):
+    return adapter.query(
+        "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE contype = 'f' AND connamespace = 'public'::regnamespace"
+    )
+
+
+def pg_drop_foreign_keys(adapter, fks):
+    for table, name, _ in fks:
+        adapter.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+
+
+def pg_add_foreign_keys(adapter, fks):
+    for table, name, definition in fks:
+        adapter.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+def next_id(adapter):
+    # Ładujemy za istniejącymi danymi, żeby nie kolidować z kluczami głównymi
+    if adapter.name in ("PostgreSQL", "MySQL"):
+        return max((adapter.query(f"SELECT COALESCE(MAX(id), 0) FROM {table}")[0][0] for table in TABLE_ORDER)) + 1
+    if adapter.name == "MongoDB":
+        # Dokumenty z generate_data.py mają ObjectId — liczy się tylko liczbowe _id z poprzednich ładowań
+        doc = adapter.collection.find_one({"_id": {"$type": "number"}}, {"_id": 1}, sort=[("_id", -1)])
+        return int(doc["_id"]) + 1 if doc else 1
+    ids = (key.decode() if isinstance(key, bytes) else key for key in adapter.scan_keys(match=redis_key("*")))
+    return max((int(suffix) for _, suffix in (k.split(":", 1) for k in ids) if suffix.isdigit()), default=0) + 1
+
+
+def reset_sequences(adapter):
+    for table in TABLE_ORDER:
+        adapter.query(f"SELECT setval(pg_get_serial_sequence('{table.lower()}', 'id'), max(id)) FROM {table}")
+    adapter.conn.commit()
+
+
+# === Przebieg dla jednego backendu ===
+
+def load_backend(backend, rides, workers, chunk_size, seed, defer):
+    adapter = ADAPTERS[backend]()
+    fks = []
+    dropped = []
+    with adapter:
+        first_id = next_id(adapter)
+        if defer:
+            if backend == "PostgreSQL":
+                fks = pg_foreign_keys(adapter)
+                pg_drop_foreign_keys(adapter, fks)
+            if backend != "Redis":
+                dropped = drop_indexes(adapter)
+
+    chunks = [(first_id + i, min(chunk_size, rides - i)) for i in range(0, rides, chunk_size)]
+    # Paczki rozdzielane round-robin między procesy
+    assignments = [chunks[w::workers] for w in range(workers)]
+
+    fk_rebuild = index_rebuild = 0.0
+    # FK i indeksy odtwarzane także wtedy, gdy któryś proces roboczy się wywróci — inaczej kolejne
+    # benchmarki działałyby na schemacie bez nich
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(load_worker, backend, ranges, seed, defer) for ranges in assignments if ranges]
+            write_times = [f.result() for f in futures]
+        wall = time.perf_counter() - start
+    finally:
+        with adapter:
+            if backend == "PostgreSQL":
+                reset_sequences(adapter)
+            if fks:
+                t0 = time.perf_counter()
+                pg_add_foreign_keys(adapter, fks)
+                fk_rebuild = time.perf_counter() - t0
+            if dropped:
+                # Odtwarzamy tylko indeksy, które faktycznie istniały przed ładowaniem
+                t0 = time.perf_counter()
+                create_indexes(adapter, dropped)
+                index_rebuild = time.perf_counter() - t0
+
+    # Procesy piszą równolegle, więc czas zapisu wyznacza najwolniejszy z nich; rows_per_s liczone
+    # od czasu ściany (z uruchomieniem procesów i generowaniem paczek), write_rows_per_s — od samego zapisu
+    write_s = max(write_times) if write_times else 0.0
+    return {
+        "backend": backend,
+        "rides": rides,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "deferred": defer,
+        "wall_s": wall,
+        "write_s": write_s,
+        "rows_per_s": rides / wall if wall else math.nan,
+        "write_rows_per_s": rides / write_s if write_s else math.nan,
+        "fk_rebuild_s": fk_rebuild,
+        "index_rebuild_s": index_rebuild,
+        "total_s": wall + fk_rebuild + index_rebuild,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Równoległe ładowanie danych z pomiarem przepustowości")
+    parser.add_argument("--rides", type=int, default=BASE_RIDES)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--defer", action="store_true",
+                        help="zdejmij FK i indeksy przed ładowaniem, odtwórz po nim")
+    args = parser.parse_args()
+
+    rows = []
+    for backend in args.backends.split(","):
+        logger.info(f"{backend}: ładowanie {args.rides} przejazdów ({args.workers} procesów, paczki po {args.chunk_size})")
+        try:
+            row = load_backend(backend, args.rides, args.workers, args.chunk_size, args.seed, args.defer)
+        except Exception as e:
+            logger.error(f"{backend}: {e}")
+            continue
+        logger.info(f"{backend}: {row['rows_per_s']:.0f} przejazdów/s, łącznie {row['total_s']:.1f} s")
+        rows.append(row)
+
+    with open(results_path("query_bulk_load_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    print("Wyniki zapisane do results/query_bulk_load_results.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import random
+import statistics
+import uuid
+
+import matplotlib.pyplot as plt
+from psycopg2.extras import execute_values
+from pymongo import InsertOne
+
+from harness import default_adapters, run_workload, results_path, save_stats
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Zapis wsadowy: ROWS_PER_RUN wierszy zapisywanych paczkami po batch_size,
+# z jednym commitem / jednym round-tripem na paczkę. Wynik: wiersze/s vs rozmiar paczki.
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+ROWS_PER_RUN = 10000
+REPEATS = 3
+
+# Znacznik wierszy testowych (surge_multiplier nie bywa ujemny w danych), czyszczony poza pomiarem
+TEST_SURGE = -1
+MONGO_TEST_SOURCE = "bulk_test"
+REDIS_TEST_PREFIX = "ride:bulk:"
+
+PRICE_COLUMNS = "price, distance, surge_multiplier, latitude, longitude"
+INSERT_PRICE_SQL = f"INSERT INTO Price ({PRICE_COLUMNS}) VALUES (%s, %s, %s, %s, %s)"
+
+
+# === Generowanie danych (poza mierzonym oknem) ===
+
+def price_row():
+    return (
+        round(random.uniform(3, 90), 2),
+        round(random.uniform(0.1, 8), 2),
+        TEST_SURGE,
+        round(random.uniform(42.2, 42.4), 6),
+        round(random.uniform(-71.2, -71.0), 6),
+    )
+
+def ride_doc():
+    price, distance, surge, lat, lon = price_row()
+    return {
+        "source": MONGO_TEST_SOURCE, "destination": "test", "cab_type": "test",
+        "product_id": "test", "name": "test",
+        "price": {"price": price, "distance": distance, "surge_multiplier": surge,
+                  "latitude": lat, "longitude": lon},
+    }
+
+def batched(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# === Czyszczenie wierszy testowych ===
+
+def sql_cleanup(a):
+    a.execute("DELETE FROM Price WHERE surge_multiplier = %s", (TEST_SURGE,))
+
+def mongo_cleanup(a):
+    a.collection.delete_many({"source": MONGO_TEST_SOURCE})
+
+def redis_cleanup(a):
+    keys = list(a.scan_keys(match=REDIS_TEST_PREFIX + "*"))
+    for chunk in batched(keys, 1000):
+        a.r.unlink(*chunk)
+
+CLEANUP = {
+    "MySQL": sql_cleanup,
+    "PostgreSQL": sql_cleanup,
+    "MongoDB": mongo_cleanup,
+    "Redis": redis_cleanup,
+}
+
+
+def setup_factory(cleanup, make_item, batch_size):
+    def setup(a):
+        cleanup(a)
+        return batched([make_item() for _ in range(ROWS_PER_RUN)], batch_size)
+    return setup
+
+def redis_item():
+    return REDIS_TEST_PREFIX + uuid.uuid4().hex, json.dumps(ride_doc())
+
+
+# === PostgreSQL ===
+
+def pg_executemany(a, batches):
+    for batch in batches:
+        a.cursor.executemany(INSERT_PRICE_SQL, batch)
+        a.conn.commit()
+
+def pg_execute_values(a, batches):
+    for batch in batches:
+        execute_values(a.cursor, f"INSERT INTO Price ({PRICE_COLUMNS}) VALUES %s", batch, page_size=len(batch))
+        a.conn.commit()
+
+def pg_copy(a, batches):
+    for batch in batches:
+        buf = io.StringIO("".join("\t".join(map(str, row)) + "\n" for row in batch))
+        a.cursor.copy_expert(f"COPY Price ({PRICE_COLUMNS}) FROM STDIN", buf)
+        a.conn.commit()
+
+
+# === MySQL ===
+
+def mysql_executemany(a, batches):
+    # pymysql przepisuje executemany dla INSERT ... VALUES na wielowierszowy INSERT
+    for batch in batches:
+        a.cursor.executemany(INSERT_PRICE_SQL, batch)
+        a.conn.commit()
+
+def mysql_multirow_insert(a, batches):
+    for batch in batches:
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))
+        params = [value for row in batch for value in row]
+        a.cursor.execute(f"INSERT INTO Price ({PRICE_COLUMNS}) VALUES {placeholders}", params)
+        a.conn.commit()
+
+
+# === MongoDB ===
+
+def mongo_insert_many(a, batches):
+    for batch in batches:
+        a.collection.insert_many(batch, ordered=False)
+
+def mongo_bulk_write(a, batches):
+    for batch in batches:
+        a.collection.bulk_write([InsertOne(doc) for doc in batch], ordered=False)
+
+
+# === Redis ===
+
+def redis_pipeline(a, batches):
+    for batch in batches:
+        pipe = a.r.pipeline(transaction=False)
+        for key, doc in batch:
+            pipe.execute_command("JSON.SET", key, "$", doc)
+        pipe.execute()
+
+def redis_json_mset(a, batches):
+    # JSON.MSET wymaga RedisJSON >= 2.6
+    for batch in batches:
+        args = [arg for key, doc in batch for arg in (key, "$", doc)]
+        a.r.execute_command("JSON.MSET", *args)
+
+
+BULK_METHODS = {
+    "PostgreSQL": {
+        "executemany": pg_executemany,
+        "execute_values": pg_execute_values,
+        "copy": pg_copy,
+    },
+    "MySQL": {
+        "executemany": mysql_executemany,
+        "multirow_insert": mysql_multirow_insert,
+    },
+    "MongoDB": {
+        "insert_many": mongo_insert_many,
+        "bulk_write": mongo_bulk_write,
+    },
+    "Redis": {
+        "pipeline": redis_pipeline,
+        "json_mset": redis_json_mset,
+    },
+}
+
+ITEM_FACTORIES = {
+    "PostgreSQL": price_row,
+    "MySQL": price_row,
+    "MongoDB": ride_doc,
+    "Redis": redis_item,
+}
+
+
+def bulk_workload(batch_sizes):
+    workload = {}
+    for backend, methods in BULK_METHODS.items():
+        for method, op in methods.items():
+            for batch_size in batch_sizes:
+                setup = setup_factory(CLEANUP[backend], ITEM_FACTORIES[backend], batch_size)
+                workload.setdefault(f"{method}/{batch_size}", {})[backend] = (op, setup)
+    return workload
+
+
+def cleanup_all():
+    for adapter in default_adapters():
+        try:
+            with adapter:
+                CLEANUP[adapter.name](adapter)
+        except Exception as e:
+            logger.error(f"{adapter.name}: błąd czyszczenia: {e}")
+
+
+def plot_results(rows, filename="query_bulk_write.png"):
+    plt.figure(figsize=(12, 7))
+    for backend, method in dict.fromkeys((row["backend"], row["method"]) for row in rows):
+        series = [row for row in rows if row["backend"] == backend and row["method"] == method]
+        plt.plot([row["batch_size"] for row in series], [row["rows_per_s"] for row in series],
+                 marker='o', label=f"{backend} {method}")
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel("Rozmiar paczki (wiersze)")
+    plt.ylabel("Wiersze/s")
+    plt.title(f"Zapis wsadowy: przepustowość vs rozmiar paczki ({ROWS_PER_RUN} wierszy)")
+    plt.grid(True, which="both", ls="--", alpha=0.5)
+    plt.legend(fontsize=9)
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    global ROWS_PER_RUN
+
+    parser = argparse.ArgumentParser(description="Benchmark zapisu wsadowego")
+    parser.add_argument("--batch-sizes", default=",".join(map(str, BATCH_SIZES)))
+    parser.add_argument("--rows", type=int, default=ROWS_PER_RUN, help="wierszy na pomiar")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+    ROWS_PER_RUN = args.rows
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    timings = run_workload(default_adapters(), bulk_workload(batch_sizes), repeats=args.repeats)
+    save_stats("query_bulk_write", timings)
+    cleanup_all()
+
+    rows = []
+    for label, per_backend in timings.items():
+        method, batch_size = label.split("/")
+        for backend, t in per_backend.items():
+            if not t:
+                continue
+            median = statistics.median(t)
+            rows.append({
+                "backend": backend,
+                "method": method,
+                "batch_size": int(batch_size),
+                "rows": ROWS_PER_RUN,
+                "median_s": round(median, 4),
+                "rows_per_s": round(ROWS_PER_RUN / median, 1),
+            })
+            logger.info(f"{backend} {method} x{batch_size}: {ROWS_PER_RUN / median:.0f} wierszy/s")
+
+    with open(results_path("query_bulk_write_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["backend", "method", "batch_size", "rows", "median_s", "rows_per_s"])
+        writer.writeheader()
+        writer.writerows(rows)
+    plot_results(rows)
+    print("Wyniki zapisane do results/query_bulk_write_results.csv")
+
+
+if __name__ == "__main__":
+    main()
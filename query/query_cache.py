@@ -0,0 +1,178 @@
+import argparse
+import csv
+import logging
+import random
+import statistics
+import time
+
+import matplotlib.pyplot as plt
+
+from cache import ReadThroughCache
+from distributions import ZipfGenerator
+from harness import PostgresAdapter, MySQLAdapter, RedisAdapter, results_path
+from query_select import queries
+from query_update import sql_update
+from stats import percentile
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Benchmark cache read-through (cache.py) przed PostgreSQL/MySQL w mieszanym workloadzie odczyt/zapis.
+# Odczyty: punktowe SELECT z Price (id wybierane z rozkładu Zipfa) oraz z prawdopodobieństwem
+# CATALOG_RATIO zapytanie z katalogu query_select.py. Zapisy: query_update.sql_update na id z tego
+# samego rozkładu — z hookami (notify_write) unieważniają wpisy, w trybie "ttl" wpisy wygasają tylko z czasem.
+# Odczyt jest nieaktualny (stale), jeśli wpis cache powstał przed ostatnim zapisem do danych, z których pochodzi.
+
+NUM_OPS = 5000
+WRITE_RATIO = 0.05
+CATALOG_RATIO = 0.01
+KEYSPACE = 10000
+ZIPF_S = 0.99
+SEED = 0
+
+POINT_SQL = "SELECT * FROM Price WHERE id = %s"
+MODES = ["direct", "redis", "local+redis"]
+INVALIDATION = ["hooks", "ttl"]
+SQL_BACKENDS = {"PostgreSQL": PostgresAdapter, "MySQL": MySQLAdapter}
+
+FIELDS = ["backend", "mode", "invalidation", "reads", "writes", "hit_ratio", "local_hits", "remote_hits",
+          "read_p50_ms", "read_p99_ms", "write_p50_ms", "write_p99_ms",
+          "stale_ratio", "stale_mean_ms", "stale_max_ms"]
+
+
+def make_cache(mode, adapter, redis_adapter, hooks):
+    if mode == "direct":
+        return None
+    return ReadThroughCache(adapter, redis_adapter, local_size=0 if mode == "redis" else 1024, hooks=hooks)
+
+
+def catalog_items():
+    return [(q["sql"], None, "price" in q["sql"].lower()) for q in queries.values()]
+
+
+def run_mode(backend, mode, invalidation, args):
+    adapter = SQL_BACKENDS[backend]()
+    redis_adapter = RedisAdapter(decode_responses=False)
+    rng = random.Random(args.seed)
+    zipf = ZipfGenerator(args.keyspace, args.zipf_s, args.seed)
+    catalog = catalog_items()
+
+    read_lat, write_lat, staleness = [], [], []
+    last_write = {}          # id z Price -> czas ostatniego zapisu
+    last_price_write = 0.0   # dowolny zapis do Price (dla zapytań katalogu z tabelą Price)
+
+    with adapter, redis_adapter:
+        cache = make_cache(mode, adapter, redis_adapter, invalidation == "hooks")
+        if cache is not None:
+            cache.clear()
+        for _ in range(args.ops):
+            price_id = zipf.next() + 1
+            if rng.random() < args.write_ratio:
+                start = time.perf_counter()
+                sql_update(adapter, price_id)
+                write_lat.append(time.perf_counter() - start)
+                last_write[price_id] = last_price_write = time.time()
+                continue
+
+            if rng.random() < args.catalog_ratio:
+                sql, params, uses_price = rng.choice(catalog)
+                written = last_price_write if uses_price else 0.0
+            else:
+                sql, params = POINT_SQL, (price_id,)
+                written = last_write.get(price_id, 0.0)
+
+            start = time.perf_counter()
+            if cache is None:
+                adapter.query(sql, params)
+                tier, cached_at = "miss", time.time()
+            else:
+                _, tier, cached_at = cache.get(sql, params)
+            read_lat.append(time.perf_counter() - start)
+            if tier != "miss" and cached_at < written:
+                staleness.append(time.time() - written)
+
+        stats = cache.stats if cache is not None else {"local": 0, "remote": 0, "miss": len(read_lat)}
+
+    reads = len(read_lat)
+    read_ms = sorted(t * 1000 for t in read_lat)
+    write_ms = sorted(t * 1000 for t in write_lat)
+    stale_ms = [t * 1000 for t in staleness]
+    return {
+        "backend": backend,
+        "mode": mode,
+        "invalidation": invalidation if mode != "direct" else "-",
+        "reads": reads,
+        "writes": len(write_lat),
+        "hit_ratio": (stats["local"] + stats["remote"]) / reads if reads else 0.0,
+        "local_hits": stats["local"],
+        "remote_hits": stats["remote"],
+        "read_p50_ms": percentile(read_ms, 50),
+        "read_p99_ms": percentile(read_ms, 99),
+        "write_p50_ms": percentile(write_ms, 50),
+        "write_p99_ms": percentile(write_ms, 99),
+        "stale_ratio": len(stale_ms) / reads if reads else 0.0,
+        "stale_mean_ms": statistics.fmean(stale_ms) if stale_ms else 0.0,
+        "stale_max_ms": max(stale_ms) if stale_ms else 0.0,
+    }
+
+
+def plot_results(rows, filename="query_cache_results.png"):
+    labels = [f"{r['backend']}\n{r['mode']}\n{r['invalidation']}" for r in rows]
+    fig, (ax_lat, ax_hit) = plt.subplots(1, 2, figsize=(16, 6))
+    x = range(len(rows))
+    ax_lat.bar([i - 0.2 for i in x], [r["read_p50_ms"] for r in rows], width=0.4, label="p50")
+    ax_lat.bar([i + 0.2 for i in x], [r["read_p99_ms"] for r in rows], width=0.4, label="p99")
+    ax_lat.set_ylabel("Opóźnienie odczytu (ms)")
+    ax_lat.set_yscale("log")
+    ax_lat.set_title("Opóźnienie odczytu: bezpośrednio vs cache")
+    ax_hit.bar([i - 0.2 for i in x], [r["hit_ratio"] for r in rows], width=0.4, label="hit ratio")
+    ax_hit.bar([i + 0.2 for i in x], [r["stale_ratio"] for r in rows], width=0.4, label="nieaktualne odczyty")
+    ax_hit.set_title("Trafienia i nieaktualne odczyty")
+    for ax in (ax_lat, ax_hit):
+        ax.set_xticks(list(x))
+        ax.set_xticklabels(labels, fontsize=8)
+        ax.grid(axis="y", linestyle="--", alpha=0.5)
+        ax.legend()
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache read-through (lokalny LRU/TTL + Redis) vs zapytania bezpośrednie")
+    parser.add_argument("--ops", type=int, default=NUM_OPS)
+    parser.add_argument("--write-ratio", type=float, default=WRITE_RATIO)
+    parser.add_argument("--catalog-ratio", type=float, default=CATALOG_RATIO)
+    parser.add_argument("--keyspace", type=int, default=KEYSPACE, help="liczba id Price w puli kluczy")
+    parser.add_argument("--zipf-s", type=float, default=ZIPF_S, help="skośność popularności kluczy")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--backends", default=",".join(SQL_BACKENDS))
+    args = parser.parse_args()
+
+    rows = []
+    for backend in args.backends.split(","):
+        for mode in MODES:
+            for invalidation in (INVALIDATION if mode != "direct" else INVALIDATION[:1]):
+                logger.info(f"{backend}: {mode} ({invalidation})")
+                try:
+                    row = run_mode(backend, mode, invalidation, args)
+                except Exception as e:
+                    logger.error(f"{backend} {mode}: {e}")
+                    continue
+                logger.info(
+                    f"{backend} {mode}: hit ratio {row['hit_ratio']:.2%}, p50 {row['read_p50_ms']:.3f} ms, "
+                    f"p99 {row['read_p99_ms']:.3f} ms, nieaktualne {row['stale_ratio']:.2%}"
+                )
+                rows.append(row)
+
+    with open(results_path("query_cache_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    plot_results(rows)
+    print("Wyniki zapisane do results/query_cache_results.csv")
+
+
+if __name__ == "__main__":
+    main()
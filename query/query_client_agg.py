@@ -0,0 +1,309 @@
+import argparse
+import csv
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from harness import ADAPTERS, run_workload, results_path, save_stats
+from query_select import build_workload, queries
+from stats import summarize
+import verify
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# GROUP BY po stronie serwera vs agregacja po stronie klienta dla avg_price_by_cab_type i ride_counts_by_hour.
+# Klient pobiera tylko potrzebne kolumny (cab_type, price / hour) paczkami po CHUNK_SIZE i agreguje je
+# przyrostowo (pandas groupby -> suma/liczność, np.bincount dla godzin), szeregowo albo równolegle
+# w WORKERS procesach, z których każdy czyta swój fragment (zakres Ride.id, zakres _id, wycinek kluczy Redis)
+# i zwraca stan częściowy scalany w procesie głównym.
+# SQL dalej łączy Ride z Price/Time na serwerze — po stronie klienta jest tylko agregacja.
+# Obok czasu: czas CPU klienta (proces główny + procesy robocze), liczba pobranych wierszy
+# i zgodność wyniku z agregacją serwera (verify.py).
+
+WARMUP = 1
+REPEATS = 5
+CHUNK_SIZE = 20000
+WORKERS = 4
+LABELS = ["avg_price_by_cab_type", "ride_counts_by_hour"]
+
+COLUMNS = {
+    "avg_price_by_cab_type": {
+        "sql": "SELECT r.cab_type, p.price FROM Ride r JOIN Price p ON r.price_id = p.id",
+        "mongo": {"_id": 0, "cab_type": 1, "price.price": 1},
+        "redis": ["$.cab_type", "$.price.price"],
+        "columns": ["cab_type", "price"],
+    },
+    "ride_counts_by_hour": {
+        "sql": "SELECT t.hour FROM Ride r JOIN Time t ON r.time_id = t.id",
+        "mongo": {"_id": 0, "time.hour": 1},
+        "redis": ["$.time.hour"],
+        "columns": ["hour"],
+    },
+}
+
+FIELDS = ["backend", "query", "mode", "workers", "chunk_size", "rows", "client_cpu_s", "matches_server",
+          "median", "p95", "min", "max"]
+
+
+# === Agregacja przyrostowa ===
+
+def partial_avg(df):
+    prices = df["price"].astype("float64")
+    grouped = prices.groupby(df["cab_type"])
+    return pd.DataFrame({"sum": grouped.sum(), "count": grouped.count()})
+
+
+def merge_frames(a, b):
+    return b if a is None else a.add(b, fill_value=0)
+
+
+def finalize_avg(state):
+    return {} if state is None else (state["sum"] / state["count"]).to_dict()
+
+
+def partial_hours(df):
+    return np.bincount(df["hour"].to_numpy(dtype=np.int64), minlength=24)
+
+
+def merge_arrays(a, b):
+    if a is None:
+        return b
+    size = max(len(a), len(b))
+    return np.pad(a, (0, size - len(a))) + np.pad(b, (0, size - len(b)))
+
+
+def finalize_hours(state):
+    return {} if state is None else {hour: int(count) for hour, count in enumerate(state) if count}
+
+
+AGGREGATORS = {
+    "avg_price_by_cab_type": (partial_avg, merge_frames, finalize_avg),
+    "ride_counts_by_hour": (partial_hours, merge_arrays, finalize_hours),
+}
+
+
+# === Odczyt kolumn paczkami ===
+
+def sql_chunks(adapter, label, shard, chunk_size):
+    sql = COLUMNS[label]["sql"]
+    params = None
+    if shard is not None:
+        sql += " WHERE r.id >= %s AND r.id < %s"
+        params = shard
+    rows = adapter.stream(sql, params, chunk_size)
+    while True:
+        chunk = [row for _, row in zip(range(chunk_size), rows)]
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk, columns=COLUMNS[label]["columns"])
+
+
+def mongo_row(label, doc):
+    if label == "avg_price_by_cab_type":
+        return doc.get("cab_type"), (doc.get("price") or {}).get("price")
+    return (doc["time"]["hour"],)
+
+
+def mongo_chunks(adapter, label, shard, chunk_size):
+    query = {}
+    if shard is not None:
+        lo, hi = shard
+        query = {"_id": {"$gte": lo, **({"$lt": hi} if hi is not None else {})}}
+    cursor = adapter.collection.find(query, COLUMNS[label]["mongo"]).batch_size(chunk_size)
+    while True:
+        chunk = [mongo_row(label, doc) for _, doc in zip(range(chunk_size), cursor)]
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk, columns=COLUMNS[label]["columns"])
+
+
+def redis_chunks(adapter, label, shard, chunk_size):
+    keys = shard
+    paths = COLUMNS[label]["redis"]
+    for start in range(0, len(keys), chunk_size):
+        batch = keys[start:start + chunk_size]
+        if len(paths) == 1:
+            # JSON.MGET zwraca dla każdego klucza tablicę wyników ścieżki, np. "[8]"
+            values = adapter.r.execute_command("JSON.MGET", *batch, paths[0])
+            chunk = [(json.loads(v)[0],) for v in values if v]
+        else:
+            pipe = adapter.r.pipeline(transaction=False)
+            for key in batch:
+                pipe.execute_command("JSON.GET", key, *paths)
+            chunk = []
+            for reply in pipe.execute():
+                if reply:
+                    doc = json.loads(reply)
+                    chunk.append(tuple((doc[path] or [None])[0] for path in paths))
+        if chunk:
+            yield pd.DataFrame(chunk, columns=COLUMNS[label]["columns"])
+
+
+CHUNKS = {
+    "MySQL": sql_chunks,
+    "PostgreSQL": sql_chunks,
+    "MongoDB": mongo_chunks,
+    "Redis": redis_chunks,
+}
+
+
+# === Fragmenty (shards) i procesy robocze ===
+
+_worker_adapters = {}
+
+
+def worker_adapter(backend):
+    # Jedno połączenie na proces roboczy, otwarte przy pierwszym zadaniu; spoza puli, bo pule
+    # z connections.py zostały skopiowane z procesu głównego przy fork
+    if backend not in _worker_adapters:
+        _worker_adapters[backend] = ADAPTERS[backend](pooled=False).connect()
+    return _worker_adapters[backend]
+
+
+def aggregate_shard(backend, label, shard, chunk_size, adapter=None):
+    """Agreguje jeden fragment; zwraca (stan częściowy, liczba wierszy, czas CPU procesu)."""
+    cpu = time.process_time()
+    adapter = adapter or worker_adapter(backend)
+    partial, merge, _ = AGGREGATORS[label]
+    state = None
+    rows = 0
+    for df in CHUNKS[backend](adapter, label, shard, chunk_size):
+        rows += len(df)
+        state = merge(state, partial(df))
+    return state, rows, time.process_time() - cpu
+
+
+def make_shards(adapter, workers):
+    if adapter.name in ("MySQL", "PostgreSQL"):
+        lo, hi = adapter.query("SELECT MIN(id), MAX(id) FROM Ride")[0]
+        edges = [lo + (hi + 1 - lo) * i // workers for i in range(workers + 1)]
+        return list(zip(edges[:-1], edges[1:]))
+    if adapter.name == "MongoDB":
+        total = adapter.collection.estimated_document_count()
+        edges = []
+        for i in range(workers):
+            doc = next(adapter.collection.find({}, {"_id": 1}).sort("_id", 1).skip(total * i // workers).limit(1), None)
+            edges.append(doc["_id"] if doc else None)
+        return list(zip(edges, edges[1:] + [None]))
+    keys = list(adapter.scan_keys())
+    return [keys[i::workers] for i in range(workers)]
+
+
+def client_aggregate(adapter, label, shards, chunk_size, pool=None):
+    _, merge, finalize = AGGREGATORS[label]
+    cpu = time.process_time()
+    if pool is None:
+        parts = [aggregate_shard(adapter.name, label, shards[0], chunk_size, adapter)]
+    else:
+        parts = list(pool.map(aggregate_shard, [adapter.name] * len(shards), [label] * len(shards), shards,
+                              [chunk_size] * len(shards)))
+    state = None
+    for part, _, _ in parts:
+        state = merge(state, part) if part is not None else state
+    result = finalize(state)
+    return result, sum(p[1] for p in parts), time.process_time() - cpu + (sum(p[2] for p in parts) if pool else 0)
+
+
+def normalized(groups):
+    return {verify.group_key(k): verify.canon_float(v) for k, v in groups.items()}
+
+
+# === Przebieg ===
+
+def run_backend(backend, labels, modes, workers, chunk_size):
+    rows = []
+    timings = {}
+    adapter = ADAPTERS[backend]()
+    with adapter:
+        server_groups = {label: verify.normalize(adapter, label, queries[label])["groups"] for label in labels}
+        # Granice fragmentów (i lista kluczy Redis) wyznaczane poza pomiarem, także dla wariantu szeregowego
+        shards = {"client_serial": make_shards(adapter, 1), "client_parallel": make_shards(adapter, workers)}
+
+    if "server" in modes:
+        workload = build_workload({label: queries[label] for label in labels})
+        for label, per_backend in run_workload([adapter], workload, repeats=REPEATS, warmup=WARMUP).items():
+            t = per_backend.get(backend)
+            if t:
+                timings[f"{label}/server"] = {backend: t}
+                rows.append(result_row(backend, label, "server", 0, None, None, None, True, t))
+
+    pool = ProcessPoolExecutor(max_workers=workers) if "client_parallel" in modes else None
+    try:
+        with adapter:
+            for label in labels:
+                for mode in (m for m in modes if m != "server"):
+                    mode_pool = pool if mode == "client_parallel" else None
+                    t = []
+                    for i in range(WARMUP + REPEATS):
+                        start = time.perf_counter()
+                        groups, count, cpu = client_aggregate(adapter, label, shards[mode], chunk_size, mode_pool)
+                        elapsed = time.perf_counter() - start
+                        if i >= WARMUP:
+                            t.append(elapsed)
+                    ok = verify.groups_match(server_groups[label], normalized(groups))
+                    if not ok:
+                        logger.warning(f"{backend} {label} {mode}: wynik różni się od agregacji serwera")
+                    timings[f"{label}/{mode}"] = {backend: t}
+                    rows.append(result_row(backend, label, mode, workers if mode_pool else 1, chunk_size,
+                                           count, cpu, ok, t))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return rows, timings
+
+
+def result_row(backend, label, mode, workers, chunk_size, count, cpu, ok, timings):
+    summary = summarize(timings)
+    return {
+        "backend": backend,
+        "query": label,
+        "mode": mode,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "rows": count,
+        "client_cpu_s": cpu,
+        "matches_server": ok,
+        **{field: summary[field] for field in ("median", "p95", "min", "max")},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GROUP BY na serwerze vs agregacja kolumn po stronie klienta (pandas/NumPy)")
+    parser.add_argument("--queries", default=",".join(LABELS))
+    parser.add_argument("--modes", default="server,client_serial,client_parallel")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--backends", default=",".join(ADAPTERS))
+    args = parser.parse_args()
+
+    labels = args.queries.split(",")
+    modes = args.modes.split(",")
+    rows = []
+    all_timings = {}
+    for backend in args.backends.split(","):
+        logger.info(f"{backend}: {', '.join(modes)}")
+        try:
+            backend_rows, timings = run_backend(backend, labels, modes, args.workers, args.chunk_size)
+        except Exception as e:
+            logger.error(f"{backend}: {e}")
+            continue
+        rows.extend(backend_rows)
+        for key, per_backend in timings.items():
+            all_timings.setdefault(key, {}).update(per_backend)
+
+    save_stats("query_client_agg", all_timings)
+    with open(results_path("query_client_agg_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    print("Wyniki zapisane do results/query_client_agg_results.csv")
+
+
+if __name__ == "__main__":
+    main()
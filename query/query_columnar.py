@@ -0,0 +1,242 @@
+import argparse
+import csv
+import io
+import logging
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pymysql.cursors
+
+from harness import ADAPTERS, RedisAdapter, results_path
+from query_select_all import FULL_RIDE_JOIN_BASE_SQL, FULL_RIDE_JOIN_SQL, KEY_ENUMERATION
+from query_stream import rss_mb
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Pobieranie pełnego joinu do postaci kolumnowej (Apache Arrow, kolumny liczbowe dostępne jako NumPy
+# przez Table.column(...).to_numpy()) vs dotychczasowe listy krotek / słowników:
+#   PostgreSQL — COPY (zapytanie) TO STDOUT CSV parsowane przez pyarrow.csv,
+#   MySQL      — pymysql nie ma eksportu kolumnowego: SSCursor + fetchmany, paczki transponowane do RecordBatch,
+#   MongoDB    — pymongoarrow find_arrow_all,
+#   Redis      — paczki JSON.GET sklejone w NDJSON i dekodowane jednym wywołaniem pyarrow.json.
+# Każdy pomiar w osobnym procesie (jak query_stream.py), więc szczyt RSS dotyczy tylko tego pomiaru.
+
+REPEATS = 3
+ITERSIZE = 2000
+MODES = {
+    "PostgreSQL": ["fetchall", "copy_arrow"],
+    "MySQL": ["fetchall", "batches_arrow"],
+    "MongoDB": ["find_list", "find_arrow"],
+    "Redis": ["json_loads", "ndjson_arrow"],
+}
+
+FIELDS = ["backend", "mode", "run", "rows", "total_s", "rows_per_s", "result_mb", "peak_rss_mb", "rss_growth_mb"]
+
+
+def join_sql(limit):
+    return (FULL_RIDE_JOIN_SQL, (limit,)) if limit else (FULL_RIDE_JOIN_BASE_SQL, None)
+
+
+def unique_names(names):
+    # r.*, p.*, ... powtarzają nazwy kolumn (id, visibility, windBearing) — Arrow wymaga rozróżnienia przy wyborze
+    seen = {}
+    out = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        out.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return out
+
+
+# === Pobieranie wierszowe (punkt odniesienia) ===
+
+def sql_fetchall(adapter, limit, itersize):
+    return adapter.query(*join_sql(limit))
+
+
+def mongo_find_list(adapter, limit, itersize):
+    return list(adapter.collection.find().limit(limit or 0))
+
+
+def redis_json_loads(adapter, limit, itersize):
+    return list(adapter.stream(KEY_ENUMERATION, limit, itersize))
+
+
+# === Pobieranie kolumnowe ===
+
+def pg_copy_arrow(adapter, limit, itersize):
+    import pyarrow.csv
+
+    sql, params = join_sql(limit)
+    query = adapter.cursor.mogrify(sql, params).decode()
+    adapter.cursor.execute(f"SELECT * FROM ({query}) q LIMIT 0")
+    names = unique_names([d[0] for d in adapter.cursor.description])
+    buf = io.BytesIO()
+    adapter.cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", buf)
+    adapter.conn.rollback()
+    buf.seek(0)
+    return pyarrow.csv.read_csv(buf, read_options=pyarrow.csv.ReadOptions(column_names=names))
+
+
+def mysql_arrow_type(type_code, internal_size, scale):
+    import pyarrow as pa
+    from pymysql.constants import FIELD_TYPE
+
+    if type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL):
+        # internal_size to szerokość wyświetlania (cyfry + znak + kropka) — nie mniejsza niż precyzja
+        return pa.decimal128(min(38, max(internal_size or 0, (scale or 0) + 1)), scale or 0)
+    if type_code in (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.INT24,
+                     FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR):
+        return pa.int64()
+    if type_code in (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE):
+        return pa.float64()
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        return pa.timestamp("us")
+    if type_code in (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE):
+        return pa.date32()
+    if type_code == FIELD_TYPE.TIME:
+        return pa.duration("us")
+    return pa.string()
+
+
+def mysql_arrow_schema(description):
+    # Jeden schemat z cursor.description dla wszystkich paczek — typy wywnioskowane z wartości paczki
+    # różniłyby się (precyzja DECIMAL, kolumna z samymi NULL -> null) i Table.from_batches by się wywalił
+    import pyarrow as pa
+
+    names = unique_names([d[0] for d in description])
+    return pa.schema([pa.field(name, mysql_arrow_type(d[1], d[3], d[5])) for name, d in zip(names, description)])
+
+
+def mysql_batches_arrow(adapter, limit, itersize):
+    import pyarrow as pa
+
+    cur = adapter.conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cur.execute(*join_sql(limit))
+        schema = mysql_arrow_schema(cur.description)
+        batches = []
+        while True:
+            rows = cur.fetchmany(itersize)
+            if not rows:
+                break
+            arrays = [pa.array(col, type=field.type) for col, field in zip(zip(*rows), schema)]
+            batches.append(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    finally:
+        cur.close()
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def mongo_find_arrow(adapter, limit, itersize):
+    from pymongoarrow.api import find_arrow_all
+    return find_arrow_all(adapter.collection, {}, limit=limit or 0)
+
+
+def redis_ndjson_arrow(adapter, limit, itersize):
+    import pyarrow as pa
+    import pyarrow.json
+
+    tables = []
+    chunk = []
+    keys = adapter.enumerate_keys(KEY_ENUMERATION, limit, itersize)
+    for data in adapter.json_get_chunks(keys, itersize):
+        if data:
+            chunk.append(data)
+        if len(chunk) >= itersize:
+            tables.append(pyarrow.json.read_json(io.BytesIO(b"\n".join(chunk))))
+            chunk = []
+    if chunk:
+        tables.append(pyarrow.json.read_json(io.BytesIO(b"\n".join(chunk))))
+    if not tables:
+        # concat_tables nie przyjmuje pustej listy
+        logger.warning(f"{adapter.name}: brak kluczy do pobrania ({KEY_ENUMERATION})")
+        return pa.table({})
+    return pa.concat_tables(tables, promote_options="default")
+
+
+FETCHERS = {
+    "fetchall": sql_fetchall,
+    "copy_arrow": pg_copy_arrow,
+    "batches_arrow": mysql_batches_arrow,
+    "find_list": mongo_find_list,
+    "find_arrow": mongo_find_arrow,
+    "json_loads": redis_json_loads,
+    "ndjson_arrow": redis_ndjson_arrow,
+}
+
+
+def make_adapter(backend):
+    # Surowe bajty JSON.GET dla NDJSON; json_loads korzysta z RedisAdapter.stream
+    return RedisAdapter(decode_responses=False) if backend == "Redis" else ADAPTERS[backend]()
+
+
+def fetch_run(backend, mode, limit, itersize):
+    adapter = make_adapter(backend)
+    adapter.connect()
+    try:
+        baseline = rss_mb()
+        start = time.perf_counter()
+        result = FETCHERS[mode](adapter, limit, itersize)
+        total = time.perf_counter() - start
+        peak = rss_mb()
+    finally:
+        adapter.teardown()
+
+    rows = result.num_rows if hasattr(result, "num_rows") else len(result)
+    return {
+        "backend": backend,
+        "mode": mode,
+        "rows": rows,
+        "total_s": total,
+        "rows_per_s": rows / total if total else 0.0,
+        # Rozmiar buforów Arrow; dla list obiektów Pythona tylko przyrost RSS
+        "result_mb": result.nbytes / 1024 / 1024 if hasattr(result, "nbytes") else None,
+        "peak_rss_mb": peak,
+        "rss_growth_mb": peak - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pobieranie kolumnowe (Arrow/NumPy) vs fetchall")
+    parser.add_argument("--limit", type=int, default=None, help="limit wierszy (domyślnie cały zbiór)")
+    parser.add_argument("--itersize", type=int, default=ITERSIZE)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--backends", default=",".join(MODES))
+    args = parser.parse_args()
+
+    rows = []
+    for backend in args.backends.split(","):
+        for mode in MODES[backend]:
+            for run in range(1, args.repeats + 1):
+                try:
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        row = pool.submit(fetch_run, backend, mode, args.limit, args.itersize).result()
+                except Exception as e:
+                    logger.error(f"{backend} ({mode}): {e}")
+                    break
+                row["run"] = run
+                logger.info(
+                    f"{backend} {mode} #{run}: {row['rows']} wierszy, {row['rows_per_s']:.0f} wierszy/s, "
+                    f"szczyt RSS {row['peak_rss_mb']:.1f} MB"
+                )
+                rows.append(row)
+
+    with open(results_path("query_columnar_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+
+    for backend in args.backends.split(","):
+        for mode in MODES[backend]:
+            series = [r for r in rows if r["backend"] == backend and r["mode"] == mode]
+            if series:
+                print(f"{backend:<10} {mode:<13} {statistics.median(r['rows_per_s'] for r in series):10.0f} wierszy/s  "
+                      f"RSS {max(r['peak_rss_mb'] for r in series):8.1f} MB  "
+                      f"wzrost {statistics.median(r['rss_growth_mb'] for r in series):8.1f} MB")
+    print("Wyniki zapisane do results/query_columnar_results.csv")
+
+
+if __name__ == "__main__":
+    main()
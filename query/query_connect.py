@@ -0,0 +1,77 @@
+import logging
+import statistics
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from harness import default_adapters, run_workload, results_path, save_stats
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Koszt nawiązania połączenia, mierzony osobno od zapytań:
+# - connect: nowe połączenie (TCP + handshake + uwierzytelnienie) + ping, potem zamknięcie
+# - pool_checkout: pobranie połączenia z puli + ping, potem zwrot do puli
+# - ping: sam round-trip na już otwartym połączeniu (punkt odniesienia)
+# Ping jest potrzebny, bo MongoClient i redis.Redis łączą się leniwie przy pierwszym poleceniu.
+
+WARMUP = 5
+REPEATS = 100
+
+
+def connect_op(a):
+    fresh = type(a)(pooled=False)
+    fresh.connect()
+    try:
+        fresh.ping()
+    finally:
+        fresh.teardown()
+
+def pool_checkout_op(a):
+    pooled = type(a)()
+    pooled.connect()
+    try:
+        pooled.ping()
+    finally:
+        pooled.teardown()
+
+def ping_op(a):
+    a.ping()
+
+
+def connect_workload(backends):
+    return {
+        label: {backend: op for backend in backends}
+        for label, op in (("connect", connect_op), ("pool_checkout", pool_checkout_op), ("ping", ping_op))
+    }
+
+
+def main():
+    adapters = default_adapters()
+    timings = run_workload(adapters, connect_workload([a.name for a in adapters]), repeats=REPEATS, warmup=WARMUP)
+    save_stats("query_connect", timings)
+
+    rows = []
+    for label, per_backend in timings.items():
+        for backend, t in per_backend.items():
+            if t:
+                rows.append({"backend": backend, "operation": label, "median_ms": statistics.median(t) * 1000})
+                logger.info(f"{backend} {label}: {rows[-1]['median_ms']:.3f} ms")
+
+    df = pd.DataFrame(rows)
+    df.to_csv(results_path("query_connect_benchmark.csv"), index=False, float_format='%.4f')
+
+    df.pivot(index="backend", columns="operation", values="median_ms").plot(kind='bar', figsize=(10, 6))
+    plt.title(f"Koszt nawiązania połączenia — mediana z {REPEATS} prób")
+    plt.ylabel("Czas (ms)")
+    plt.xlabel("Baza danych")
+    plt.xticks(rotation=0)
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(results_path("query_connect_benchmark.png"), dpi=300)
+    plt.show()
+    print("Wyniki zapisane do results/query_connect_benchmark.csv")
+
+
+if __name__ == "__main__":
+    main()
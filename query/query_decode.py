@@ -0,0 +1,302 @@
+import argparse
+import csv
+import json
+import logging
+import statistics
+import time
+from decimal import Decimal
+
+import bson
+import matplotlib.pyplot as plt
+import psycopg2.extensions
+import pymysql.converters
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from pymysql.constants import FIELD_TYPE
+
+from harness import MySQLAdapter, PostgresAdapter, MongoAdapter, RedisAdapter, results_path, save_stats
+from query_select_all import FULL_RIDE_JOIN_SQL, KEY_ENUMERATION, KEY_CHUNK_SIZE
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Koszt dekodowania po stronie klienta dla pobrania pełnego joinu (jak query_select_all.py).
+# Każdy pomiar dzielony jest na:
+#   fetch  — zapytanie + sieć + parsowanie protokołu, z wyłączoną konwersją wartości
+#            (SQL: liczby jako surowe teksty, Mongo: RawBSONDocument, Redis: surowe bajty JSON.GET),
+#   decode — konwersja tych surowych danych do obiektów Pythona wybranym dekoderem.
+# Dla porównania mierzony jest też zwykły klient skonfigurowany tym samym dekoderem ("client"),
+# np. psycopg2/pymysql z NUMERIC -> float zamiast Decimal albo orjson zamiast json.
+
+LIMIT = 10000
+WARMUP = 1
+REPEATS = 5
+
+FIELDS = ["backend", "decoder", "rows", "fetch_ms", "decode_ms", "split_total_ms", "client_ms", "decode_share"]
+
+
+# === Typy kolumn SQL ===
+
+PG_KINDS = {
+    **{oid: "decimal" for oid in psycopg2.extensions.DECIMAL.values},
+    **{oid: "float" for oid in psycopg2.extensions.FLOAT.values},
+    **{oid: "int" for oid in psycopg2.extensions.INTEGER.values + psycopg2.extensions.LONGINTEGER.values},
+}
+MYSQL_KINDS = {
+    FIELD_TYPE.NEWDECIMAL: "decimal",
+    FIELD_TYPE.DECIMAL: "decimal",
+    FIELD_TYPE.FLOAT: "float",
+    FIELD_TYPE.DOUBLE: "float",
+    **{t: "int" for t in (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.INT24, FIELD_TYPE.LONG, FIELD_TYPE.LONGLONG)},
+}
+
+
+def raw_caster(value, cursor):
+    return value
+
+
+def float_caster(value, cursor):
+    return float(value) if value is not None else None
+
+
+# psycopg2: typecastery rejestrowane tylko na kursorze pomiaru
+PG_RAW_CASTERS = [
+    psycopg2.extensions.new_type(t.values, f"RAW_{t.name}", raw_caster)
+    for t in (psycopg2.extensions.DECIMAL, psycopg2.extensions.FLOAT,
+              psycopg2.extensions.INTEGER, psycopg2.extensions.LONGINTEGER)
+]
+PG_FLOAT_CASTERS = [psycopg2.extensions.new_type(psycopg2.extensions.DECIMAL.values, "DECIMAL_FLOAT", float_caster)]
+
+# pymysql: konwertery są per połączenie (kwarg conv); brak konwertera = surowy tekst
+MYSQL_RAW_CONV = {k: v for k, v in pymysql.converters.conversions.items() if k not in MYSQL_KINDS}
+MYSQL_FLOAT_CONV = {**pymysql.converters.conversions, FIELD_TYPE.NEWDECIMAL: float, FIELD_TYPE.DECIMAL: float}
+
+
+def column_kinds(backend, description):
+    kinds = PG_KINDS if backend == "PostgreSQL" else MYSQL_KINDS
+    return [kinds.get(d[1]) for d in description]
+
+
+def convert_rows(payload, decimal_type):
+    rows, kinds = payload
+    casts = [{"decimal": decimal_type, "float": float, "int": int}.get(k) for k in kinds]
+    return [
+        tuple(v if c is None or v is None else c(v) for c, v in zip(casts, row))
+        for row in rows
+    ]
+
+
+# === Operacje pobierania ===
+
+def sql_fetch_op(limit, casters=()):
+    def op(a):
+        cur = a.conn.cursor()
+        try:
+            for caster in casters:
+                psycopg2.extensions.register_type(caster, cur)
+            cur.execute(FULL_RIDE_JOIN_SQL, (limit,))
+            return cur.fetchall(), column_kinds(a.name, cur.description)
+        finally:
+            cur.close()
+    return op
+
+
+def mongo_fetch_op(limit, raw=False):
+    def op(a):
+        collection = a.collection
+        if raw:
+            collection = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        return list(collection.find().limit(limit))
+    return op
+
+
+def mongo_raw_field_op(limit):
+    fetch = mongo_fetch_op(limit, raw=True)
+
+    def op(a):
+        return [doc["price"] for doc in fetch(a)]
+    return op
+
+
+def redis_fetch_op(limit, loads=None):
+    def op(a):
+        raw = [data for data in a.json_get_chunks(a.enumerate_keys(KEY_ENUMERATION, limit, KEY_CHUNK_SIZE), KEY_CHUNK_SIZE) if data]
+        return raw if loads is None else [loads(data) for data in raw]
+    return op
+
+
+def json_decoders():
+    decoders = {"json": json.loads}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    else:
+        logger.warning("orjson nie jest zainstalowany — pomijam dekoder orjson")
+    return decoders
+
+
+# === Ścieżki dla backendów ===
+# raw: (adapter, op zwracający surowe dane), decoders: {nazwa: funkcja(surowe dane)},
+# client: {nazwa: (adapter, op)} — zwykły klient z tym samym dekoderem
+
+def decode_paths(limit):
+    loads = json_decoders()
+    return {
+        "PostgreSQL": {
+            "raw": (PostgresAdapter(), sql_fetch_op(limit, PG_RAW_CASTERS)),
+            "decoders": {
+                "Decimal": lambda p: convert_rows(p, Decimal),
+                "float": lambda p: convert_rows(p, float),
+            },
+            "client": {
+                "Decimal": (PostgresAdapter(), sql_fetch_op(limit)),
+                "float": (PostgresAdapter(), sql_fetch_op(limit, PG_FLOAT_CASTERS)),
+            },
+        },
+        "MySQL": {
+            "raw": (MySQLAdapter(pooled=False, conv=MYSQL_RAW_CONV), sql_fetch_op(limit)),
+            "decoders": {
+                "Decimal": lambda p: convert_rows(p, Decimal),
+                "float": lambda p: convert_rows(p, float),
+            },
+            "client": {
+                "Decimal": (MySQLAdapter(), sql_fetch_op(limit)),
+                "float": (MySQLAdapter(pooled=False, conv=MYSQL_FLOAT_CONV), sql_fetch_op(limit)),
+            },
+        },
+        "MongoDB": {
+            "raw": (MongoAdapter(), mongo_fetch_op(limit, raw=True)),
+            "decoders": {
+                "dict": lambda docs: [bson.decode(doc.raw) for doc in docs],
+                # RawBSONDocument dekoduje leniwie — tylko odczytane pole
+                "raw_bson_field": lambda docs: [doc["price"] for doc in docs],
+            },
+            "client": {
+                "dict": (MongoAdapter(), mongo_fetch_op(limit)),
+                "raw_bson_field": (MongoAdapter(), mongo_raw_field_op(limit)),
+            },
+        },
+        "Redis": {
+            "raw": (RedisAdapter(decode_responses=False), redis_fetch_op(limit)),
+            "decoders": {name: (lambda raw, f=f: [f(data) for data in raw]) for name, f in loads.items()},
+            "client": {name: (RedisAdapter(decode_responses=False), redis_fetch_op(limit, f)) for name, f in loads.items()},
+        },
+    }
+
+
+# === Pomiar ===
+
+def timed_runs(adapter, op, repeats, warmup):
+    # Jak harness.run_benchmark, ale zachowuje wynik ostatniego wykonania (surowe dane do dekodowania)
+    with adapter:
+        adapter.warm_up(op, warmup)
+        timings = []
+        result = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = adapter.run_op(op)
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def timed_decode(decode, payload, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        decode(payload)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_backend(backend, paths, repeats, warmup, timings):
+    adapter, op = paths["raw"]
+    fetch, payload = timed_runs(adapter, op, repeats, warmup)
+    timings.setdefault("fetch_raw", {})[backend] = fetch
+    rows = len(payload[0]) if isinstance(payload, tuple) else len(payload)
+
+    results = []
+    for name, decode in paths["decoders"].items():
+        decoded = timed_decode(decode, payload, repeats)
+        client_adapter, client_op = paths["client"][name]
+        client, _ = timed_runs(client_adapter, client_op, repeats, warmup)
+        timings.setdefault(f"decode/{name}", {})[backend] = decoded
+        timings.setdefault(f"client/{name}", {})[backend] = client
+
+        fetch_ms = statistics.median(fetch) * 1000
+        decode_ms = statistics.median(decoded) * 1000
+        results.append({
+            "backend": backend,
+            "decoder": name,
+            "rows": rows,
+            "fetch_ms": fetch_ms,
+            "decode_ms": decode_ms,
+            "split_total_ms": fetch_ms + decode_ms,
+            "client_ms": statistics.median(client) * 1000,
+            "decode_share": decode_ms / (fetch_ms + decode_ms) if fetch_ms + decode_ms else 0.0,
+        })
+    return results
+
+
+def save_results(rows, filename="query_decode_results.csv"):
+    with open(results_path(filename), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+
+
+def plot_results(rows, filename="query_decode_results.png"):
+    labels = [f"{row['backend']}\n{row['decoder']}" for row in rows]
+    fetch = [row["fetch_ms"] for row in rows]
+    decode = [row["decode_ms"] for row in rows]
+
+    plt.figure(figsize=(14, 6))
+    plt.bar(labels, fetch, label="zapytanie + sieć (fetch)", color="#336791")
+    plt.bar(labels, decode, bottom=fetch, label="dekodowanie po stronie klienta", color="#F08080")
+    plt.scatter(labels, [row["client_ms"] for row in rows], color="black", zorder=3, label="zwykły klient (pomiar łączny)")
+    plt.ylabel("Czas (ms, mediana)")
+    plt.title("Podział czasu pobierania pełnego joinu: serwer/sieć vs dekodowanie")
+    plt.grid(axis="y", linestyle="--", alpha=0.7)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koszt dekodowania wyników po stronie klienta")
+    parser.add_argument("--limit", type=int, default=LIMIT)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--backends", default="PostgreSQL,MySQL,MongoDB,Redis")
+    args = parser.parse_args()
+
+    paths = decode_paths(args.limit)
+    rows = []
+    timings = {}
+    for backend in args.backends.split(","):
+        logger.info(f"{backend}: pobieranie {args.limit} przejazdów")
+        try:
+            backend_rows = run_backend(backend, paths[backend], args.repeats, args.warmup, timings)
+        except Exception as e:
+            logger.error(f"{backend}: {e}")
+            continue
+        for row in backend_rows:
+            logger.info(
+                f"{backend} [{row['decoder']}]: fetch {row['fetch_ms']:.1f} ms + decode {row['decode_ms']:.1f} ms, "
+                f"klient {row['client_ms']:.1f} ms"
+            )
+        rows.extend(backend_rows)
+
+    save_results(rows)
+    save_stats("query_decode", timings)
+    plot_results(rows)
+    print("Wyniki zapisane do results/query_decode_results.csv")
+
+
+if __name__ == "__main__":
+    main()
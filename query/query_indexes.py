@@ -0,0 +1,257 @@
+import argparse
+import csv
+import logging
+import os
+import statistics
+import time
+
+from pymongo import ASCENDING
+
+from harness import MySQLAdapter, PostgresAdapter, MongoAdapter, run_workload, results_path
+import plans
+from query_select import build_workload, queries
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Doradca indeksów: katalog zapytań bez indeksów (tylko PK/FK z initialize_*.sql),
+# potem z indeksami dopasowanymi do predykatów z query_select.queries.
+# Raportuje przyspieszenie, czas budowy i rozmiar indeksów oraz to, czy planner użył indeksu.
+# Redis pominięty: pola RediSearch (rides_index) są indeksowane z definicji schematu.
+
+WARMUP = 2
+REPEATS = 10
+
+# (nazwa, tabela, kolumny) — wspólne dla MySQL i PostgreSQL
+SQL_INDEXES = [
+    ("idx_ride_cab_type", "Ride", "cab_type"),
+    ("idx_ride_source", "Ride", "source"),
+    ("idx_time_month", "Time", "month"),
+    ("idx_price_price_distance", "Price", "price, distance"),
+    ("idx_temperature_high", "Temperature", "temperatureHigh"),
+    ("idx_wind_speed", "Wind", "windSpeed"),
+    ("idx_weather_humidity", "Weather", "humidity"),
+    # Indeksy na kluczach obcych (PostgreSQL nie tworzy ich automatycznie), pokrywające dla joinów
+    ("idx_ride_weather_name", "Ride", "weather_id, name"),
+    ("idx_ride_cab_type_price", "Ride", "cab_type, price_id"),
+    ("idx_ride_time", "Ride", "time_id"),
+    ("idx_time_id_hour", "Time", "id, hour"),
+]
+
+MONGO_INDEXES = [
+    ("idx_cab_type", [("cab_type", ASCENDING)]),
+    ("idx_source", [("source", ASCENDING)]),
+    ("idx_price_distance_price", [("price.distance", ASCENDING), ("price.price", ASCENDING)]),
+    ("idx_time_month", [("time.month", ASCENDING)]),
+    ("idx_temperature_high", [("weather.temperature.temperatureHigh", ASCENDING)]),
+    ("idx_wind_speed_humidity", [("weather.wind.windSpeed", ASCENDING), ("weather.humidity", ASCENDING)]),
+    # Pokrywający dla $group po cab_type z $avg po price.price
+    ("idx_cab_type_price", [("cab_type", ASCENDING), ("price.price", ASCENDING)]),
+]
+
+SQL_TABLES = sorted({table for _, table, _ in SQL_INDEXES})
+
+
+# === Tworzenie / usuwanie indeksów ===
+
+def drop_indexes(adapter):
+    """Usuwa indeksy z zestawu; zwraca listę faktycznie usuniętych (w formacie SQL_INDEXES / MONGO_INDEXES)."""
+    dropped = []
+    if adapter.name == "MongoDB":
+        existing = adapter.collection.index_information()
+        for name, keys in MONGO_INDEXES:
+            if name in existing:
+                adapter.collection.drop_index(name)
+                dropped.append((name, keys))
+        return dropped
+    for name, table, columns in SQL_INDEXES:
+        if adapter.name == "PostgreSQL":
+            if adapter.query("SELECT to_regclass(%s)", (name,))[0][0] is None:
+                continue
+            adapter.execute(f"DROP INDEX {name}")
+        else:
+            if not mysql_index_columns(adapter, table, name):
+                continue
+            mysql_keep_fk_index(adapter, table, name, columns)
+            try:
+                adapter.execute(f"DROP INDEX {name} ON {table}")
+            except Exception as e:
+                adapter.conn.rollback()
+                if not (e.args and e.args[0] == MYSQL_CANT_DROP_KEY):
+                    raise
+                continue  # indeks zniknął między sprawdzeniem a DROP
+        dropped.append((name, table, columns))
+    return dropped
+
+
+# Błąd 1091: Can't DROP '...'; check that column/key exists
+MYSQL_CANT_DROP_KEY = 1091
+
+
+def mysql_index_columns(adapter, table, name):
+    # Kolumny indeksu w kolejności; pusta lista, gdy indeksu nie ma
+    rows = adapter.query(
+        "SELECT column_name FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s) AND index_name = %s "
+        "ORDER BY seq_in_index",
+        (table, name),
+    )
+    return [row[0] for row in rows]
+
+
+def mysql_keep_fk_index(adapter, table, name, columns):
+    # InnoDB wymaga indeksu zaczynającego się od kolumny klucza obcego; gdy przejął go nasz indeks
+    # (np. idx_ride_time na Ride.time_id), jego własny niejawny indeks został usunięty i DROP kończy się
+    # błędem 1553. Przed usunięciem tworzymy zwykły indeks na samej kolumnie FK — tak jak po initialize_mySQL.sql.
+    first = columns.split(",")[0].strip()
+    is_fk = adapter.query(
+        "SELECT 1 FROM information_schema.key_column_usage "
+        "WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s) AND column_name = %s "
+        "AND referenced_table_name IS NOT NULL",
+        (table, first),
+    )
+    if not is_fk:
+        return
+    others = adapter.query(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND LOWER(table_name) = LOWER(%s) AND column_name = %s "
+        "AND seq_in_index = 1 AND index_name <> %s",
+        (table, first, name),
+    )
+    if not others:
+        adapter.execute(f"CREATE INDEX fk_{table.lower()}_{first} ON {table} ({first})")
+
+
+def analyze_tables(adapter):
+    for table in SQL_TABLES:
+        adapter.execute(f"ANALYZE {table}" if adapter.name == "PostgreSQL" else f"ANALYZE TABLE {table}")
+
+
+def index_size_mb(adapter, name, table):
+    try:
+        if adapter.name == "PostgreSQL":
+            size = adapter.query("SELECT pg_relation_size(%s::regclass)", (name,))[0][0]
+        elif adapter.name == "MySQL":
+            # Wymaga uprawnień do schematu mysql; statystyki aktualne po ANALYZE TABLE.
+            # Wielkość liter table_name zależy od lower_case_table_names — porównanie bez rozróżniania
+            size = adapter.query(
+                "SELECT stat_value * @@innodb_page_size FROM mysql.innodb_index_stats "
+                "WHERE database_name = DATABASE() AND LOWER(table_name) = LOWER(%s) AND index_name = %s "
+                "AND stat_name = 'size'",
+                (table, name),
+            )[0][0]
+        else:
+            stats = next(adapter.collection.aggregate([{"$collStats": {"storageStats": {}}}]))
+            size = stats["storageStats"]["indexSizes"][name]
+        return float(size) / 1024 / 1024
+    except Exception as e:
+        logger.warning(f"{adapter.name}: brak rozmiaru indeksu {name}: {e}")
+        if adapter.name != "MongoDB":
+            adapter.conn.rollback()
+        return None
+
+
+def create_indexes(adapter, indexes=None):
+    # indexes: podzbiór SQL_INDEXES / MONGO_INDEXES (np. wynik drop_indexes); domyślnie cały zestaw
+    builds = []
+    if adapter.name == "MongoDB":
+        for name, keys in MONGO_INDEXES if indexes is None else indexes:
+            start = time.perf_counter()
+            adapter.collection.create_index(keys, name=name)
+            builds.append({"backend": adapter.name, "index": name, "build_s": time.perf_counter() - start})
+        for build in builds:
+            build["size_mb"] = index_size_mb(adapter, build["index"], None)
+        return builds
+
+    indexes = SQL_INDEXES if indexes is None else indexes
+    for name, table, columns in indexes:
+        start = time.perf_counter()
+        adapter.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        builds.append({"backend": adapter.name, "index": name, "build_s": time.perf_counter() - start})
+    analyze_tables(adapter)
+    for build, (name, table, _) in zip(builds, indexes):
+        build["size_mb"] = index_size_mb(adapter, name, table)
+    return builds
+
+
+# === Przebieg ===
+
+def index_adapters():
+    return [MySQLAdapter(), PostgresAdapter(), MongoAdapter()]
+
+
+def capture_plans(phase):
+    # Sam EXPLAIN (bez ANALYZE) wystarcza, żeby sprawdzić, czy planner wybrał indeks
+    plan_dir = results_path(os.path.join("plans", "indexes", phase))
+    rows = []
+    for adapter in index_adapters():
+        with adapter:
+            rows.extend(plans.capture_plans(adapter, queries, plan_dir, analyze=False))
+    plans.write_plans_csv(os.path.join(plan_dir, "plans.csv"), rows)
+    return {(row["query"], row["backend"]): row["index_used"] for row in rows}
+
+
+def run_phase(phase):
+    logger.info(f"=== Faza: {phase} ===")
+    backends = [a.name for a in index_adapters()]
+    workload = {
+        label: {b: op for b, op in ops.items() if b in backends}
+        for label, ops in build_workload(queries).items()
+    }
+    timings = run_workload(index_adapters(), workload, repeats=REPEATS, warmup=WARMUP)
+    return timings, capture_plans(phase)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Porównanie katalogu zapytań z indeksami i bez")
+    parser.add_argument("--keep", action="store_true", help="nie usuwaj indeksów po benchmarku")
+    args = parser.parse_args()
+
+    for adapter in index_adapters():
+        with adapter:
+            drop_indexes(adapter)
+    before, plans_before = run_phase("unindexed")
+
+    builds = []
+    for adapter in index_adapters():
+        with adapter:
+            builds.extend(create_indexes(adapter))
+    after, plans_after = run_phase("indexed")
+
+    rows = []
+    for label in queries:
+        for backend in before[label]:
+            t_before, t_after = before[label].get(backend), after[label].get(backend)
+            if not t_before or not t_after:
+                continue
+            unindexed, indexed = statistics.median(t_before) * 1000, statistics.median(t_after) * 1000
+            rows.append({
+                "query": label,
+                "backend": backend,
+                "unindexed_ms": round(unindexed, 4),
+                "indexed_ms": round(indexed, 4),
+                "speedup": round(unindexed / indexed, 2) if indexed else None,
+                "index_used_before": plans_before.get((label, backend)),
+                "index_used_after": plans_after.get((label, backend)),
+            })
+            logger.info(f"{backend} {label}: {unindexed:.2f} ms -> {indexed:.2f} ms (x{rows[-1]['speedup']})")
+
+    with open(results_path("query_indexes_speedup.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ["query", "backend"])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(results_path("query_indexes_build.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["backend", "index", "build_s", "size_mb"])
+        writer.writeheader()
+        for build in builds:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in build.items()})
+
+    if not args.keep:
+        for adapter in index_adapters():
+            with adapter:
+                drop_indexes(adapter)
+    print("Wyniki zapisane do results/query_indexes_speedup.csv i results/query_indexes_build.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import csv
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+
+from connections import MYSQL_CONFIG, PG_CONFIG, MONGO_URI, MONGO_DB, REDIS_CONFIG
+from harness import ADAPTERS, measure, split_spec, results_path
+from stats import summarize, SUMMARY_FIELDS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Generator obciążenia: N równoległych klientów, każdy z własnym połączeniem,
+# wykonuje zapytania z katalogu round-robin. Raportuje przepustowość (ops/s)
+# i rozkład opóźnień dla rosnącej liczby klientów.
+
+CLIENT_COUNTS = [1, 2, 4, 8, 16, 32]
+OPS_PER_CLIENT = 50
+WARMUP = 2
+
+
+# === Workloady (budowane w procesie klienta, bo operacje to domknięcia) ===
+
+def select_workload():
+    from query_select import build_workload, queries
+    return build_workload(queries)
+
+def update_workload():
+    from query_update import update_workload
+    return update_workload()
+
+def delete_workload():
+    from query_delete import delete_workload
+    return delete_workload()
+
+WORKLOADS = {
+    "select": select_workload,
+    "update": update_workload,
+    "delete": delete_workload,
+}
+
+
+def client_ops(workload_name, backend, labels=None):
+    workload = WORKLOADS[workload_name]()
+    return [
+        split_spec(ops[backend])
+        for label, ops in workload.items()
+        if backend in ops and (not labels or label in labels)
+    ]
+
+
+# === Klient synchroniczny (wątki i procesy) ===
+
+def client_worker(backend, workload_name, labels, ops, warmup):
+    specs = client_ops(workload_name, backend, labels)
+    adapter = ADAPTERS[backend]()
+    adapter.connect()
+    try:
+        for i in range(warmup):
+            op, setup = specs[i % len(specs)]
+            measure(adapter, op, setup)
+
+        latencies = []
+        # time.time(), bo okno musi być porównywalne między procesami
+        started = time.time()
+        for i in range(ops):
+            op, setup = specs[i % len(specs)]
+            latencies.append(measure(adapter, op, setup))
+        finished = time.time()
+    finally:
+        adapter.teardown()
+    return started, finished, latencies
+
+
+def run_pool(executor_cls, backend, workload_name, labels, clients, ops, warmup):
+    with executor_cls(max_workers=clients) as pool:
+        futures = [
+            pool.submit(client_worker, backend, workload_name, labels, ops, warmup)
+            for _ in range(clients)
+        ]
+        return [f.result() for f in futures]
+
+
+# === Klienci asyncio (asyncpg, aiomysql, motor, redis.asyncio) ===
+
+async def asyncpg_client():
+    import asyncpg
+    conn = await asyncpg.connect(
+        host=PG_CONFIG["host"], port=PG_CONFIG["port"], user=PG_CONFIG["user"],
+        password=PG_CONFIG["password"], database=PG_CONFIG["dbname"]
+    )
+
+    def make_op(q):
+        return lambda: conn.fetch(q["sql"])
+    return make_op, conn.close
+
+
+async def aiomysql_client():
+    import aiomysql
+    conn = await aiomysql.connect(
+        host=MYSQL_CONFIG["host"], port=MYSQL_CONFIG["port"], user=MYSQL_CONFIG["user"],
+        password=MYSQL_CONFIG["password"], db=MYSQL_CONFIG["database"]
+    )
+
+    def make_op(q):
+        async def op():
+            async with conn.cursor() as cur:
+                await cur.execute(q["sql"])
+                return await cur.fetchall()
+        return op
+
+    async def close():
+        conn.close()
+    return make_op, close
+
+
+async def motor_client():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from query_select import MONGO_PIPELINES
+    client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=3000)
+    rides = client[MONGO_DB]["rides"]
+
+    def make_op(q):
+        if isinstance(q["mongo"], dict):
+            return lambda: rides.find(q["mongo"]).to_list(None)
+        return lambda: rides.aggregate(MONGO_PIPELINES[q["mongo"]]).to_list(None)
+
+    async def close():
+        client.close()
+    return make_op, close
+
+
+async def redis_async_client():
+    import redis.asyncio
+    from query_select import REDIS_AGGREGATES, redis_search_command
+    r = redis.asyncio.Redis(**REDIS_CONFIG, decode_responses=True)
+
+    def make_op(q):
+        if "agg" in q["redis"]:
+            return lambda: r.execute_command(*REDIS_AGGREGATES[q["redis"]])
+        return lambda: r.execute_command(*redis_search_command(q["redis"]))
+    return make_op, r.aclose
+
+
+ASYNC_CLIENTS = {
+    "PostgreSQL": asyncpg_client,
+    "MySQL": aiomysql_client,
+    "MongoDB": motor_client,
+    "Redis": redis_async_client,
+}
+
+
+async def async_worker(backend, labels, ops, warmup):
+    from query_select import queries
+    make_op, close = await ASYNC_CLIENTS[backend]()
+    try:
+        specs = [make_op(q) for label, q in queries.items() if not labels or label in labels]
+        for i in range(warmup):
+            await specs[i % len(specs)]()
+
+        latencies = []
+        started = time.time()
+        for i in range(ops):
+            start = time.perf_counter()
+            await specs[i % len(specs)]()
+            latencies.append(time.perf_counter() - start)
+        finished = time.time()
+    finally:
+        await close()
+    return started, finished, latencies
+
+
+async def run_async(backend, labels, clients, ops, warmup):
+    return await asyncio.gather(*(async_worker(backend, labels, ops, warmup) for _ in range(clients)))
+
+
+# === Uruchomienie ===
+
+def run_level(mode, backend, workload_name, labels, clients, ops, warmup):
+    if mode == "thread":
+        return run_pool(ThreadPoolExecutor, backend, workload_name, labels, clients, ops, warmup)
+    if mode == "process":
+        return run_pool(ProcessPoolExecutor, backend, workload_name, labels, clients, ops, warmup)
+    if workload_name != "select":
+        raise ValueError("Tryb asyncio obsługuje tylko workload select")
+    return asyncio.run(run_async(backend, labels, clients, ops, warmup))
+
+
+def summarize_level(backend, clients, client_results):
+    latencies = [t for _, _, lat in client_results for t in lat]
+    wall = max(f for _, f, _ in client_results) - min(s for s, _, _ in client_results)
+    return {
+        "backend": backend,
+        "clients": clients,
+        "ops": len(latencies),
+        "wall_s": wall,
+        "throughput_ops_s": len(latencies) / wall if wall > 0 else float("nan"),
+        **summarize(latencies),
+    }
+
+
+def save_results(rows, filename):
+    with open(results_path(filename), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["backend", "clients", "ops", "wall_s", "throughput_ops_s"] + SUMMARY_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+
+
+def plot_results(rows, filename):
+    fig, (ax_tp, ax_lat) = plt.subplots(1, 2, figsize=(14, 6))
+    for backend in dict.fromkeys(row["backend"] for row in rows):
+        series = [row for row in rows if row["backend"] == backend]
+        clients = [row["clients"] for row in series]
+        ax_tp.plot(clients, [row["throughput_ops_s"] for row in series], marker='o', label=backend)
+        ax_lat.plot(clients, [row["p99"] for row in series], marker='o', label=backend)
+
+    ax_tp.set_title("Przepustowość vs liczba klientów")
+    ax_tp.set_xlabel("Liczba klientów")
+    ax_tp.set_ylabel("ops/s")
+    ax_lat.set_title("Opóźnienie p99 vs liczba klientów")
+    ax_lat.set_xlabel("Liczba klientów")
+    ax_lat.set_ylabel("p99 (ms)")
+    for ax in (ax_tp, ax_lat):
+        ax.set_xscale('log', base=2)
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.legend()
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator obciążenia współbieżnego")
+    parser.add_argument("--mode", choices=["thread", "process", "asyncio"], default="thread")
+    parser.add_argument("--workload", choices=list(WORKLOADS), default="select")
+    parser.add_argument("--clients", default=",".join(map(str, CLIENT_COUNTS)),
+                        help="lista liczby klientów, np. 1,4,16")
+    parser.add_argument("--ops", type=int, default=OPS_PER_CLIENT, help="operacji na klienta")
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--backends", default=",".join(ADAPTERS))
+    parser.add_argument("--query", action="append", help="etykieta zapytania (domyślnie cały katalog)")
+    args = parser.parse_args()
+
+    rows = []
+    for backend in args.backends.split(","):
+        for clients in map(int, args.clients.split(",")):
+            logger.info(f"{backend}: {clients} klientów ({args.mode}, {args.workload})")
+            try:
+                client_results = run_level(args.mode, backend, args.workload, args.query,
+                                           clients, args.ops, args.warmup)
+            except Exception as e:
+                logger.error(f"{backend} ({clients} klientów): {e}")
+                break
+            row = summarize_level(backend, clients, client_results)
+            logger.info(f"{backend}: {row['throughput_ops_s']:.1f} ops/s, p99 {row['p99']:.2f} ms")
+            rows.append(row)
+
+    name = f"query_load_{args.workload}_{args.mode}"
+    save_results(rows, f"{name}.csv")
+    plot_results(rows, f"{name}.png")
+    logger.info(f"Wyniki zapisane do results/{name}.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import csv
+import itertools
+import logging
+import time
+
+import matplotlib.pyplot as plt
+
+from harness import ADAPTERS, results_path
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Stronicowanie całego zbioru przejazdów strona po stronie:
+#   SQL     — LIMIT/OFFSET vs keyset (WHERE id > ostatnie_id ORDER BY id LIMIT n),
+#   MongoDB — skip() vs zakres po _id ($gt ostatnie _id),
+#   Redis   — FT.SEARCH LIMIT offset num vs kursor FT.AGGREGATE WITHCURSOR + FT.CURSOR READ.
+# Czas każdej strony w funkcji głębokości (offsetu) — OFFSET/skip() czyta i odrzuca wszystkie
+# wcześniejsze wiersze, więc przejście całości kosztuje O(n^2).
+# FT.SEARCH odrzuca offset + num powyżej MAXSEARCHRESULTS (w RediSearch 2.x domyślnie 1000000, por. REDIS_SEARCH_LIMIT w query_select.py) — wtedy przejście się kończy.
+
+PAGE_SIZE = 1000
+WARMUP_PAGES = 5
+
+FIELDS = ["backend", "method", "page", "offset", "rows", "latency_ms"]
+SUMMARY_FIELDS = ["backend", "method", "pages", "rows", "total_s", "first_page_ms", "last_page_ms", "stopped"]
+
+
+# === Strony: SQL ===
+
+def sql_offset(a, page_size):
+    offset = 0
+    while True:
+        rows = a.query("SELECT * FROM Ride ORDER BY id LIMIT %s OFFSET %s", (page_size, offset))
+        yield rows
+        offset += len(rows)
+
+
+def sql_keyset(a, page_size):
+    last_id = None
+    while True:
+        if last_id is None:
+            rows = a.query("SELECT * FROM Ride ORDER BY id LIMIT %s", (page_size,))
+        else:
+            rows = a.query("SELECT * FROM Ride WHERE id > %s ORDER BY id LIMIT %s", (last_id, page_size))
+        yield rows
+        if rows:
+            last_id = rows[-1][0]
+
+
+# === Strony: MongoDB ===
+
+def mongo_skip(a, page_size):
+    offset = 0
+    while True:
+        docs = list(a.collection.find().sort("_id", 1).skip(offset).limit(page_size))
+        yield docs
+        offset += len(docs)
+
+
+def mongo_range(a, page_size):
+    query = {}
+    while True:
+        docs = list(a.collection.find(query).sort("_id", 1).limit(page_size))
+        yield docs
+        if docs:
+            query = {"_id": {"$gt": docs[-1]["_id"]}}
+
+
+# === Strony: Redis ===
+
+def redis_limit(a, page_size):
+    offset = 0
+    while True:
+        reply = a.r.execute_command("FT.SEARCH", "rides_index", "*", "LIMIT", offset, page_size)
+        # [total, klucz1, dokument1, klucz2, dokument2, ...]
+        docs = reply[2::2]
+        yield docs
+        offset += len(docs)
+
+
+def redis_cursor(a, page_size):
+    reply, cursor = a.r.execute_command(
+        "FT.AGGREGATE", "rides_index", "*", "LOAD", "*", "WITHCURSOR", "COUNT", page_size
+    )
+    try:
+        while True:
+            # Pierwszy element odpowiedzi to liczba wyników, potem wiersze
+            yield reply[1:]
+            if not cursor:
+                return
+            reply, cursor = a.r.execute_command("FT.CURSOR", "READ", "rides_index", cursor, "COUNT", page_size)
+    finally:
+        if cursor:
+            a.r.execute_command("FT.CURSOR", "DEL", "rides_index", cursor)
+
+
+METHODS = {
+    "MySQL": {"offset": sql_offset, "keyset": sql_keyset},
+    "PostgreSQL": {"offset": sql_offset, "keyset": sql_keyset},
+    "MongoDB": {"skip": mongo_skip, "id_range": mongo_range},
+    "Redis": {"ft_limit": redis_limit, "ft_cursor": redis_cursor},
+}
+
+
+# === Przebieg ===
+
+def walk(adapter, method, page_size, max_pages):
+    """Przechodzi strony aż do pustej/niepełnej strony albo max_pages; zwraca (wiersze CSV, powód zatrzymania)."""
+    rows = []
+    offset = 0
+    pages = METHODS[adapter.name][method](adapter, page_size)
+    stopped = "end"
+    try:
+        for page in (range(max_pages) if max_pages else itertools.count()):
+            start = time.perf_counter()
+            try:
+                data = next(pages)
+            except Exception as e:
+                stopped = str(e)
+                logger.warning(f"{adapter.name} {method}: przerwano na stronie {page} (offset {offset}): {e}")
+                break
+            elapsed = time.perf_counter() - start
+            if not data:
+                break
+            rows.append({
+                "backend": adapter.name,
+                "method": method,
+                "page": page,
+                "offset": offset,
+                "rows": len(data),
+                "latency_ms": elapsed * 1000,
+            })
+            offset += len(data)
+            if len(data) < page_size:
+                break
+        else:
+            stopped = "max_pages"
+    finally:
+        pages.close()
+    return rows, stopped
+
+
+def warmup(adapter, method, page_size):
+    pages = METHODS[adapter.name][method](adapter, page_size)
+    try:
+        for _ in range(WARMUP_PAGES):
+            next(pages)
+    except Exception:
+        pass
+    finally:
+        pages.close()
+
+
+def summarize_walk(backend, method, rows, stopped):
+    return {
+        "backend": backend,
+        "method": method,
+        "pages": len(rows),
+        "rows": sum(r["rows"] for r in rows),
+        "total_s": sum(r["latency_ms"] for r in rows) / 1000,
+        "first_page_ms": rows[0]["latency_ms"] if rows else None,
+        "last_page_ms": rows[-1]["latency_ms"] if rows else None,
+        "stopped": stopped,
+    }
+
+
+def plot_pages(rows, filename="query_pagination.png"):
+    backends = list(dict.fromkeys(r["backend"] for r in rows))
+    if not backends:
+        return
+    fig, axes = plt.subplots(1, len(backends), figsize=(6 * len(backends), 5), squeeze=False)
+    for ax, backend in zip(axes[0], backends):
+        methods = dict.fromkeys(r["method"] for r in rows if r["backend"] == backend)
+        for method in methods:
+            series = [r for r in rows if r["backend"] == backend and r["method"] == method]
+            ax.plot([r["offset"] for r in series], [r["latency_ms"] for r in series], label=method, linewidth=1)
+        ax.set_title(backend)
+        ax.set_xlabel("Głębokość strony (offset, wiersze)")
+        ax.set_ylabel("Czas strony (ms)")
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stronicowanie: LIMIT/OFFSET i skip() vs keyset / zakres _id / kursory RediSearch")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--max-pages", type=int, default=None, help="domyślnie cały zbiór")
+    parser.add_argument("--backends", default=",".join(ADAPTERS))
+    args = parser.parse_args()
+
+    rows = []
+    summary = []
+    for backend in args.backends.split(","):
+        adapter = ADAPTERS[backend]()
+        try:
+            with adapter:
+                for method in METHODS[backend]:
+                    logger.info(f"{backend}: {method}, strony po {args.page_size}")
+                    warmup(adapter, method, args.page_size)
+                    walk_rows, stopped = walk(adapter, method, args.page_size, args.max_pages)
+                    rows.extend(walk_rows)
+                    summary.append(summarize_walk(backend, method, walk_rows, stopped))
+                    logger.info(f"{backend} {method}: {len(walk_rows)} stron, {summary[-1]['total_s']:.2f} s")
+        except Exception as e:
+            logger.error(f"{backend}: {e}")
+
+    with open(results_path("query_pagination_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(results_path("query_pagination_summary.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summary)
+    plot_pages(rows)
+    print("Wyniki zapisane do results/query_pagination_results.csv, results/query_pagination_summary.csv i results/query_pagination.png")
+
+
+if __name__ == "__main__":
+    main()
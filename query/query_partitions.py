@@ -0,0 +1,429 @@
+import argparse
+import csv
+import json
+import logging
+import statistics
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from harness import MySQLAdapter, PostgresAdapter, MongoAdapter, RedisAdapter, run_workload, results_path, save_stats
+import plans
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Partycjonowanie po czasie i jego wpływ na zapytania rides_in_december / ride_counts_by_hour.
+# SQL: kopie time_part (Time) i ride_part (Ride + datetime/hour/month z Time) partycjonowane zakresowo po datetime
+# na N równych przedziałów między MIN a MAX(Time.datetime); N=0 = ta sama tabela bez partycji (punkt odniesienia).
+# MongoDB: kolekcje rides_b<i>, Redis: klucze ridebucket:b<i>:<id> (poza prefiksem ride: indeksu rides_index) z indeksem RediSearch na kubełek — kubełki po dniu
+# kalendarzowym (datetime.date z pierwszych 10 znaków time.datetime, "YYYY-MM-DD"), bo dokumenty nie mają pola typu data.
+# Dla każdego N: opóźnienie zapytań z i bez zawężenia zakresu czasu (pruning), liczba skanowanych partycji
+# (EXPLAIN) oraz koszt utrzymania najstarszej partycji: odłączenie, ponowne podłączenie i usunięcie
+# (dla N=0 — DELETE tego samego zakresu).
+
+WARMUP = 1
+REPEATS = 5
+PARTITION_COUNTS = [0, 1, 4, 16, 64]
+DECEMBER = ("2018-12-01 00:00:00", "2019-01-01 00:00:00")
+# Bez LIMIT FT.SEARCH zwraca tylko 10 pierwszych dokumentów
+REDIS_SEARCH_LIMIT = 1000000
+
+RIDE_PART_SELECT = """
+    SELECT r.id, r.source, r.destination, r.cab_type, r.product_id, r.name,
+           r.price_id, r.time_id, r.weather_id, t.datetime, t.hour, t.month
+    FROM Ride r JOIN Time t ON r.time_id = t.id
+    WHERE t.datetime IS NOT NULL
+"""
+
+FIELDS = ["backend", "partitions", "query", "median_ms", "partitions_scanned"]
+MAINTENANCE_FIELDS = ["backend", "partitions", "detach_s", "attach_s", "drop_s", "rows_removed"]
+
+
+def bounds(lo, hi, n):
+    # n równych przedziałów [b_i, b_i+1) między lo a hi (działa dla datetime i liczb)
+    return [lo + (hi - lo) * i / n for i in range(n + 1)]
+
+
+def fmt(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# === SQL: budowa ===
+
+def pg_partitions_ddl(table, edges):
+    parts = []
+    for i in range(len(edges) - 1):
+        lo = "MINVALUE" if i == 0 else f"'{fmt(edges[i])}'"
+        hi = "MAXVALUE" if i == len(edges) - 2 else f"'{fmt(edges[i + 1])}'"
+        parts.append(f"CREATE TABLE {table}_p{i:03d} PARTITION OF {table} FOR VALUES FROM ({lo}) TO ({hi})")
+    return parts
+
+
+def mysql_partitions_clause(edges):
+    parts = []
+    for i in range(len(edges) - 1):
+        hi = "MAXVALUE" if i == len(edges) - 2 else f"'{fmt(edges[i + 1])}'"
+        parts.append(f"PARTITION p{i:03d} VALUES LESS THAN ({hi})")
+    return f"PARTITION BY RANGE COLUMNS(datetime) ({', '.join(parts)})"
+
+
+def build_sql(adapter, n, edges):
+    for table in ("ride_part", "time_part"):
+        adapter.execute(f"DROP TABLE IF EXISTS {table}")
+    sources = {"time_part": "SELECT * FROM Time WHERE datetime IS NOT NULL", "ride_part": RIDE_PART_SELECT}
+
+    start = time.perf_counter()
+    for table, select in sources.items():
+        if adapter.name == "PostgreSQL":
+            if n == 0:
+                adapter.execute(f"CREATE TABLE {table} AS {select}")
+            else:
+                adapter.execute(f"CREATE TABLE {table} AS {select} WITH NO DATA")
+                # CREATE TABLE AS nie tworzy tabeli partycjonowanej — przebudowa przez LIKE
+                adapter.execute(f"ALTER TABLE {table} RENAME TO {table}_template")
+                adapter.execute(f"CREATE TABLE {table} (LIKE {table}_template) PARTITION BY RANGE (datetime)")
+                adapter.execute(f"DROP TABLE {table}_template")
+                for ddl in pg_partitions_ddl(table, edges):
+                    adapter.execute(ddl)
+                adapter.execute(f"INSERT INTO {table} {select}")
+            adapter.execute(f"CREATE INDEX {table}_datetime ON {table} (datetime)")
+            adapter.execute(f"ANALYZE {table}")
+        else:
+            adapter.execute(f"CREATE TABLE {table} AS {select}")
+            # Klucz główny tabeli partycjonowanej w MySQL musi zawierać kolumnę partycjonującą
+            adapter.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, datetime)"
+                            + (f" {mysql_partitions_clause(edges)}" if n else ""))
+            adapter.execute(f"CREATE INDEX {table}_datetime ON {table} (datetime)")
+            adapter.execute(f"ANALYZE TABLE {table}")
+    return time.perf_counter() - start
+
+
+def sql_maintenance(adapter, n, edges):
+    # Najstarsza partycja ride_part (p000): odłączenie, ponowne podłączenie, usunięcie
+    if n == 0:
+        start = time.perf_counter()
+        cur = adapter.execute("DELETE FROM ride_part WHERE datetime < %s", (fmt(edges[1]),))
+        return {"drop_s": time.perf_counter() - start, "rows_removed": cur.rowcount}
+    if n == 1:
+        return {}
+
+    rows = adapter.query("SELECT COUNT(*) FROM ride_part WHERE datetime < %s", (fmt(edges[1]),))[0][0]
+    if adapter.name == "PostgreSQL":
+        start = time.perf_counter()
+        adapter.execute("ALTER TABLE ride_part DETACH PARTITION ride_part_p000")
+        detach = time.perf_counter() - start
+        start = time.perf_counter()
+        adapter.execute(f"ALTER TABLE ride_part ATTACH PARTITION ride_part_p000 FOR VALUES FROM (MINVALUE) TO ('{fmt(edges[1])}')")
+        attach = time.perf_counter() - start
+        start = time.perf_counter()
+        adapter.execute("DROP TABLE ride_part_p000")
+        drop = time.perf_counter() - start
+    else:
+        # Odłączenie = zamiana partycji z pustą tabelą o tej samej strukturze
+        adapter.execute("DROP TABLE IF EXISTS ride_part_swap")
+        adapter.execute("CREATE TABLE ride_part_swap LIKE ride_part")
+        adapter.execute("ALTER TABLE ride_part_swap REMOVE PARTITIONING")
+        start = time.perf_counter()
+        adapter.execute("ALTER TABLE ride_part EXCHANGE PARTITION p000 WITH TABLE ride_part_swap")
+        detach = time.perf_counter() - start
+        start = time.perf_counter()
+        adapter.execute("ALTER TABLE ride_part EXCHANGE PARTITION p000 WITH TABLE ride_part_swap")
+        attach = time.perf_counter() - start
+        adapter.execute("DROP TABLE ride_part_swap")
+        start = time.perf_counter()
+        adapter.execute("ALTER TABLE ride_part DROP PARTITION p000")
+        drop = time.perf_counter() - start
+    return {"detach_s": detach, "attach_s": attach, "drop_s": drop, "rows_removed": rows}
+
+
+def sql_queries(last_day):
+    return {
+        "rides_in_december": ("SELECT * FROM time_part WHERE month = 12", None),
+        "rides_in_december_pruned": ("SELECT * FROM time_part WHERE datetime >= %s AND datetime < %s", DECEMBER),
+        "ride_counts_by_hour": ("SELECT hour, COUNT(*) FROM ride_part GROUP BY hour", None),
+        "ride_counts_by_hour_last_day": ("SELECT hour, COUNT(*) FROM ride_part WHERE datetime >= %s GROUP BY hour",
+                                         (fmt(last_day),)),
+    }
+
+
+def partitions_scanned(adapter, sql, params):
+    if adapter.name == "PostgreSQL":
+        plan = adapter.query(f"EXPLAIN (FORMAT JSON) {sql}", params)[0][0]
+        return len({node["Relation Name"] for node in plans.walk(plan) if "Relation Name" in node})
+    plan = json.loads(adapter.query(f"EXPLAIN FORMAT=JSON {sql}", params)[0][0])
+    scanned = [node["partitions"] for node in plans.walk(plan) if "partitions" in node]
+    return sum(len(p) for p in scanned) if scanned else 1
+
+
+def sql_edges(adapter):
+    lo, hi = adapter.query("SELECT MIN(datetime), MAX(datetime) FROM Time")[0]
+    return lo, hi
+
+
+# === MongoDB / Redis: kubełki dzienne ===
+
+# Dzień jako napis "YYYY-MM-DD" — porządek napisów jest porządkiem dat, więc granice kubełków
+# (date.isoformat()) porównywane są wprost w $expr
+DAY = {"$substrBytes": ["$time.datetime", 0, 10]}
+
+
+def doc_day(doc):
+    return date.fromisoformat(str(doc["time"]["datetime"])[:10])
+
+
+def day_range(adapter):
+    # [pierwszy dzień, dzień po ostatnim)
+    row = next(adapter.collection.aggregate([
+        {"$group": {"_id": None, "lo": {"$min": DAY}, "hi": {"$max": DAY}}}
+    ]))
+    return date.fromisoformat(row["lo"]), date.fromisoformat(row["hi"]) + timedelta(days=1)
+
+
+def bucket_ranges(lo, hi, n):
+    # date + timedelta pomija ułamek dnia, więc granice są pełnymi dniami
+    edges = bounds(lo, hi, max(n, 1))
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def december_buckets(ranges, lo, hi):
+    return sorted({i for year in range(lo.year, hi.year + 1)
+                   for i in overlapping(ranges, date(year, 12, 1), date(year + 1, 1, 1))})
+
+
+def overlapping(ranges, lo, hi):
+    return [i for i, (b_lo, b_hi) in enumerate(ranges) if b_lo < hi and b_hi > lo]
+
+
+def build_mongo(adapter, ranges):
+    drop_mongo(adapter)
+    start = time.perf_counter()
+    for i, (lo, hi) in enumerate(ranges):
+        adapter.collection.aggregate([
+            {"$match": {"$expr": {"$and": [{"$gte": [DAY, lo.isoformat()]}, {"$lt": [DAY, hi.isoformat()]}]}}},
+            {"$out": f"rides_b{i}"},
+        ])
+        adapter.db[f"rides_b{i}"].create_index("time.month")
+    return time.perf_counter() - start
+
+
+def drop_mongo(adapter):
+    for name in adapter.db.list_collection_names():
+        if name.startswith("rides_b"):
+            adapter.db.drop_collection(name)
+
+
+def mongo_find(buckets, query):
+    def op(a):
+        return [doc for i in buckets for doc in a.db[f"rides_b{i}"].find(query)]
+    return op
+
+
+def mongo_count_by_hour(buckets, match=None):
+    def op(a):
+        counts = Counter()
+        pipeline = ([{"$match": match}] if match else []) + [{"$group": {"_id": "$time.hour", "count": {"$sum": 1}}}]
+        for i in buckets:
+            for row in a.db[f"rides_b{i}"].aggregate(pipeline):
+                counts[row["_id"]] += row["count"]
+        return counts
+    return op
+
+
+def mongo_maintenance(adapter, ranges):
+    if len(ranges) < 2:
+        return {}
+    rows = adapter.db["rides_b0"].estimated_document_count()
+    start = time.perf_counter()
+    adapter.db["rides_b0"].rename("rides_archive_b0")
+    detach = time.perf_counter() - start
+    start = time.perf_counter()
+    adapter.db["rides_archive_b0"].rename("rides_b0")
+    attach = time.perf_counter() - start
+    start = time.perf_counter()
+    adapter.db.drop_collection("rides_b0")
+    return {"detach_s": detach, "attach_s": attach, "drop_s": time.perf_counter() - start, "rows_removed": rows}
+
+
+def redis_bucket(doc, ranges):
+    day = doc_day(doc)
+    for i, (lo, hi) in enumerate(ranges):
+        if lo <= day < hi:
+            return i
+    return len(ranges) - 1
+
+
+def build_redis(adapter, ranges, chunk_size=1000):
+    drop_redis(adapter)
+    start = time.perf_counter()
+    for i in range(len(ranges)):
+        adapter.r.execute_command(
+            "FT.CREATE", f"rides_b{i}", "ON", "JSON", "PREFIX", "1", f"ridebucket:b{i}:",
+            "SCHEMA", "$.time.month", "AS", "month", "NUMERIC", "$.time.hour", "AS", "hour", "NUMERIC",
+            "$.time.day", "AS", "day", "NUMERIC",
+        )
+    pipe = adapter.r.pipeline(transaction=False)
+    for n, doc in enumerate(adapter.stream("scan", None, chunk_size)):
+        pipe.execute_command("JSON.SET", f"ridebucket:b{redis_bucket(doc, ranges)}:{n}", "$", json.dumps(doc))
+        if n % chunk_size == chunk_size - 1:
+            pipe.execute()
+    pipe.execute()
+    return time.perf_counter() - start
+
+
+def drop_redis(adapter):
+    for index in adapter.r.execute_command("FT._LIST"):
+        if index.startswith("rides_b"):
+            adapter.r.execute_command("FT.DROPINDEX", index, "DD")
+
+
+def redis_search(buckets, query):
+    def op(a):
+        return [a.r.execute_command("FT.SEARCH", f"rides_b{i}", query, "LIMIT", 0, REDIS_SEARCH_LIMIT) for i in buckets]
+    return op
+
+
+def redis_count_by_hour(buckets, query="*"):
+    def op(a):
+        counts = Counter()
+        for i in buckets:
+            reply = a.r.execute_command("FT.AGGREGATE", f"rides_b{i}", query, "GROUPBY", "1", "@hour",
+                                        "REDUCE", "COUNT", "0", "AS", "count")
+            for row in reply[1:]:
+                values = dict(zip(row[::2], row[1::2]))
+                counts[values["hour"]] += int(values["count"])
+        return counts
+    return op
+
+
+def redis_maintenance(adapter, ranges):
+    # Brak odpowiednika odłączenia/podłączenia — tylko usunięcie kubełka z dokumentami
+    if len(ranges) < 2:
+        return {}
+    rows = int(dict(zip(*[iter(adapter.r.execute_command("FT.INFO", "rides_b0"))] * 2))["num_docs"])
+    start = time.perf_counter()
+    adapter.r.execute_command("FT.DROPINDEX", "rides_b0", "DD")
+    return {"drop_s": time.perf_counter() - start, "rows_removed": rows}
+
+
+def document_workload(backend, ranges, lo, hi):
+    every = list(range(len(ranges)))
+    december = december_buckets(ranges, lo, hi)
+    last = hi - timedelta(days=1)
+    last_day = overlapping(ranges, last, hi)
+    if backend == "MongoDB":
+        return {
+            "rides_in_december": {backend: mongo_find(every, {"time.month": 12})},
+            "rides_in_december_pruned": {backend: mongo_find(december, {"time.month": 12})},
+            "ride_counts_by_hour": {backend: mongo_count_by_hour(every)},
+            "ride_counts_by_hour_last_day": {backend: mongo_count_by_hour(
+                last_day, {"$expr": {"$gte": [DAY, last.isoformat()]}})},
+        }
+    month, day = last.month, last.day
+    return {
+        "rides_in_december": {backend: redis_search(every, "@month:[12 12]")},
+        "rides_in_december_pruned": {backend: redis_search(december, "@month:[12 12]")},
+        "ride_counts_by_hour": {backend: redis_count_by_hour(every)},
+        "ride_counts_by_hour_last_day": {backend: redis_count_by_hour(
+            last_day, f"@month:[{month} {month}] @day:[{day} {day}]")},
+    }
+
+
+# === Przebieg ===
+
+def run_sql(adapter_cls, n, results, maintenance):
+    adapter = adapter_cls()
+    with adapter:
+        lo, hi = sql_edges(adapter)
+        edges = bounds(lo, hi, max(n, 1))
+        logger.info(f"{adapter.name}: budowa ride_part/time_part ({n} partycji)")
+        build_sql(adapter, n, edges)
+        catalog = sql_queries(hi.replace(hour=0, minute=0, second=0))
+        scanned = {label: partitions_scanned(adapter, sql, params) for label, (sql, params) in catalog.items()}
+
+    workload = {label: {adapter.name: (lambda a, s=sql, p=params: a.query(s, p))}
+                for label, (sql, params) in catalog.items()}
+    timings = run_workload([adapter], workload, repeats=REPEATS, warmup=WARMUP)
+    collect(results, adapter.name, n, timings, scanned)
+
+    with adapter:
+        maintenance.append({"backend": adapter.name, "partitions": n, **sql_maintenance(adapter, n, edges)})
+        for table in ("ride_part", "time_part"):
+            adapter.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+def run_document(backend, n, results, maintenance):
+    mongo = MongoAdapter()
+    with mongo:
+        lo, hi = day_range(mongo)
+    ranges = bucket_ranges(lo, hi, n)
+    adapter = mongo if backend == "MongoDB" else RedisAdapter()
+    with adapter:
+        logger.info(f"{backend}: budowa {len(ranges)} kubełków")
+        (build_mongo if backend == "MongoDB" else build_redis)(adapter, ranges)
+
+    workload = document_workload(backend, ranges, lo, hi)
+    timings = run_workload([adapter], workload, repeats=REPEATS, warmup=WARMUP)
+    december = len(december_buckets(ranges, lo, hi))
+    scanned = {"rides_in_december": len(ranges), "rides_in_december_pruned": december,
+               "ride_counts_by_hour": len(ranges), "ride_counts_by_hour_last_day": len(overlapping(ranges, hi - timedelta(days=1), hi))}
+    collect(results, backend, n, timings, scanned)
+
+    with adapter:
+        if backend == "MongoDB":
+            maintenance.append({"backend": backend, "partitions": n, **mongo_maintenance(adapter, ranges)})
+            drop_mongo(adapter)
+        else:
+            maintenance.append({"backend": backend, "partitions": n, **redis_maintenance(adapter, ranges)})
+            drop_redis(adapter)
+
+
+def collect(results, backend, n, timings, scanned):
+    for label, per_backend in timings.items():
+        t = per_backend.get(backend)
+        results.append({
+            "backend": backend,
+            "partitions": n,
+            "query": label,
+            "median_ms": statistics.median(t) * 1000 if t else None,
+            "partitions_scanned": scanned.get(label),
+            "timings": t or [],
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partycjonowanie po czasie: pruning, utrzymanie partycji, skan vs liczba partycji")
+    parser.add_argument("--partitions", default=",".join(map(str, PARTITION_COUNTS)),
+                        help="liczby partycji/kubełków, 0 = bez partycjonowania")
+    parser.add_argument("--backends", default="PostgreSQL,MySQL,MongoDB,Redis")
+    args = parser.parse_args()
+
+    results = []
+    maintenance = []
+    for backend in args.backends.split(","):
+        for n in map(int, args.partitions.split(",")):
+            try:
+                if backend in ("PostgreSQL", "MySQL"):
+                    run_sql(PostgresAdapter if backend == "PostgreSQL" else MySQLAdapter, n, results, maintenance)
+                else:
+                    run_document(backend, n, results, maintenance)
+            except Exception as e:
+                logger.error(f"{backend} ({n} partycji): {e}")
+
+    raw = {}
+    for r in results:
+        raw.setdefault(f"{r['query']}/{r['partitions']}", {})[r["backend"]] = r.pop("timings")
+    save_stats("query_partitions", raw)
+    with open(results_path("query_partitions_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    with open(results_path("query_partitions_maintenance.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=MAINTENANCE_FIELDS)
+        writer.writeheader()
+        writer.writerows(maintenance)
+    print("Wyniki zapisane do results/query_partitions_results.csv i results/query_partitions_maintenance.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import logging
+import random
+
+from catalog import load_catalog, random_values, render_sql
+from connections import MYSQL_CONFIG
+from harness import MySQLAdapter, PostgresAdapter, run_workload, results_path, save_stats
+from stats import summarize, SUMMARY_FIELDS
+
+try:
+    import mysql.connector
+except ImportError:
+    mysql = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Koszt parsowania/planowania dla zapytań z katalogu (catalog.json, domyślnie punktowe "point"),
+# z nowymi wartościami parametrów z generatorów przy każdym wykonaniu (losowane poza mierzonym oknem):
+#   text            — wartości wklejone w tekst SQL,
+#   client_bind     — %s + parametry; psycopg2 i pymysql wiążą po stronie klienta, więc serwer
+#                     i tak dostaje pełny tekst (różnica względem text = tylko koszt sklejania w sterowniku),
+#   server_prepared — PostgreSQL: PREPARE raz na sesję + EXECUTE (plan_cache_mode z --plan-cache-modes),
+#                     MySQL (pymysql): PREPARE ... FROM + SET @p + EXECUTE USING (dodatkowy round trip na SET),
+#                     MySQL (binary): mysql-connector-python, kursor prepared=True (COM_STMT_PREPARE/EXECUTE),
+#                     jeśli pakiet jest zainstalowany.
+# Połączenia spoza puli (pooled=False) — przygotowane instrukcje żyją tyle co sesja.
+
+WARMUP = 20
+REPEATS = 500
+MODES = ["text", "client_bind", "server_prepared"]
+
+FIELDS = ["query", "backend", "mode", "plan_cache_mode"] + SUMMARY_FIELDS + ["vs_prepared"]
+
+
+class SessionState:
+    # Przygotowane instrukcje należą do sesji — stan zerowany przy każdym połączeniu
+    def connect(self):
+        super().connect()
+        self.prepared = set()
+        self.prepared_cursor = None
+        return self
+
+
+class PreparedPostgresAdapter(SessionState, PostgresAdapter):
+    def __init__(self, plan_cache_mode="auto"):
+        super().__init__(pooled=False)
+        self.plan_cache_mode = plan_cache_mode
+
+    def connect(self):
+        super().connect()
+        self.execute(f"SET plan_cache_mode = {self.plan_cache_mode}")
+        return self
+
+
+class PreparedMySQLAdapter(SessionState, MySQLAdapter):
+    def __init__(self):
+        super().__init__(pooled=False)
+
+
+class MySQLBinaryAdapter(PreparedMySQLAdapter):
+    name = "MySQL (binary)"
+
+    def open_connection(self):
+        return mysql.connector.connect(**MYSQL_CONFIG)
+
+    def teardown(self):
+        if self.prepared_cursor is not None:
+            self.prepared_cursor.close()
+            self.prepared_cursor = None
+        super().teardown()
+
+
+# === Operacje ===
+
+def statement_name(label):
+    return f"bench_{label}"
+
+
+def text_op(entry):
+    def op(a, values):
+        sql, _ = render_sql(entry["sql"], values, "text")
+        return a.query(sql)
+    return op
+
+
+def client_bind_op(entry):
+    def op(a, values):
+        sql, params = render_sql(entry["sql"], values, "format")
+        return a.query(sql, params)
+    return op
+
+
+def pg_prepared_op(label, entry):
+    name = statement_name(label)
+    sql, _ = render_sql(entry["sql"], {p: None for p in entry["params"]}, "numeric")
+
+    def op(a, values):
+        if name not in a.prepared:
+            a.execute(f"PREPARE {name} AS {sql}", commit=False)
+            a.prepared.add(name)
+        params = render_sql(entry["sql"], values, "numeric")[1]
+        placeholders = ", ".join(["%s"] * len(params))
+        return a.query(f"EXECUTE {name} ({placeholders})" if params else f"EXECUTE {name}", params)
+    return op
+
+
+def mysql_prepared_op(label, entry):
+    name = statement_name(label)
+    sql, _ = render_sql(entry["sql"], {p: None for p in entry["params"]}, "qmark")
+
+    def op(a, values):
+        if name not in a.prepared:
+            a.execute(f"PREPARE {name} FROM %s", (sql,), commit=False)
+            a.prepared.add(name)
+        params = render_sql(entry["sql"], values, "qmark")[1]
+        variables = [f"@p{i}" for i in range(len(params))]
+        if params:
+            a.execute("SET " + ", ".join(f"{v} = %s" for v in variables), params, commit=False)
+            return a.query(f"EXECUTE {name} USING {', '.join(variables)}")
+        return a.query(f"EXECUTE {name}")
+    return op
+
+
+def mysql_binary_prepared_op(entry):
+    sql, _ = render_sql(entry["sql"], {p: None for p in entry["params"]}, "qmark")
+
+    def op(a, values):
+        if a.prepared_cursor is None:
+            a.prepared_cursor = a.conn.cursor(prepared=True)
+        a.prepared_cursor.execute(sql, render_sql(entry["sql"], values, "qmark")[1])
+        return a.prepared_cursor.fetchall()
+    return op
+
+
+def values_setup(entry, rng):
+    def setup(a):
+        return random_values(entry, rng)
+    return setup
+
+
+def build_workload(catalog, modes, seed):
+    workload = {}
+    for label, entry in catalog.items():
+        rng = random.Random(seed)
+        setup = values_setup(entry, rng)
+        for mode in modes:
+            if mode == "text":
+                ops = {backend: text_op(entry) for backend in ("PostgreSQL", "MySQL", "MySQL (binary)")}
+            elif mode == "client_bind":
+                ops = {backend: client_bind_op(entry) for backend in ("PostgreSQL", "MySQL", "MySQL (binary)")}
+            else:
+                ops = {
+                    "PostgreSQL": pg_prepared_op(label, entry),
+                    "MySQL": mysql_prepared_op(label, entry),
+                    "MySQL (binary)": mysql_binary_prepared_op(entry),
+                }
+            workload[f"{label}/{mode}"] = {backend: (op, setup) for backend, op in ops.items()}
+    return workload
+
+
+# === Przebieg ===
+
+def session_adapters(backends, plan_cache_mode):
+    adapters = []
+    for backend in backends:
+        if backend == "PostgreSQL":
+            adapters.append(PreparedPostgresAdapter(plan_cache_mode))
+        elif backend == "MySQL":
+            adapters.append(PreparedMySQLAdapter())
+        elif mysql is not None:
+            adapters.append(MySQLBinaryAdapter())
+        else:
+            logger.warning("MySQL (binary): brak mysql-connector-python — pomijam")
+    return adapters
+
+
+def run_mode(catalog, modes, backends, plan_cache_mode, seed):
+    adapters = session_adapters(backends, plan_cache_mode)
+    return run_workload(adapters, build_workload(catalog, modes, seed), repeats=REPEATS, warmup=WARMUP)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tekst vs wiązanie parametrów po stronie klienta vs przygotowane instrukcje")
+    parser.add_argument("--tag", default="point", help="grupa zapytań z catalog.json (point, select)")
+    parser.add_argument("--queries", default=None, help="etykiety po przecinku (domyślnie cała grupa)")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--backends", default="PostgreSQL,MySQL,MySQL (binary)")
+    parser.add_argument("--plan-cache-modes", default="auto",
+                        help="plan_cache_mode PostgreSQL, np. auto,force_custom_plan,force_generic_plan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = load_catalog(tag=args.tag)
+    if args.queries:
+        catalog = {label: catalog[label] for label in args.queries.split(",")}
+    modes = args.modes.split(",")
+    backends = args.backends.split(",")
+
+    rows = []
+    all_timings = {}
+    for plan_cache_mode in args.plan_cache_modes.split(","):
+        logger.info(f"plan_cache_mode = {plan_cache_mode}")
+        # Inne tryby planu dotyczą tylko PostgreSQL — MySQL mierzony raz
+        run_backends = backends if plan_cache_mode == args.plan_cache_modes.split(",")[0] else ["PostgreSQL"]
+        timings = run_mode(catalog, modes, run_backends, plan_cache_mode, args.seed)
+        for key, per_backend in timings.items():
+            label, mode = key.rsplit("/", 1)
+            for backend, t in per_backend.items():
+                if t is None:
+                    continue
+                pcm = plan_cache_mode if backend == "PostgreSQL" else None
+                all_timings.setdefault(f"{key}/{pcm}" if pcm else key, {})[backend] = t
+                rows.append({"query": label, "backend": backend, "mode": mode, "plan_cache_mode": pcm, **summarize(t)})
+
+    # Mediana względem server_prepared tego samego zapytania/backendu/trybu planu
+    prepared = {(r["query"], r["backend"], r["plan_cache_mode"]): r["median"] for r in rows if r["mode"] == "server_prepared"}
+    for row in rows:
+        base = prepared.get((row["query"], row["backend"], row["plan_cache_mode"]))
+        row["vs_prepared"] = row["median"] / base if base else None
+        logger.info(f"{row['backend']} {row['query']} {row['mode']} ({row['plan_cache_mode']}): "
+                    f"median {row['median']:.3f} ms, p99 {row['p99']:.3f} ms")
+
+    save_stats("query_prepared", all_timings)
+    with open(results_path("query_prepared_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    print("Wyniki zapisane do results/query_prepared_results.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import csv
+import logging
+import random
+import statistics
+import time
+
+from generate_data import TABLE_COLUMNS
+from harness import MySQLAdapter, PostgresAdapter, MongoAdapter, RedisAdapter, run_workload, results_path, save_stats
+from catalog import load_catalog, default_values, random_values, render_query, render_sql
+from query_select import build_workload, sql_op
+from query_select_all import FULL_RIDE_JOIN_BASE_SQL
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Warianty układu danych SQL dla zapytań z joinami (katalog query_select.py + pobranie pełnego przejazdu):
+#   normalized — obecny schemat 8 tabel z joinami,
+#   flat       — szeroka tabela ride_flat (CREATE TABLE ... AS SELECT z pełnego joinu), PostgreSQL i MySQL,
+#   matview    — zmaterializowany widok ride_mv w PostgreSQL (mierzony też koszt REFRESH),
+#   jsonb      — tabela ride_doc(id, doc JSONB) w kształcie dokumentu Mongo, z indeksem GIN (jsonb_path_ops),
+#   document   — MongoDB i Redis z tym samym katalogiem (punkt odniesienia).
+# GIN jsonb_path_ops przyspiesza tylko warunki równościowe (@>); zakresy liczbowe idą przez rzutowanie ->>.
+
+WARMUP = 2
+REPEATS = 10
+FETCH_LIMIT = 10000
+
+VARIANTS = ["normalized", "flat", "matview", "jsonb", "document"]
+VARIANT_BACKENDS = {
+    "normalized": [MySQLAdapter, PostgresAdapter],
+    "flat": [MySQLAdapter, PostgresAdapter],
+    "matview": [PostgresAdapter],
+    "jsonb": [PostgresAdapter],
+    "document": [MongoAdapter, RedisAdapter],
+}
+
+# Aliasy tabel jak w FULL_RIDE_JOIN_BASE_SQL i ścieżki w dokumencie (generate_data.gen_ride)
+TABLE_ALIASES = {
+    "Ride": "r", "Price": "p", "Time": "t", "Weather": "w",
+    "Temperature": "temp", "ApparentTemperature": "atemp", "Wind": "wind", "Conditions": "cond",
+}
+DOC_PATHS = {
+    "Ride": [], "Price": ["price"], "Time": ["time"], "Weather": ["weather"],
+    "Temperature": ["weather", "temperature"], "ApparentTemperature": ["weather", "apparentTemperature"],
+    "Wind": ["weather", "wind"], "Conditions": ["weather", "conditions"],
+}
+FK_COLUMNS = {"price_id", "time_id", "weather_id", "temperature_id", "apparent_temperature_id", "wind_id", "conditions_id"}
+
+
+def flat_columns():
+    # (alias tabeli, kolumna, nazwa w ride_flat); powtarzające się nazwy (visibility, windBearing) z prefiksem tabeli
+    columns = [("r", "id", "id")]
+    seen = {"id"}
+    for table, alias in TABLE_ALIASES.items():
+        for column in TABLE_COLUMNS[table][1:]:
+            if column in FK_COLUMNS:
+                continue
+            name = column if column.lower() not in seen else f"{table.lower()}_{column}"
+            seen.add(name.lower())
+            columns.append((alias, column, name))
+    return columns
+
+
+def flat_select():
+    select = ", ".join(f"{alias}.{column} AS {name}" for alias, column, name in flat_columns())
+    return FULL_RIDE_JOIN_BASE_SQL.replace("r.*, p.*, t.*, w.*, temp.*, atemp.*, wind.*, cond.*", select)
+
+
+def jsonb_object(table):
+    alias = TABLE_ALIASES[table]
+    return [f"'{c}', {alias}.{c}" for c in TABLE_COLUMNS[table][1:] if c not in FK_COLUMNS]
+
+
+def jsonb_doc_sql():
+    # jsonb_build_object zagnieżdżony jak dokument Mongo (nazwy kluczy w camelCase jak w dokumentach)
+    def obj(table, nested=()):
+        parts = jsonb_object(table) + [f"'{DOC_PATHS[n][-1]}', {obj(n)}" for n in nested]
+        return f"jsonb_build_object({', '.join(parts)})"
+    weather = obj("Weather", ("Temperature", "ApparentTemperature", "Wind", "Conditions"))
+    ride = jsonb_object("Ride") + [f"'price', {obj('Price')}", f"'time', {obj('Time')}", f"'weather', {weather}"]
+    select = f"r.id, jsonb_build_object({', '.join(ride)}) AS doc"
+    return FULL_RIDE_JOIN_BASE_SQL.replace("r.*, p.*, t.*, w.*, temp.*, atemp.*, wind.*, cond.*", select)
+
+
+# === Budowa wariantów ===
+
+def build_flat(adapter):
+    adapter.execute("DROP TABLE IF EXISTS ride_flat")
+    start = time.perf_counter()
+    adapter.execute(f"CREATE TABLE ride_flat AS {flat_select()}")
+    adapter.execute("ALTER TABLE ride_flat ADD PRIMARY KEY (id)")
+    return {"build_s": time.perf_counter() - start}
+
+
+def build_matview(adapter):
+    adapter.execute("DROP MATERIALIZED VIEW IF EXISTS ride_mv")
+    start = time.perf_counter()
+    adapter.execute(f"CREATE MATERIALIZED VIEW ride_mv AS {flat_select()}")
+    # Unikalny indeks jest wymagany przez REFRESH ... CONCURRENTLY
+    adapter.execute("CREATE UNIQUE INDEX ride_mv_id ON ride_mv (id)")
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    adapter.execute("REFRESH MATERIALIZED VIEW ride_mv")
+    refresh = time.perf_counter() - start
+    start = time.perf_counter()
+    adapter.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY ride_mv")
+    return {"build_s": build, "refresh_s": refresh, "refresh_concurrent_s": time.perf_counter() - start}
+
+
+def build_jsonb(adapter):
+    adapter.execute("DROP TABLE IF EXISTS ride_doc")
+    start = time.perf_counter()
+    adapter.execute(f"CREATE TABLE ride_doc AS {jsonb_doc_sql()}")
+    adapter.execute("ALTER TABLE ride_doc ADD PRIMARY KEY (id)")
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    adapter.execute("CREATE INDEX ride_doc_gin ON ride_doc USING GIN (doc jsonb_path_ops)")
+    return {"build_s": build, "index_s": time.perf_counter() - start}
+
+
+BUILDERS = {"flat": ("ride_flat", build_flat), "matview": ("ride_mv", build_matview), "jsonb": ("ride_doc", build_jsonb)}
+
+
+def relation_size_mb(adapter, relation):
+    if adapter.name == "PostgreSQL":
+        size = adapter.query("SELECT pg_total_relation_size(%s::regclass)", (relation,))[0][0]
+    else:
+        size = adapter.query(
+            "SELECT data_length + index_length FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s", (relation,)
+        )[0][0]
+    return float(size) / 1024 / 1024
+
+
+def drop_variant(adapter, variant):
+    if variant == "matview":
+        adapter.execute("DROP MATERIALIZED VIEW IF EXISTS ride_mv")
+    elif variant in BUILDERS:
+        adapter.execute(f"DROP TABLE IF EXISTS {BUILDERS[variant][0]}")
+
+
+# === Katalog zapytań dla wariantów ===
+# Te same kolumny wyniku i te same wartości parametrów (catalog.json) we wszystkich wariantach SQL —
+# różni się tylko układ danych, z którego są czytane.
+
+RIDE_COLUMNS = [("Ride", c) for c in ("id", "source", "destination", "cab_type", "product_id", "name")]
+
+QUERY_COLUMNS = {
+    "rides_by_lyft": RIDE_COLUMNS,
+    "rides_from_north_station": RIDE_COLUMNS,
+    "price_distance_filter": [("Price", c) for c in ("price", "distance", "surge_multiplier", "latitude", "longitude")],
+    "rides_in_december": [("Time", c) for c in ("timestamp", "hour", "day", "month", "datetime", "timezone")],
+    "ride_names_temp_above_40": [("Ride", "name")],
+    "rides_wind_gt5_humidity_lt07": RIDE_COLUMNS,
+}
+
+# Część zapytania po liście kolumn; parametry {nazwa} jak w catalog.json
+NORMALIZED_FROM = {
+    "rides_by_lyft": "FROM Ride r WHERE r.cab_type = {cab_type}",
+    "rides_from_north_station": "FROM Ride r WHERE r.source = {source}",
+    "price_distance_filter": "FROM Price p WHERE p.distance > {distance} AND p.price < {price} ORDER BY p.price DESC",
+    "rides_in_december": "FROM Time t WHERE t.month = {month}",
+    "ride_names_temp_above_40": "FROM Ride r JOIN Weather w ON r.weather_id = w.id "
+                                "JOIN Temperature temp ON w.temperature_id = temp.id "
+                                "WHERE temp.temperatureHigh > {temperature}",
+    "rides_wind_gt5_humidity_lt07": "FROM Ride r JOIN Weather w ON r.weather_id = w.id "
+                                    "JOIN Wind wind ON w.wind_id = wind.id "
+                                    "WHERE wind.windSpeed > {wind_speed} AND w.humidity < {humidity}",
+}
+FLAT_WHERE = {
+    "rides_by_lyft": "WHERE cab_type = {cab_type}",
+    "rides_from_north_station": "WHERE source = {source}",
+    "price_distance_filter": "WHERE distance > {distance} AND price < {price} ORDER BY price DESC",
+    "rides_in_december": "WHERE month = {month}",
+    "ride_names_temp_above_40": "WHERE temperatureHigh > {temperature}",
+    "rides_wind_gt5_humidity_lt07": "WHERE windSpeed > {wind_speed} AND humidity < {humidity}",
+}
+
+
+def jsonb_num(*path):
+    return f"(doc #>> '{{{','.join(path)}}}')::numeric"
+
+
+JSONB_WHERE = {
+    "rides_by_lyft": "WHERE doc @> jsonb_build_object('cab_type', {cab_type})",
+    "rides_from_north_station": "WHERE doc @> jsonb_build_object('source', {source})",
+    "price_distance_filter": f"WHERE {jsonb_num('price', 'distance')} > {{distance}} "
+                             f"AND {jsonb_num('price', 'price')} < {{price}} ORDER BY {jsonb_num('price', 'price')} DESC",
+    "rides_in_december": "WHERE doc @> jsonb_build_object('time', jsonb_build_object('month', {month}))",
+    "ride_names_temp_above_40": f"WHERE {jsonb_num('weather', 'temperature', 'temperatureHigh')} > {{temperature}}",
+    "rides_wind_gt5_humidity_lt07": f"WHERE {jsonb_num('weather', 'wind', 'windSpeed')} > {{wind_speed}} "
+                                    f"AND {jsonb_num('weather', 'humidity')} < {{humidity}}",
+}
+
+AGGREGATES = {
+    "normalized": {
+        "avg_price_by_cab_type": "SELECT r.cab_type, AVG(p.price) FROM Ride r JOIN Price p ON r.price_id = p.id "
+                                 "GROUP BY r.cab_type",
+        "ride_counts_by_hour": "SELECT t.hour, COUNT(*) FROM Ride r JOIN Time t ON r.time_id = t.id GROUP BY t.hour",
+    },
+    "flat": {
+        "avg_price_by_cab_type": "SELECT cab_type, AVG(price) FROM {table} GROUP BY cab_type",
+        "ride_counts_by_hour": "SELECT hour, COUNT(*) FROM {table} GROUP BY hour",
+    },
+    "jsonb": {
+        "avg_price_by_cab_type": f"SELECT doc->>'cab_type', AVG({jsonb_num('price', 'price')}) FROM ride_doc GROUP BY 1",
+        "ride_counts_by_hour": "SELECT doc #>> '{time,hour}', COUNT(*) FROM ride_doc GROUP BY 1",
+    },
+}
+
+
+def flat_names():
+    return {(alias, column): name for alias, column, name in flat_columns()}
+
+
+def column_sql(variant, table, column):
+    if variant == "normalized":
+        return f"{TABLE_ALIASES[table]}.{column}"
+    if variant == "jsonb":
+        if table == "Ride":
+            return "id" if column == "id" else f"doc->>'{column}'"
+        return "doc #>> '{" + ",".join(DOC_PATHS[table] + [column]) + "}'"
+    return flat_names()[(TABLE_ALIASES[table], column)]
+
+
+def variant_catalog(variant, values):
+    """Szablony zapytań wariantu wyrenderowane wartościami parametrów {etykieta: {parametr: wartość}}."""
+    table = "ride_mv" if variant == "matview" else "ride_flat"
+    kind = "flat" if variant in ("flat", "matview") else variant
+    catalog = {}
+    for label, columns in QUERY_COLUMNS.items():
+        select = ", ".join(column_sql(kind, t, c) for t, c in columns)
+        if kind == "normalized":
+            template = f"SELECT {select} {NORMALIZED_FROM[label]}"
+        elif kind == "jsonb":
+            template = f"SELECT {select} FROM ride_doc {JSONB_WHERE[label]}"
+        else:
+            template = f"SELECT {select} FROM {table} {FLAT_WHERE[label]}"
+        catalog[label] = render_sql(template, values[label])[0]
+    for label, sql in AGGREGATES[kind].items():
+        catalog[label] = sql.replace("{table}", table)
+
+    # Pełny przejazd: kolumny ride_flat (bez kluczy obcych) we wszystkich wariantach
+    full = [(table_name, column) for table_name, alias in TABLE_ALIASES.items()
+            for column in TABLE_COLUMNS[table_name] if (alias, column) in flat_names()]
+    if kind == "normalized":
+        catalog["fetch_all"] = flat_select() + "LIMIT %s"
+    elif kind == "jsonb":
+        catalog["fetch_all"] = f"SELECT {', '.join(column_sql('jsonb', t, c) for t, c in full)} FROM ride_doc LIMIT %s"
+    else:
+        catalog["fetch_all"] = f"SELECT {', '.join(name for _, _, name in flat_columns())} FROM {table} LIMIT %s"
+    return catalog
+
+
+def variant_workload(variant, limit, catalog, values):
+    if variant == "document":
+        from query_select_all import mongo_fetch_op, redis_fetch_op
+        workload = build_workload({label: render_query(entry, values[label]) for label, entry in catalog.items()})
+        workload["fetch_all"] = {"MongoDB": mongo_fetch_op(limit), "Redis": redis_fetch_op(limit)}
+        return workload
+    return {
+        label: {
+            backend: sql_op(sql, (limit,) if label == "fetch_all" else None)
+            for backend in ("MySQL", "PostgreSQL")
+        }
+        for label, sql in variant_catalog(variant, values).items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Katalog zapytań na wariantach schematu (joiny, ride_flat, widok, JSONB)")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--limit", type=int, default=FETCH_LIMIT, help="limit wierszy dla fetch_all")
+    parser.add_argument("--skip-build", action="store_true", help="użyj istniejących ride_flat / ride_mv / ride_doc")
+    parser.add_argument("--drop", action="store_true", help="usuń obiekty wariantów po pomiarze")
+    parser.add_argument("--param-seed", type=int, default=None,
+                        help="parametry zapytań losowane z generatorów catalog.json zamiast wartości domyślnych")
+    args = parser.parse_args()
+    variants = args.variants.split(",")
+
+    # Jedne wartości parametrów dla wszystkich wariantów (także dla MongoDB/Redis w "document")
+    catalog = load_catalog(tag="select")
+    rng = random.Random(args.param_seed) if args.param_seed is not None else None
+    values = {label: random_values(entry, rng) if rng else default_values(entry) for label, entry in catalog.items()}
+
+    builds = []
+    rows = []
+    for variant in variants:
+        adapters = [cls() for cls in VARIANT_BACKENDS[variant]]
+        if variant in BUILDERS and not args.skip_build:
+            relation, builder = BUILDERS[variant]
+            for adapter in adapters:
+                logger.info(f"{adapter.name}: budowa wariantu {variant}")
+                try:
+                    with adapter:
+                        build = builder(adapter)
+                        build["size_mb"] = relation_size_mb(adapter, relation)
+                except Exception as e:
+                    logger.error(f"{adapter.name} {variant}: błąd budowy: {e}")
+                    continue
+                builds.append({"variant": variant, "backend": adapter.name, **build})
+
+        timings = run_workload(adapters, variant_workload(variant, args.limit, catalog, values), repeats=REPEATS, warmup=WARMUP)
+        save_stats(f"query_schema_{variant}", timings)
+        for label, per_backend in timings.items():
+            for backend, t in per_backend.items():
+                rows.append({
+                    "query": label,
+                    "variant": variant,
+                    "backend": backend,
+                    "median_ms": statistics.median(t) * 1000 if t else None,
+                })
+
+        if args.drop and variant in BUILDERS:
+            for adapter in adapters:
+                with adapter:
+                    drop_variant(adapter, variant)
+
+    with open(results_path("query_schema_variants.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["query", "variant", "backend", "median_ms"])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(results_path("query_schema_builds.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["variant", "backend", "build_s", "index_s", "refresh_s",
+                                                  "refresh_concurrent_s", "size_mb"])
+        writer.writeheader()
+        writer.writerows(builds)
+
+    for label in dict.fromkeys(r["query"] for r in rows):
+        cells = [f"{r['variant']}/{r['backend']}: {r['median_ms']:.1f}" for r in rows
+                 if r["query"] == label and r["median_ms"] is not None]
+        print(f"{label:<30} " + "  ".join(cells))
+    print("Wyniki zapisane do results/query_schema_variants.csv i results/query_schema_builds.csv")
+
+
+if __name__ == "__main__":
+    main()
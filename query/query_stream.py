@@ -0,0 +1,126 @@
+import argparse
+import csv
+import logging
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from harness import ADAPTERS, results_path
+from query_select_all import FULL_RIDE_JOIN_BASE_SQL, FULL_RIDE_JOIN_SQL
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Pobieranie dużych wyników: fetchall()/list(find()) vs kursory po stronie serwera
+# (psycopg2 named cursor + itersize, pymysql SSCursor, Mongo batch_size, Redis SCAN + JSON.GET w paczkach).
+# Każdy pomiar działa w osobnym procesie, żeby ru_maxrss był szczytem RSS tylko tego pomiaru.
+
+REPEATS = 3
+ITERSIZE = 2000
+STREAM_BACKENDS = ["MySQL", "PostgreSQL", "MongoDB", "Redis"]
+MODES = ["fetchall", "stream"]
+
+FIELDS = ["backend", "mode", "run", "rows", "ttfr_ms", "total_s", "rows_per_s", "peak_rss_mb", "rss_growth_mb"]
+
+
+def rss_mb():
+    # ru_maxrss na Linuksie jest w KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_rows(adapter, mode, limit, itersize):
+    if adapter.name == "Redis":
+        # SCAN + JSON.GET w paczkach po itersize; "fetchall" = najpierw wszystkie dokumenty do listy
+        docs = adapter.stream("scan", limit, itersize)
+        return docs if mode == "stream" else iter(list(docs))
+
+    if adapter.name == "MongoDB":
+        if mode == "stream":
+            return adapter.stream(batch_size=itersize, limit=limit or 0)
+        return iter(list(adapter.collection.find().limit(limit or 0)))
+
+    sql, params = (FULL_RIDE_JOIN_SQL, (limit,)) if limit else (FULL_RIDE_JOIN_BASE_SQL, None)
+    if mode == "stream":
+        return adapter.stream(sql, params, itersize)
+    return iter(adapter.query(sql, params))
+
+
+def fetch_run(backend, mode, limit, itersize):
+    adapter = ADAPTERS[backend]()
+    adapter.connect()
+    try:
+        baseline = rss_mb()
+        rows = 0
+        ttfr = None
+        start = time.perf_counter()
+        # Dla fetchall pierwszy wiersz jest dostępny dopiero po pobraniu całości
+        for _ in open_rows(adapter, mode, limit, itersize):
+            if ttfr is None:
+                ttfr = time.perf_counter() - start
+            rows += 1
+        total = time.perf_counter() - start
+        peak = rss_mb()
+    finally:
+        adapter.teardown()
+
+    ttfr = ttfr if ttfr is not None else total
+    sustained = total - ttfr
+    return {
+        "backend": backend,
+        "mode": mode,
+        "rows": rows,
+        "ttfr_ms": ttfr * 1000,
+        "total_s": total,
+        # Przepustowość po pierwszym wierszu; dla fetchall liczona z całego czasu
+        "rows_per_s": (rows - 1) / sustained if sustained > 0 and rows > 1 else rows / total if total else 0.0,
+        "peak_rss_mb": peak,
+        "rss_growth_mb": peak - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strumieniowego pobierania dużych wyników")
+    parser.add_argument("--limit", type=int, default=None, help="limit wierszy (domyślnie cały zbiór)")
+    parser.add_argument("--itersize", type=int, default=ITERSIZE)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--backends", default=",".join(STREAM_BACKENDS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    rows = []
+    for backend in args.backends.split(","):
+        for mode in args.modes.split(","):
+            for run in range(1, args.repeats + 1):
+                try:
+                    # Nowy proces na każdy pomiar -> niezależny szczyt RSS
+                    with ProcessPoolExecutor(max_workers=1) as pool:
+                        row = pool.submit(fetch_run, backend, mode, args.limit, args.itersize).result()
+                except Exception as e:
+                    logger.error(f"{backend} ({mode}): {e}")
+                    break
+                row["run"] = run
+                logger.info(
+                    f"{backend} {mode} #{run}: {row['rows']} wierszy, TTFR {row['ttfr_ms']:.1f} ms, "
+                    f"{row['rows_per_s']:.0f} wierszy/s, szczyt RSS {row['peak_rss_mb']:.1f} MB"
+                )
+                rows.append(row)
+
+    with open(results_path("query_stream_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+
+    for backend in args.backends.split(","):
+        for mode in args.modes.split(","):
+            series = [r for r in rows if r["backend"] == backend and r["mode"] == mode]
+            if series:
+                print(f"{backend:<10} {mode:<9} TTFR {statistics.median(r['ttfr_ms'] for r in series):10.1f} ms  "
+                      f"{statistics.median(r['rows_per_s'] for r in series):10.0f} wierszy/s  "
+                      f"RSS {max(r['peak_rss_mb'] for r in series):8.1f} MB")
+    print("Wyniki zapisane do results/query_stream_results.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import argparse
+import csv
+import json
+import logging
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import pymysql
+import redis
+from pymongo.errors import PyMongoError
+
+from generate_data import TABLE_COLUMNS, TABLE_ORDER, gen_ride, sql_rows
+from harness import ADAPTERS, results_path
+from stats import percentile
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Atomowe zapisy kompletnego przejazdu pod współbieżnością.
+# SQL: jedna transakcja na przejazd — 8 tabel (Time, Price, Wind, Temperature, ApparentTemperature,
+# Conditions, Weather, Ride) z kluczami obcymi łańcuchowanymi przez RETURNING (PostgreSQL) / lastrowid (MySQL),
+# w PostgreSQL dodatkowo jedna instrukcja z CTE (--pg-cte). MongoDB: jeden dokument (zapis atomowy),
+# opcjonalnie w transakcji wielodokumentowej (--mongo-txn, wymaga replica setu). Redis: MULTI/EXEC,
+# aktualizacja jako odczyt-modyfikacja-zapis z WATCH.
+# Aktualizacje trafiają w mały zbiór gorących przejazdów (HOT_RIDES), więc klienci konkurują o te same wiersze;
+# konflikty (serialization failure, deadlock, lock wait timeout, WatchError, TransientTransactionError)
+# są ponawiane do MAX_RETRIES razy i raportowane jako conflict_rate.
+
+CLIENT_COUNTS = [1, 4, 16]
+OPS_PER_CLIENT = 100
+HOT_RIDES = 20
+MAX_RETRIES = 5
+ISOLATION_LEVELS = ["READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"]
+
+FIELDS = ["backend", "op", "clients", "ops", "failures", "conflicts", "conflict_rate", "lock_waits",
+          "wall_s", "throughput_ops_s", "p50_ms", "p99_ms"]
+
+FK_COLUMNS = {
+    "Weather": ["temperature_id", "apparent_temperature_id", "wind_id", "conditions_id"],
+    "Ride": ["price_id", "time_id", "weather_id"],
+}
+FK_SOURCES = {
+    "temperature_id": "Temperature", "apparent_temperature_id": "ApparentTemperature",
+    "wind_id": "Wind", "conditions_id": "Conditions",
+    "price_id": "Price", "time_id": "Time", "weather_id": "Weather",
+}
+CTE_ALIASES = {table: f"ins_{table.lower()}" for table in TABLE_ORDER}
+REDIS_PREFIX = "ride:txn:"
+
+
+def table_values(doc):
+    # {tabela: (kolumny bez id i FK, wartości)} w kolejności wynikającej z kluczy obcych
+    rows = sql_rows(0, doc)
+    out = {}
+    for table in TABLE_ORDER:
+        columns = [c for c in TABLE_COLUMNS[table][1:] if c not in FK_COLUMNS.get(table, [])]
+        out[table] = (columns, rows[table][1:1 + len(columns)])
+    return out
+
+
+# === SQL ===
+
+def sql_insert(a, doc):
+    ids = {}
+    for table, (columns, values) in table_values(doc).items():
+        fk_columns = FK_COLUMNS.get(table, [])
+        all_columns = columns + fk_columns
+        params = list(values) + [ids[FK_SOURCES[c]] for c in fk_columns]
+        sql = f"INSERT INTO {table} ({', '.join(all_columns)}) VALUES ({', '.join(['%s'] * len(all_columns))})"
+        if a.name == "PostgreSQL":
+            a.execute(sql + " RETURNING id", params, commit=False)
+            ids[table] = a.cursor.fetchone()[0]
+        else:
+            a.execute(sql, params, commit=False)
+            ids[table] = a.cursor.lastrowid
+    a.conn.commit()
+    return ids["Ride"]
+
+
+def pg_insert_cte(a, doc):
+    # Cały graf w jednej instrukcji (jeden round-trip): WITH ins_time AS (INSERT ... RETURNING id), ...
+    ctes = []
+    params = []
+    final = None
+    for table, (columns, values) in table_values(doc).items():
+        fk_columns = FK_COLUMNS.get(table, [])
+        placeholders = ", ".join(["%s"] * len(columns))
+        if fk_columns:
+            sources = [CTE_ALIASES[FK_SOURCES[c]] for c in fk_columns]
+            select = f"SELECT {placeholders}, {', '.join(s + '.id' for s in sources)} FROM {', '.join(sources)}"
+        else:
+            select = f"VALUES ({placeholders})"
+        stmt = f"INSERT INTO {table} ({', '.join(columns + fk_columns)}) {select} RETURNING id"
+        params.extend(values)
+        if table == "Ride":
+            final = stmt
+        else:
+            ctes.append(f"{CTE_ALIASES[table]} AS ({stmt})")
+    a.execute("WITH " + ",\n".join(ctes) + "\n" + final, params, commit=False)
+    ride_id = a.cursor.fetchone()[0]
+    a.conn.commit()
+    return ride_id
+
+
+def sql_update(a, ride_id):
+    # Odczyt-modyfikacja-zapis ceny i wilgotności z blokadą wierszy
+    a.execute(
+        "SELECT p.id, p.price, r.weather_id FROM Ride r JOIN Price p ON r.price_id = p.id WHERE r.id = %s FOR UPDATE",
+        (ride_id,), commit=False,
+    )
+    price_id, price, weather_id = a.cursor.fetchone()
+    a.execute("UPDATE Price SET price = %s WHERE id = %s", (round(float(price) * 1.01, 2), price_id), commit=False)
+    a.execute("UPDATE Weather SET humidity = %s WHERE id = %s", (round(random.random(), 2), weather_id), commit=False)
+    a.conn.commit()
+
+
+def sql_delete(a, ride_id):
+    a.execute("SELECT price_id, time_id, weather_id FROM Ride WHERE id = %s FOR UPDATE", (ride_id,), commit=False)
+    price_id, time_id, weather_id = a.cursor.fetchone()
+    a.execute(
+        "SELECT temperature_id, apparent_temperature_id, wind_id, conditions_id FROM Weather WHERE id = %s FOR UPDATE",
+        (weather_id,), commit=False,
+    )
+    temperature_id, apparent_id, wind_id, conditions_id = a.cursor.fetchone()
+    for table, row_id in (("Ride", ride_id), ("Weather", weather_id), ("Price", price_id), ("Time", time_id),
+                          ("Temperature", temperature_id), ("ApparentTemperature", apparent_id),
+                          ("Wind", wind_id), ("Conditions", conditions_id)):
+        a.execute(f"DELETE FROM {table} WHERE id = %s", (row_id,), commit=False)
+    a.conn.commit()
+
+
+def set_isolation(a, level):
+    if a.name == "PostgreSQL":
+        a.conn.rollback()
+        a.conn.set_session(isolation_level=level)
+    else:
+        a.execute(f"SET SESSION TRANSACTION ISOLATION LEVEL {level}")
+
+
+# === MongoDB ===
+
+def mongo_insert(a, doc, session=None):
+    return a.collection.insert_one(doc, session=session).inserted_id
+
+
+def mongo_update(a, ride_id, session=None):
+    if session is None:
+        # Pojedynczy dokument: $mul/$set są atomowe po stronie serwera
+        a.collection.update_one({"_id": ride_id}, {"$mul": {"price.price": 1.01},
+                                                    "$set": {"weather.humidity": round(random.random(), 2)}})
+        return
+    doc = a.collection.find_one({"_id": ride_id}, {"price.price": 1}, session=session)
+    a.collection.update_one(
+        {"_id": ride_id},
+        {"$set": {"price.price": round(doc["price"]["price"] * 1.01, 2), "weather.humidity": round(random.random(), 2)}},
+        session=session,
+    )
+
+
+def mongo_delete(a, ride_id, session=None):
+    a.collection.delete_one({"_id": ride_id}, session=session)
+
+
+def mongo_transaction(op):
+    def wrapped(a, arg):
+        with a.client.start_session() as session:
+            with session.start_transaction():
+                return op(a, arg, session)
+    return wrapped
+
+
+# === Redis ===
+
+def redis_insert(a, doc):
+    key = f"{REDIS_PREFIX}{uuid.uuid4().hex}"
+    pipe = a.r.pipeline(transaction=True)
+    pipe.execute_command("JSON.SET", key, "$", json.dumps(doc))
+    pipe.execute()
+    return key
+
+
+def redis_update(a, key):
+    with a.r.pipeline(transaction=True) as pipe:
+        pipe.watch(key)
+        price = json.loads(pipe.execute_command("JSON.GET", key, "$.price.price"))[0]
+        pipe.multi()
+        pipe.execute_command("JSON.SET", key, "$.price.price", round(price * 1.01, 2))
+        pipe.execute_command("JSON.SET", key, "$.weather.humidity", round(random.random(), 2))
+        pipe.execute()
+
+
+def redis_delete(a, key):
+    pipe = a.r.pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.execute()
+
+
+def backend_ops(backend, pg_cte=False, mongo_txn=False):
+    if backend == "PostgreSQL":
+        return {"insert": pg_insert_cte if pg_cte else sql_insert, "update": sql_update, "delete": sql_delete}
+    if backend == "MySQL":
+        return {"insert": sql_insert, "update": sql_update, "delete": sql_delete}
+    if backend == "MongoDB":
+        ops = {"insert": mongo_insert, "update": mongo_update, "delete": mongo_delete}
+        return {name: mongo_transaction(op) for name, op in ops.items()} if mongo_txn else ops
+    return {"insert": redis_insert, "update": redis_update, "delete": redis_delete}
+
+
+# === Konflikty ===
+
+def is_conflict(e):
+    if getattr(e, "pgcode", None) in ("40001", "40P01"):  # serialization_failure, deadlock_detected
+        return True
+    if isinstance(e, pymysql.err.OperationalError) and e.args and e.args[0] in (1205, 1213):  # lock wait timeout, deadlock
+        return True
+    if isinstance(e, redis.exceptions.WatchError):
+        return True
+    return isinstance(e, PyMongoError) and e.has_error_label("TransientTransactionError")
+
+
+def mysql_lock_waits(adapter):
+    return int(adapter.query("SHOW GLOBAL STATUS LIKE 'Innodb_row_lock_waits'")[0][1])
+
+
+# === Klient ===
+
+def client_worker(backend, op_name, args, options):
+    op = backend_ops(backend, options.pg_cte, options.mongo_txn)[op_name]
+    # Osobne połączenie (bez puli), bo poziom izolacji zostaje w sesji
+    adapter = ADAPTERS[backend](pooled=False)
+    latencies, results = [], []
+    conflicts = failures = 0
+    with adapter:
+        if backend in ("PostgreSQL", "MySQL"):
+            set_isolation(adapter, options.isolation)
+        started = time.time()
+        for arg in args:
+            start = time.perf_counter()
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    results.append(op(adapter, arg))
+                    break
+                except Exception as e:
+                    if hasattr(adapter, "conn"):
+                        adapter.conn.rollback()
+                    if is_conflict(e) and attempt < MAX_RETRIES:
+                        conflicts += 1
+                        continue
+                    failures += 1
+                    results.append(None)  # wyniki zostają wyrównane z args
+                    logger.debug(f"{backend} {op_name}: {e}")
+                    break
+            latencies.append(time.perf_counter() - start)
+        finished = time.time()
+    return started, finished, latencies, results, conflicts, failures
+
+
+def run_phase(backend, op_name, client_args, options):
+    lock_waits = None
+    if backend == "MySQL":
+        with ADAPTERS[backend]() as a:
+            lock_waits = mysql_lock_waits(a)
+    with ThreadPoolExecutor(max_workers=len(client_args)) as pool:
+        futures = [pool.submit(client_worker, backend, op_name, args, options) for args in client_args]
+        outcomes = [f.result() for f in futures]
+    if backend == "MySQL":
+        with ADAPTERS[backend]() as a:
+            lock_waits = mysql_lock_waits(a) - lock_waits
+
+    latencies = sorted(t * 1000 for o in outcomes for t in o[2])
+    wall = max(o[1] for o in outcomes) - min(o[0] for o in outcomes)
+    conflicts = sum(o[4] for o in outcomes)
+    failures = sum(o[5] for o in outcomes)
+    ops = len(latencies)
+    row = {
+        "backend": backend,
+        "op": op_name,
+        "clients": len(client_args),
+        "ops": ops,
+        "failures": failures,
+        "conflicts": conflicts,
+        "conflict_rate": conflicts / ops if ops else 0.0,
+        "lock_waits": lock_waits,
+        "wall_s": wall,
+        "throughput_ops_s": (ops - failures) / wall if wall > 0 else float("nan"),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+    return row, [o[3] for o in outcomes]
+
+
+def run_level(backend, clients, options):
+    rng = random.Random(options.seed)
+    docs = [[gen_ride(rng) for _ in range(options.ops)] for _ in range(clients)]
+
+    rows = []
+    row, inserted = run_phase(backend, "insert", docs, options)
+    rows.append(row)
+    # Przejazdy Taxi mają price = None — aktualizacja ceny (float, $mul, * 1.01) by się na nich wywracała,
+    # więc gorący zbiór wybierany jest tylko spośród przejazdów z ceną
+    priced = [i for client_docs, ids in zip(docs, inserted) for doc, i in zip(client_docs, ids)
+              if i is not None and doc["price"]["price"] is not None]
+    inserted = [[i for i in ids if i is not None] for ids in inserted]
+    if not priced:
+        return rows
+
+    # Wszyscy klienci aktualizują ten sam mały zbiór przejazdów
+    hot = priced[:HOT_RIDES]
+    updates = [[rng.choice(hot) for _ in range(options.ops)] for _ in range(clients)]
+    row, _ = run_phase(backend, "update", updates, options)
+    rows.append(row)
+
+    row, _ = run_phase(backend, "delete", inserted, options)
+    rows.append(row)
+    return rows
+
+
+def plot_results(rows, filename="query_transactions_results.png"):
+    ops = list(dict.fromkeys(r["op"] for r in rows))
+    fig, axes = plt.subplots(1, len(ops), figsize=(6 * len(ops), 5), squeeze=False)
+    for ax, op in zip(axes[0], ops):
+        for backend in dict.fromkeys(r["backend"] for r in rows):
+            series = [r for r in rows if r["backend"] == backend and r["op"] == op]
+            ax.plot([r["clients"] for r in series], [r["throughput_ops_s"] for r in series], marker='o', label=backend)
+        ax.set_title(f"{op}: przejazdy/s vs liczba klientów")
+        ax.set_xlabel("Liczba klientów")
+        ax.set_ylabel("przejazdy/s")
+        ax.set_xscale('log', base=2)
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.legend()
+    plt.tight_layout()
+    plt.savefig(results_path(filename), dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transakcyjne zapisy kompletnego przejazdu pod współbieżnością")
+    parser.add_argument("--clients", default=",".join(map(str, CLIENT_COUNTS)))
+    parser.add_argument("--ops", type=int, default=OPS_PER_CLIENT, help="operacji na klienta w każdej fazie")
+    parser.add_argument("--isolation", choices=ISOLATION_LEVELS, default="READ COMMITTED")
+    parser.add_argument("--pg-cte", action="store_true", help="PostgreSQL: cały graf w jednej instrukcji WITH ... RETURNING")
+    parser.add_argument("--mongo-txn", action="store_true", help="MongoDB: transakcje wielodokumentowe (replica set)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(ADAPTERS))
+    options = parser.parse_args()
+
+    rows = []
+    for backend in options.backends.split(","):
+        for clients in map(int, options.clients.split(",")):
+            logger.info(f"{backend}: {clients} klientów ({options.isolation})")
+            try:
+                level_rows = run_level(backend, clients, options)
+            except Exception as e:
+                logger.error(f"{backend} ({clients} klientów): {e}")
+                break
+            for row in level_rows:
+                logger.info(
+                    f"{backend} {row['op']}: {row['throughput_ops_s']:.1f} przejazdów/s, p99 {row['p99_ms']:.2f} ms, "
+                    f"konflikty {row['conflict_rate']:.2%}, błędy {row['failures']}"
+                )
+            rows.extend(level_rows)
+
+    with open(results_path("query_transactions_results.csv"), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    plot_results(rows)
+    print("Wyniki zapisane do results/query_transactions_results.csv")
+
+
+if __name__ == "__main__":
+    main()
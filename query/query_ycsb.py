@@ -0,0 +1,283 @@
+import argparse
+import csv
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from distributions import DISTRIBUTIONS, ZipfGenerator, ZipfRanking
+from generate_data import gen_ride
+from harness import ADAPTERS, results_path
+from query_update import new_price
+from stats import summarize, SUMMARY_FIELDS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger()
+
+# Mieszany workload w stylu YCSB na modelu przejazdów, po całej przestrzeni kluczy
+# (Ride.id w SQL, _id w Mongo, klucze ride:* w Redis) zamiast jednego gorącego rekordu:
+#   A — 50% odczyt / 50% aktualizacja ceny, B — 95/5, C — tylko odczyt,
+#   E — 95% krótkich skanów zakresu (1..MAX_SCAN_LENGTH rekordów) / 5% wstawień.
+# Klucze z rozkładu uniform, zipfian albo latest (distributions.py).
+# Redis nie ma uporządkowanego skanu kluczy — zakres to kolejne klucze z posortowanej listy (JSON.MGET).
+# Wstawione rekordy są usuwane po przebiegu.
+
+OPS_PER_THREAD = 2000
+WARMUP = 100
+THREADS = 1
+MAX_SCAN_LENGTH = 100
+ZIPF_S = 0.99
+
+WORKLOADS = {
+    "A": {"read": 0.5, "update": 0.5},
+    "B": {"read": 0.95, "update": 0.05},
+    "C": {"read": 1.0},
+    "E": {"scan": 0.95, "insert": 0.05},
+}
+
+FIELDS = ["backend", "workload", "distribution", "threads", "op", "count", "wall_s", "throughput_ops_s"] + SUMMARY_FIELDS
+
+RIDE_COLUMNS = "source, destination, cab_type, product_id, name, price_id, time_id, weather_id"
+
+
+# === Przestrzeń kluczy ===
+
+def load_keys(adapter, records=None):
+    if adapter.name in ("MySQL", "PostgreSQL"):
+        sql = "SELECT id FROM Ride ORDER BY id" + (" LIMIT %s" if records else "")
+        return [row[0] for row in adapter.query(sql, (records,) if records else None)]
+    if adapter.name == "MongoDB":
+        cursor = adapter.collection.find({}, {"_id": 1}).sort("_id", 1).limit(records or 0)
+        return [doc["_id"] for doc in cursor]
+    return sorted(adapter.scan_keys(limit=records))
+
+
+# === Operacje: SQL ===
+
+def sql_read(a, key):
+    return a.query(
+        "SELECT r.*, p.price, p.distance FROM Ride r JOIN Price p ON r.price_id = p.id WHERE r.id = %s", (key,)
+    )
+
+
+def sql_update(a, key):
+    a.execute("UPDATE Price SET price = %s WHERE id = (SELECT price_id FROM Ride WHERE id = %s)", (new_price(), key))
+
+
+def sql_scan(a, keys, idx, length):
+    return a.query("SELECT * FROM Ride WHERE id >= %s ORDER BY id LIMIT %s", (keys[idx], length))
+
+
+def sql_insert(a, key, doc):
+    # Kopia istniejącego przejazdu (te same FK) — jeden wiersz Ride, bez wstawiania powiązanych tabel
+    sql = f"INSERT INTO Ride ({RIDE_COLUMNS}) SELECT {RIDE_COLUMNS} FROM Ride WHERE id = %s"
+    if a.name == "PostgreSQL":
+        a.execute(sql + " RETURNING id", (key,), commit=False)
+        new_id = a.cursor.fetchone()[0]
+        a.conn.commit()
+        return new_id
+    a.execute(sql, (key,))
+    return a.cursor.lastrowid
+
+
+def sql_cleanup(a, keys):
+    for key in keys:
+        a.execute("DELETE FROM Ride WHERE id = %s", (key,), commit=False)
+    a.conn.commit()
+
+
+# === Operacje: MongoDB ===
+
+def mongo_read(a, key):
+    return a.collection.find_one({"_id": key})
+
+
+def mongo_update(a, key):
+    a.collection.update_one({"_id": key}, {"$set": {"price.price": new_price()}})
+
+
+def mongo_scan(a, keys, idx, length):
+    return list(a.collection.find({"_id": {"$gte": keys[idx]}}).sort("_id", 1).limit(length))
+
+
+def mongo_insert(a, key, doc):
+    return a.collection.insert_one(doc).inserted_id
+
+
+def mongo_cleanup(a, keys):
+    a.collection.delete_many({"_id": {"$in": list(keys)}})
+
+
+# === Operacje: Redis ===
+
+def redis_read(a, key):
+    return a.r.execute_command("JSON.GET", key)
+
+
+def redis_update(a, key):
+    a.r.execute_command("JSON.SET", key, "$.price.price", new_price())
+
+
+def redis_scan(a, keys, idx, length):
+    return a.r.execute_command("JSON.MGET", *keys[idx:idx + length], "$")
+
+
+def redis_insert(a, key, doc):
+    new_key = f"ride:ycsb:{time.time_ns()}:{random.getrandbits(32):08x}"
+    a.r.execute_command("JSON.SET", new_key, "$", json.dumps(doc))
+    return new_key
+
+
+def redis_cleanup(a, keys):
+    if keys:
+        a.r.delete(*keys)
+
+
+SQL_OPS = {"read": sql_read, "update": sql_update, "scan": sql_scan, "insert": sql_insert, "cleanup": sql_cleanup}
+OPS = {
+    "MySQL": SQL_OPS,
+    "PostgreSQL": SQL_OPS,
+    "MongoDB": {"read": mongo_read, "update": mongo_update, "scan": mongo_scan, "insert": mongo_insert,
+                "cleanup": mongo_cleanup},
+    "Redis": {"read": redis_read, "update": redis_update, "scan": redis_scan, "insert": redis_insert,
+              "cleanup": redis_cleanup},
+}
+
+
+# === Klient ===
+
+def choose_op(rng, mix):
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+def make_chooser(distribution, n, seed, ranking=None):
+    # Dla zipfian wspólny ranking (ten sam zbiór gorących kluczy we wszystkich wątkach), własne tylko losowanie
+    if distribution == "zipfian":
+        return ZipfGenerator(n, ZIPF_S, seed, ranking=ranking)
+    return DISTRIBUTIONS[distribution](n, ZIPF_S, seed)
+
+
+def run_client(backend, mix, distribution, keys, inserted, ops, warmup, seed, ranking=None, keys_lock=None):
+    rng = random.Random(seed)
+    chooser = make_chooser(distribution, len(keys), seed, ranking)
+    backend_ops = OPS[backend]
+    latencies = {op: [] for op in mix}
+
+    adapter = ADAPTERS[backend]()
+    with adapter:
+        started = time.time()
+        for i in range(warmup + ops):
+            if i == warmup:
+                started = time.time()
+            op = choose_op(rng, mix)
+            chooser.n = len(keys)
+            idx = chooser.next()
+            # Argumenty przygotowane poza mierzonym oknem
+            if op == "scan":
+                args = (keys, min(idx, len(keys) - 1), rng.randint(1, MAX_SCAN_LENGTH))
+            elif op == "insert":
+                args = (keys[idx], gen_ride(rng))
+            else:
+                args = (keys[idx],)
+
+            start = time.perf_counter()
+            result = backend_ops[op](adapter, *args)
+            elapsed = time.perf_counter() - start
+
+            if op == "insert":
+                # Wątki współdzielą przestrzeń kluczy; nowy klucz trafia też do rankingu Zipfa
+                with keys_lock:
+                    keys.append(result)
+                    if ranking is not None:
+                        ranking.add(len(keys) - 1)
+                inserted.append(result)
+            if i >= warmup:
+                latencies[op].append(elapsed)
+        finished = time.time()
+    return started, finished, latencies
+
+
+def run_workload_mix(backend, workload, distribution, threads, ops, warmup, records, seed):
+    adapter = ADAPTERS[backend]()
+    with adapter:
+        keys = load_keys(adapter, records)
+    logger.info(f"{backend}: {len(keys)} kluczy")
+    inserted = []
+    keys_lock = threading.Lock()
+    # Permutacja rang wyznaczana raz (ziarno przebiegu), niezależnie od liczby wątków
+    ranking = ZipfRanking(len(keys), ZIPF_S, seed) if distribution == "zipfian" else None
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [
+                pool.submit(run_client, backend, WORKLOADS[workload], distribution, keys, inserted, ops, warmup,
+                            seed + t, ranking, keys_lock)
+                for t in range(threads)
+            ]
+            results = [f.result() for f in futures]
+    finally:
+        with adapter:
+            OPS[backend]["cleanup"](adapter, inserted)
+
+    wall = max(f for _, f, _ in results) - min(s for s, _, _ in results)
+    rows = []
+    for op in list(WORKLOADS[workload]) + ["all"]:
+        if op == "all":
+            latencies = [t for _, _, lat in results for series in lat.values() for t in series]
+        else:
+            latencies = [t for _, _, lat in results for t in lat[op]]
+        rows.append({
+            "backend": backend,
+            "workload": workload,
+            "distribution": distribution,
+            "threads": threads,
+            "op": op,
+            "count": len(latencies),
+            "wall_s": wall,
+            "throughput_ops_s": len(latencies) / wall if wall > 0 else float("nan"),
+            **summarize(latencies),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mieszany workload w stylu YCSB (A, B, C, E)")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    parser.add_argument("--distribution", choices=list(DISTRIBUTIONS), default="zipfian")
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--ops", type=int, default=OPS_PER_THREAD, help="operacji na wątek")
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--records", type=int, default=None, help="ogranicz przestrzeń kluczy (domyślnie wszystkie)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(ADAPTERS))
+    args = parser.parse_args()
+
+    rows = []
+    for workload in args.workloads.split(","):
+        for backend in args.backends.split(","):
+            logger.info(f"{backend}: workload {workload} ({args.distribution}, {args.threads} wątków)")
+            try:
+                workload_rows = run_workload_mix(backend, workload, args.distribution, args.threads,
+                                                 args.ops, args.warmup, args.records, args.seed)
+            except Exception as e:
+                logger.error(f"{backend} workload {workload}: {e}")
+                continue
+            for row in workload_rows:
+                logger.info(
+                    f"{backend} {workload} {row['op']}: {row['throughput_ops_s']:.1f} ops/s, "
+                    f"p99 {row['p99']:.2f} ms"
+                )
+            rows.extend(workload_rows)
+
+    filename = f"query_ycsb_{args.distribution}.csv"
+    with open(results_path(filename), mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    print(f"Wyniki zapisane do results/{filename}")
+
+
+if __name__ == "__main__":
+    main()
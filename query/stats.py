@@ -0,0 +1,86 @@
+import csv
+import math
+import random
+import statistics
+
+# Kolumny podsumowania pojedynczej serii pomiarów (wszystkie czasy w ms)
+SUMMARY_FIELDS = ["n", "mean", "min", "median", "p90", "p95", "p99", "max", "stddev", "ci_low", "ci_high"]
+
+BOOTSTRAP_SAMPLES = 1000
+CONFIDENCE = 0.95
+
+
+def percentile(sorted_values, q):
+    # Interpolacja liniowa (jak numpy.percentile z domyślnymi ustawieniami)
+    if not sorted_values:
+        return math.nan
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    if lo == hi:
+        return sorted_values[lo]
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def bootstrap_ci(values, stat=statistics.median, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE, seed=0):
+    # Przedział ufności metodą bootstrap (percentylowy) dla zadanej statystyki
+    if len(values) < 2:
+        return (values[0], values[0]) if values else (math.nan, math.nan)
+    rng = random.Random(seed)
+    n = len(values)
+    boot = sorted(stat(rng.choices(values, k=n)) for _ in range(samples))
+    alpha = (1 - confidence) / 2
+    return percentile(boot, alpha * 100), percentile(boot, (1 - alpha) * 100)
+
+
+def summarize(timings):
+    """Podsumowanie listy czasów w sekundach -> słownik SUMMARY_FIELDS w ms."""
+    values = sorted(t * 1000 for t in timings)
+    if not values:
+        return {field: math.nan for field in SUMMARY_FIELDS} | {"n": 0}
+    ci_low, ci_high = bootstrap_ci(values)
+    return {
+        "n": len(values),
+        "mean": statistics.fmean(values),
+        "min": values[0],
+        "median": statistics.median(values),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+        "stddev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+    }
+
+
+def summarize_workload(results):
+    # results: wynik harness.run_workload -> lista wierszy (query, backend, statystyki)
+    rows = []
+    for label, per_backend in results.items():
+        for backend, timings in per_backend.items():
+            if timings is None:
+                continue
+            rows.append({"query": label, "backend": backend, **summarize(timings)})
+    return rows
+
+
+def write_summary_csv(path, results):
+    rows = summarize_workload(results)
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=["query", "backend"] + SUMMARY_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: round(v, 4) if isinstance(v, float) else v for k, v in row.items()})
+    return rows
+
+
+def write_timings_csv(path, results):
+    # Surowe czasy każdej iteracji (ms), format "długi"
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["query", "backend", "iteration", "time_ms"])
+        for label, per_backend in results.items():
+            for backend, timings in per_backend.items():
+                for i, t in enumerate(timings or [], start=1):
+                    writer.writerow([label, backend, i, t * 1000])
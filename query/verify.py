@@ -0,0 +1,214 @@
+import csv
+import hashlib
+import json
+import logging
+import math
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# Kontrola poprawności: czy wszystkie backendy zwracają te same dane dla zapytań z katalogu.
+# Wiersze są rzutowane na wspólny zestaw pól, kanonizowane (liczby -> float z FLOAT_PRECISION
+# miejscami, teksty bez białych znaków na brzegach), sortowane i haszowane (SHA-256).
+# Agregaty porównywane są grupa po grupie z tolerancją AGG_REL_TOL.
+
+FLOAT_PRECISION = 2
+AGG_REL_TOL = 1e-6
+REFERENCE_BACKEND = "PostgreSQL"
+
+RIDE_FIELDS = ["source", "destination", "cab_type", "product_id", "name"]
+
+# Dla każdej etykiety: kolumny SQL i odpowiadające im ścieżki w dokumencie Mongo/RedisJSON,
+# albo "aggregate" dla zapytań GROUP BY
+VERIFY = {
+    "rides_by_lyft": {"sql": RIDE_FIELDS, "doc": RIDE_FIELDS},
+    "rides_from_north_station": {"sql": RIDE_FIELDS, "doc": RIDE_FIELDS},
+    "price_distance_filter": {
+        "sql": ["price", "distance"],
+        "doc": ["price.price", "price.distance"],
+    },
+    "rides_in_december": {
+        "sql": ["hour", "day", "month"],
+        "doc": ["time.hour", "time.day", "time.month"],
+    },
+    "ride_names_temp_above_40": {"sql": ["name"], "doc": ["name"]},
+    "rides_wind_gt5_humidity_lt07": {"sql": RIDE_FIELDS, "doc": RIDE_FIELDS},
+    "avg_price_by_cab_type": {"aggregate": True},
+    "ride_counts_by_hour": {"aggregate": True},
+}
+
+VERIFY_FIELDS = ["query", "backend", "rows", "checksum", "matches_reference"]
+
+
+# === Kanonizacja ===
+
+def canon(value):
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return round(float(value), FLOAT_PRECISION)
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return round(float(value), FLOAT_PRECISION)
+        except ValueError:
+            return value
+    return str(value)
+
+
+def group_key(value):
+    value = canon(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def checksum(rows):
+    canonical = sorted(json.dumps(row, sort_keys=True, default=str) for row in rows)
+    digest = hashlib.sha256()
+    for line in canonical:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\n")
+    return len(canonical), digest.hexdigest()
+
+
+# === Pobieranie i normalizacja wyników poszczególnych backendów ===
+
+def sql_rows(adapter, q, fields):
+    adapter.cursor.execute(q["sql"])
+    columns = [d[0].lower() for d in adapter.cursor.description]
+    idx = [columns.index(f.lower()) for f in fields]
+    return [[canon(row[i]) for i in idx] for row in adapter.cursor.fetchall()]
+
+
+def mongo_docs(adapter, q):
+    return adapter.collection.find(q["mongo"])
+
+
+def redis_docs(adapter, q):
+    from query_select import redis_search_command
+    reply = adapter.r.execute_command(*redis_search_command(q["redis"]))
+    # [total, klucz1, [pole, wartość, ...], klucz2, ...] — dokument JSON w polu "$"
+    for fields in reply[2::2]:
+        values = dict(zip(fields[::2], fields[1::2]))
+        raw = values.get("$", values.get(b"$"))
+        if raw is not None:
+            yield json.loads(raw)
+
+
+def sql_groups(adapter, q):
+    return {group_key(k): canon_float(v) for k, v in adapter.query(q["sql"])}
+
+
+def mongo_groups(adapter, q):
+    from query_select import mongo_aggregate
+    result = {}
+    for row in mongo_aggregate(adapter.db, q["mongo"]):
+        key = row.pop("_id")
+        result[group_key(key)] = canon_float(next(iter(row.values())))
+    return result
+
+
+def redis_groups(adapter, q):
+    from query_select import REDIS_AGGREGATES
+    reply = adapter.r.execute_command(*REDIS_AGGREGATES[q["redis"]])
+    # [liczba, [pole_grupy, wartość, alias, wynik], ...]
+    result = {}
+    for row in reply[1:]:
+        result[group_key(row[1])] = canon_float(row[-1])
+    return result
+
+
+def canon_float(value):
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return float(value) if value is not None else None
+
+
+def normalize(adapter, label, q):
+    spec = VERIFY[label]
+    if spec.get("aggregate"):
+        groups = {"MongoDB": mongo_groups, "Redis": redis_groups}.get(adapter.name, sql_groups)(adapter, q)
+        return {"groups": groups, "rows": len(groups), "checksum": checksum([[k, v] for k, v in groups.items()])[1]}
+
+    if adapter.name in ("MySQL", "PostgreSQL"):
+        rows = sql_rows(adapter, q, spec["sql"])
+    else:
+        docs = mongo_docs(adapter, q) if adapter.name == "MongoDB" else redis_docs(adapter, q)
+        rows = [[canon(get_path(doc, path)) for path in spec["doc"]] for doc in docs]
+    count, digest = checksum(rows)
+    return {"rows": count, "checksum": digest}
+
+
+def groups_match(a, b):
+    if a.keys() != b.keys():
+        return False
+    return all(
+        (a[k] is None and b[k] is None)
+        or (a[k] is not None and b[k] is not None and math.isclose(a[k], b[k], rel_tol=AGG_REL_TOL, abs_tol=AGG_REL_TOL))
+        for k in a
+    )
+
+
+def matches(reference, result):
+    if "groups" in reference:
+        return groups_match(reference["groups"], result["groups"])
+    return reference["rows"] == result["rows"] and reference["checksum"] == result["checksum"]
+
+
+def verify_catalog(adapters, queries):
+    """Porównuje wyniki wszystkich backendów z REFERENCE_BACKEND. Zwraca (wiersze raportu, czy wszystko zgodne)."""
+    results = {label: {} for label in queries if label in VERIFY}
+    for adapter in adapters:
+        with adapter:
+            for label in results:
+                try:
+                    results[label][adapter.name] = normalize(adapter, label, queries[label])
+                except Exception as e:
+                    logger.error(f"{adapter.name} {label}: weryfikacja nie powiodła się: {e}")
+                    if hasattr(adapter, "conn"):
+                        adapter.conn.rollback()
+
+    rows = []
+    ok = True
+    for label, per_backend in results.items():
+        reference = per_backend.get(REFERENCE_BACKEND) or next(iter(per_backend.values()), None)
+        for backend, result in per_backend.items():
+            same = reference is not None and matches(reference, result)
+            if not same:
+                ok = False
+                logger.error(
+                    f"NIEZGODNOŚĆ {label}: {backend} zwrócił {result['rows']} wierszy/grup, "
+                    f"referencja {reference['rows'] if reference else '?'}"
+                )
+            rows.append({
+                "query": label,
+                "backend": backend,
+                "rows": result["rows"],
+                "checksum": result["checksum"][:16],
+                "matches_reference": same,
+            })
+        missing = set(b.name for b in adapters) - set(per_backend)
+        if missing:
+            ok = False
+            logger.error(f"{label}: brak wyników z {', '.join(sorted(missing))}")
+    return rows, ok
+
+
+def write_verify_csv(path, rows):
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=VERIFY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)